@@ -0,0 +1,61 @@
+# allocation.py
+from collections import namedtuple
+
+import numpy as np
+
+from server_names import match_servers
+
+# --- Tip Pools (row order of every rate / tip matrix) ---
+POOLS = ('Lunch', 'Dinner_General', 'Dinner_Servers')
+POOL_SUFFIXES = {'Lunch': '_Lunch', 'Dinner_General': '_Dinner', 'Dinner_Servers': '_Dinner'}
+SERVER_COLUMN = 'Server'
+
+# rates and role_tips are pool x column; employee_tips is employee x column
+# matched_servers: {employee: tip} servers of the tips export found on the roster
+# unmatched_servers: {server: tip} servers no employee matched, whose tips are not applied
+TipAllocation = namedtuple('TipAllocation', [
+    'columns', 'employees', 'rates', 'role_tips', 'employee_tips', 'matched_servers', 'unmatched_servers'
+])
+
+
+def allocate_tips(hours, columns, employees, lunch_tips_total, dinner_tips_total,
+                  server_contribution_total, server_cash_cc_tips, rules,
+                  servers_tips=None):
+    """
+    Computes every tip amount in the report from an employee x column hours matrix.
+
+    Role tips are the pool totals spread by the rate matrix of the compiled
+    rules (a rules.PayrollRules). Lunch and general dinner tips only go to
+    columns that have hours; the servers pool also gives the Server column
+    what servers keep after their pool contribution.
+    Individual tips split each role's tips by share of the role's hours, then
+    servers in servers_tips get their actual tip in the Server column, matched
+    to employees by name (see server_names.NameIndex).
+    """
+    hours = np.asarray(hours, dtype=float)
+    columns = list(columns)
+    rates = rules.rate_matrix(columns)
+    role_hours = hours.sum(axis=0)
+
+    pool_totals = np.array([lunch_tips_total, dinner_tips_total, server_contribution_total], dtype=float)
+    active = np.ones_like(rates, dtype=bool)
+    active[:2] = role_hours > 0
+    role_tips = np.where(active, pool_totals[:, None] * rates, 0.0)
+
+    if SERVER_COLUMN in columns:
+        server_idx = columns.index(SERVER_COLUMN)
+        role_tips[2, server_idx] = server_cash_cc_tips * (1 - rules.servers_to_pool_rate)
+
+    # Individual tip = (Total Role Tips) * (Employee Hours / Total Role Hours)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares = np.where((role_hours > 0) & (hours > 0), hours / role_hours, 0.0)
+    employee_tips = shares * role_tips.sum(axis=0)
+
+    matched_servers, unmatched_servers = {}, {}
+    if servers_tips and SERVER_COLUMN in columns:
+        positions, tips, matched_servers, unmatched_servers = match_servers(employees, servers_tips, rules.name_aliases)
+        employee_tips[positions, server_idx] = tips
+    elif servers_tips:
+        unmatched_servers = {server: values['tip'] for server, values in servers_tips.items()}
+
+    return TipAllocation(columns, list(employees), rates, role_tips, employee_tips, matched_servers, unmatched_servers)
@@ -1,12 +1,24 @@
 # app.py
-from flask import Flask, request, render_template, send_file, jsonify, flash
+from flask import Flask, request, render_template, send_file, jsonify, flash, Response
 import os
+import re
 import tempfile
+import time
 import uuid
+from io import BytesIO
 from werkzeug.utils import secure_filename
 from tip import create_final_payroll_report
-import threading
-import time
+from payroll import RULES, compute_payroll
+from rules import config_fingerprint
+from period_state import PeriodState, period_lock, expire_period_states
+from hours_reader import format_clock_minutes
+from renderers import RENDERERS, render, get_renderer, renderer_for_file, result_to_dict
+from jobs import JobQueue, QueueFullError
+from report_cache import ReportCache
+from report_stats import ReportFailedError
+from report_store import ReportStore, ReportTooLargeError
+from reaper import FileReaper
+from metrics import ReportMetrics
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'  # Change this to a random secret key
@@ -17,24 +29,121 @@ UPLOAD_FOLDER = 'temp_uploads'
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
-def cleanup_file(filepath, delay=300):
-    """Delete file after delay (default 5 minutes)"""
-    def delete_file():
-        time.sleep(delay)
-        try:
-            if os.path.exists(filepath):
-                os.remove(filepath)
-                print(f"Cleaned up: {filepath}")
-        except Exception as e:
-            print(f"Error cleaning up {filepath}: {e}")
-    
-    thread = threading.Thread(target=delete_file)
-    thread.daemon = True
-    thread.start()
+# Background report jobs (concurrency limits can be set through the environment)
+app.config['REPORT_WORKERS'] = int(os.environ.get('REPORT_WORKERS', 2))  # Reports built at the same time
+app.config['MAX_PENDING_JOBS'] = int(os.environ.get('MAX_PENDING_JOBS', 10))  # Queued + running reports allowed
+job_queue = JobQueue(max_workers=app.config['REPORT_WORKERS'], max_pending=app.config['MAX_PENDING_JOBS'])
+
+# Cache of built reports, keyed on the uploaded files and the payroll configuration
+app.config['REPORT_CACHE_FOLDER'] = os.environ.get('REPORT_CACHE_FOLDER', 'report_cache')
+app.config['REPORT_CACHE_MAX_BYTES'] = int(os.environ.get('REPORT_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+app.config['REPORT_CACHE_MAX_AGE'] = int(os.environ.get('REPORT_CACHE_MAX_AGE', 24 * 3600))  # Seconds
+report_cache = ReportCache(
+    app.config['REPORT_CACHE_FOLDER'],
+    max_bytes=app.config['REPORT_CACHE_MAX_BYTES'],
+    max_age=app.config['REPORT_CACHE_MAX_AGE']
+)
+# Read hours uploads this many punches at a time (0 reads the whole file); bounds memory for year-long exports
+app.config['HOURS_CHUNK_ROWS'] = int(os.environ.get('HOURS_CHUNK_ROWS', 0))
+
+# Colour tip bands with sheet-level conditional formatting instead of per-cell fills (smaller, faster workbooks)
+app.config['CONDITIONAL_FORMATTING'] = os.environ.get('CONDITIONAL_FORMATTING', '0') == '1'
+# Split reports into Hours, Pool Allocation and Individual Tips sheets, each written in its own process
+app.config['MULTI_SHEET_REPORTS'] = os.environ.get('MULTI_SHEET_REPORTS', '0') == '1'
+# Editing payroll_rules.json or the formatting mode or layout invalidates cached reports
+CONFIG_FINGERPRINT = config_fingerprint(RULES.fingerprint, app.config['CONDITIONAL_FORMATTING'],
+                                        app.config['MULTI_SHEET_REPORTS'])
+
+# Build reports from the uploads in memory and keep them in memory until downloaded
+# (set IN_MEMORY_REPORTS=0 to go through temp_uploads on disk instead)
+app.config['IN_MEMORY_REPORTS'] = os.environ.get('IN_MEMORY_REPORTS', '1') != '0'
+app.config['REPORT_STORE_MAX_BYTES'] = int(os.environ.get('REPORT_STORE_MAX_BYTES', 256 * 1024 * 1024))
+app.config['REPORT_STORE_TTL'] = int(os.environ.get('REPORT_STORE_TTL', 600))  # Seconds an unclaimed report is kept
+report_store = ReportStore(max_bytes=app.config['REPORT_STORE_MAX_BYTES'], ttl=app.config['REPORT_STORE_TTL'])
+
+# One background reaper deletes expired temp files; downloads release their own job's files
+app.config['CLEANUP_DELAY'] = int(os.environ.get('CLEANUP_DELAY', 300))  # Seconds uploads are kept
+file_reaper = FileReaper()
+
+def cleanup_file(filepath, delay=None, owner=None):
+    """Delete file after delay (default CLEANUP_DELAY), or when its owner's report is downloaded"""
+    file_reaper.schedule(filepath, app.config['CLEANUP_DELAY'] if delay is None else delay, owner)
+
+# Per-phase timings of finished reports, exported on /metrics
+report_metrics = ReportMetrics()
+
+# Saved pay periods that punch corrections are applied to without a full recompute
+app.config['PERIOD_STATE_FOLDER'] = os.environ.get('PERIOD_STATE_FOLDER', 'period_states')
+# Seconds a period is kept after it was saved or last corrected; expired ones are swept as new periods are saved
+app.config['PERIOD_STATE_TTL'] = int(os.environ.get('PERIOD_STATE_TTL', 14 * 24 * 3600))
+os.makedirs(app.config['PERIOD_STATE_FOLDER'], exist_ok=True)
+expire_period_states(app.config['PERIOD_STATE_FOLDER'], app.config['PERIOD_STATE_TTL'])
+PERIOD_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+def period_state_path(period_id):
+    """Path of a saved period, or None if it doesn't exist or has expired"""
+    if not PERIOD_ID_PATTERN.match(period_id):
+        return None
+    path = os.path.join(app.config['PERIOD_STATE_FOLDER'], f"{period_id}.pkl")
+    try:
+        expired = time.time() - os.path.getmtime(path) > app.config['PERIOD_STATE_TTL']
+    except FileNotFoundError:
+        return None
+    return None if expired else path
+
+def build_report(hours_path, output_path, tips_path, conditional_formatting=False, chunksize=None, multi_sheet=False,
+                 output_format='xlsx'):
+    """
+    Runs in a worker process. Returns the output path and the report's stats,
+    or fails the job with a ReportFailedError carrying the stats when the report failed.
+    """
+    stats = create_final_payroll_report(hours_path, output_path, tips_path, conditional_formatting=conditional_formatting,
+                                        chunksize=chunksize, multi_sheet=multi_sheet, output_format=output_format)
+    if stats.error or not os.path.exists(output_path):
+        raise ReportFailedError(report_failure(stats), stats)
+    return output_path, stats
+
+def build_report_bytes(hours_data, tips_data, conditional_formatting=False, chunksize=None, multi_sheet=False,
+                       output_format='xlsx'):
+    """
+    Runs in a worker process. Builds the report from upload bytes without touching disk and returns it with
+    the report's stats, or fails the job with a ReportFailedError carrying the stats when the report failed.
+    """
+    output = BytesIO()
+    stats = create_final_payroll_report(BytesIO(hours_data), output, BytesIO(tips_data) if tips_data else None,
+                                        conditional_formatting=conditional_formatting, chunksize=chunksize,
+                                        multi_sheet=multi_sheet, output_format=output_format)
+    if stats.error or not output.getbuffer().nbytes:
+        raise ReportFailedError(report_failure(stats), stats)
+    return output.getvalue(), stats
+
+def report_failure(stats):
+    detail = f" ({stats.error})" if stats.error else ''
+    return f"the report could not be generated{detail}, check the uploaded files"
+
+def observe_report(job):
+    """Records a finished report job's stats, failed ones included, for /metrics"""
+    if job['status'] == 'done':
+        report_metrics.observe(job['result'][1])
+    elif isinstance(job['exception'], ReportFailedError):
+        report_metrics.observe(job['exception'].stats)
+
+def report_message(filename):
+    renderer = renderer_for_file(filename)
+    return f"{renderer.label if renderer else 'Excel'} report generated successfully!"
+
+def report_ready(output_filename, original_name):
+    return jsonify({
+        'success': True,
+        'cached': True,
+        'download_url': f'/download/{output_filename}',
+        'original_name': original_name,
+        'message': report_message(original_name)
+    })
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    return render_template('index.html', formats=RENDERERS)
 
 @app.route('/generate', methods=['POST'])
 def generate_report():
@@ -51,94 +160,352 @@ def generate_report():
         if not hours_file or hours_file.filename == '':
             return jsonify({'error': 'Hours CSV file is required'}), 400
         
+        # The workbook by default; flat files are written straight from the computed figures
+        output_format = request.form.get('format', 'xlsx')
+        if output_format not in RENDERERS:
+            return jsonify({'error': f"format must be one of: {', '.join(RENDERERS)}"}), 400
+        
         # Generate unique filenames to avoid conflicts
         unique_id = str(uuid.uuid4())[:8]
-        
-        # Save hours file
-        hours_filename = f"hours_{unique_id}_{secure_filename(hours_file.filename)}"
-        hours_path = os.path.join(UPLOAD_FOLDER, hours_filename)
-        hours_file.save(hours_path)
-        
-        # Save tips file if provided
-        tips_path = None
-        if tips_file and tips_file.filename != '':
-            tips_filename = f"tips_{unique_id}_{secure_filename(tips_file.filename)}"
-            tips_path = os.path.join(UPLOAD_FOLDER, tips_filename)
-            tips_file.save(tips_path)
+        has_tips = tips_file and tips_file.filename != ''
         
         # Generate output filename with original name preserved
         clean_filename = secure_filename(filename)
-        output_filename = f"{unique_id}_{clean_filename}.xlsx"
-        output_path = os.path.join(UPLOAD_FOLDER, output_filename)
+        original_name = f"{clean_filename}.{RENDERERS[output_format].extension}"
+        output_filename = f"{unique_id}_{original_name}"
+        fingerprint = f"{CONFIG_FINGERPRINT}:{output_format}"
         
-        # Call your Python function
-        create_final_payroll_report(hours_path, output_path, tips_path)
+        if app.config['IN_MEMORY_REPORTS']:
+            # Uploads are handed to the worker as bytes and the workbook comes back as bytes
+            hours_data = hours_file.read()
+            tips_data = tips_file.read() if has_tips else None
+            temp_paths = []
+            
+            # Serve a previously built report when the same files were uploaded before
+            cache_key = report_cache.key(hours_data, tips_data, fingerprint)
+            cached_report = report_cache.read(cache_key)
+            if cached_report is not None:
+                try:
+                    report_store.put(output_filename, cached_report)
+                except ReportTooLargeError as e:
+                    return jsonify({'error': f'Error processing files: {str(e)}'}), 413
+                return report_ready(output_filename, original_name)
+            
+            # Cache the report and hold it for download once it is built
+            def finish_report(job):
+                observe_report(job)
+                if job['status'] == 'done':
+                    report_data, _ = job['result']
+                    report_cache.write(cache_key, report_data)
+                    report_store.put(output_filename, report_data)
+            
+            job_args = (build_report_bytes, hours_data, tips_data, app.config['CONDITIONAL_FORMATTING'],
+                        app.config['HOURS_CHUNK_ROWS'] or None, app.config['MULTI_SHEET_REPORTS'], output_format)
+        else:
+            # Save hours file
+            hours_filename = f"hours_{unique_id}_{secure_filename(hours_file.filename)}"
+            hours_path = os.path.join(UPLOAD_FOLDER, hours_filename)
+            hours_file.save(hours_path)
+            
+            # Save tips file if provided
+            tips_path = None
+            if has_tips:
+                tips_filename = f"tips_{unique_id}_{secure_filename(tips_file.filename)}"
+                tips_path = os.path.join(UPLOAD_FOLDER, tips_filename)
+                tips_file.save(tips_path)
+            temp_paths = [path for path in (hours_path, tips_path) if path]
+            output_path = os.path.join(UPLOAD_FOLDER, output_filename)
+            
+            # Serve a previously built report when the same files were uploaded before
+            cache_key = report_cache.key(hours_path, tips_path, fingerprint)
+            if report_cache.get(cache_key, output_path):
+                for path in temp_paths:
+                    cleanup_file(path, owner=output_filename)
+                cleanup_file(output_path, app.config['REPORT_STORE_TTL'], owner=output_filename)
+                return report_ready(output_filename, original_name)
+            
+            # Schedule cleanup of this job's files and cache the report once it is built
+            def finish_report(job):
+                observe_report(job)
+                if job['status'] == 'done':
+                    report_cache.put(cache_key, output_path)
+                for path in temp_paths:
+                    cleanup_file(path, owner=output_filename)
+                cleanup_file(output_path, app.config['REPORT_STORE_TTL'], owner=output_filename)
+            
+            job_args = (build_report, hours_path, output_path, tips_path, app.config['CONDITIONAL_FORMATTING'],
+                        app.config['HOURS_CHUNK_ROWS'] or None, app.config['MULTI_SHEET_REPORTS'], output_format)
         
-        # Schedule cleanup of input files
-        cleanup_file(hours_path)
-        if tips_path:
-            cleanup_file(tips_path)
+        # Queue the report; the page polls /jobs/<id> until it is ready
+        try:
+            job_id = job_queue.submit(
+                *job_args, on_done=finish_report, keep_result=False,
+                output_filename=output_filename, original_name=original_name
+            )
+        except QueueFullError as e:
+            for path in temp_paths:
+                if os.path.exists(path):
+                    os.remove(path)
+            return jsonify({'error': str(e)}), 503
         
-        # Note: Output file will be deleted immediately after download
+        # Note: Output will be deleted immediately after download
         
         return jsonify({
             'success': True,
-            'download_url': f'/download/{output_filename}',
-            'original_name': f"{clean_filename}.xlsx",
-            'message': 'Excel report generated successfully!'
-        })
+            'cached': False,
+            'job_id': job_id,
+            'status_url': f'/jobs/{job_id}',
+            'message': 'Report queued for processing'
+        }), 202
         
     except Exception as e:
         print(f"Error generating report: {e}")
         return jsonify({'error': f'Error processing files: {str(e)}'}), 500
 
+@app.route('/api/compute', methods=['POST'])
+def api_compute():
+    """Report figures as JSON (or ?format=csv|parquet) straight from the uploads, without building a workbook"""
+    try:
+        hours_file = request.files.get('hoursFile')
+        tips_file = request.files.get('tipsFile')
+        if not hours_file or hours_file.filename == '':
+            return jsonify({'error': 'Hours CSV file is required'}), 400
+        
+        output_format = request.args.get('format', 'json')
+        if output_format not in RENDERERS or output_format == 'xlsx':
+            formats = [name for name in RENDERERS if name != 'xlsx']
+            return jsonify({'error': f"format must be one of: {', '.join(formats)}"}), 400
+        
+        tips_data = tips_file.read() if tips_file and tips_file.filename != '' else None
+        result = compute_payroll(BytesIO(hours_file.read()), BytesIO(tips_data) if tips_data else None,
+                                 chunksize=app.config['HOURS_CHUNK_ROWS'] or None)
+        if output_format == 'json':
+            return jsonify(result_to_dict(result))
+        
+        output = BytesIO()
+        render(result, output_format, output)
+        return Response(output.getvalue(), mimetype=get_renderer(output_format).mimetype)
+        
+    except Exception as e:
+        print(f"Error computing payroll: {e}")
+        return jsonify({'error': f'Error processing files: {str(e)}'}), 500
+
+@app.route('/api/periods', methods=['POST'])
+def api_create_period():
+    """Saves the state of a pay period so corrections can be applied to it later"""
+    try:
+        hours_file = request.files.get('hoursFile')
+        tips_file = request.files.get('tipsFile')
+        if not hours_file or hours_file.filename == '':
+            return jsonify({'error': 'Hours CSV file is required'}), 400
+        
+        tips_data = tips_file.read() if tips_file and tips_file.filename != '' else None
+        state = PeriodState.build(BytesIO(hours_file.read()), BytesIO(tips_data) if tips_data else None)
+        period_id = uuid.uuid4().hex
+        state.save(os.path.join(app.config['PERIOD_STATE_FOLDER'], f"{period_id}.pkl"))
+        expire_period_states(app.config['PERIOD_STATE_FOLDER'], app.config['PERIOD_STATE_TTL'])
+        return jsonify({'period_id': period_id, 'report': result_to_dict(state.result())}), 201
+        
+    except Exception as e:
+        print(f"Error saving period: {e}")
+        return jsonify({'error': f'Error processing files: {str(e)}'}), 500
+
+@app.route('/api/periods/<period_id>/punches')
+def api_period_punches(period_id):
+    """An employee's punches with the ids corrections refer to (?employee=First Last)"""
+    path = period_state_path(period_id)
+    if not path:
+        return jsonify({'error': 'Period not found'}), 404
+    
+    try:
+        punches = PeriodState.load(path).employee_punches(request.args.get('employee', ''))
+    except FileNotFoundError:
+        return jsonify({'error': 'Period not found'}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 409
+    return jsonify([
+        {'id': int(punch_id), 'role': punch['Role'], 'in_time': format_clock_minutes(punch['In Time']),
+         'out_time': format_clock_minutes(punch['Out Time']), 'regular_hours': float(punch['Regular hours'])}
+        for punch_id, punch in punches.iterrows()
+    ])
+
+@app.route('/api/periods/<period_id>/corrections', methods=['POST'])
+def api_correct_period(period_id):
+    """
+    Applies {"added": [punch, ...], "removed": [id, ...], "edited": {id: punch}} to a
+    saved period and returns the updated figures (?format=json|csv|xlsx). Punches use
+    the hours export's columns: First, Last, Role, In Time, Out Time, Regular hours.
+    """
+    output_format = request.args.get('format', 'json')
+    if output_format not in ('json', 'csv', 'xlsx'):
+        return jsonify({'error': "format must be 'json', 'csv' or 'xlsx'"}), 400
+    correction = request.get_json(silent=True)
+    if not isinstance(correction, dict):
+        return jsonify({'error': 'A JSON correction is required'}), 400
+    
+    try:
+        path = period_state_path(period_id)
+        if not path:
+            return jsonify({'error': 'Period not found'}), 404
+        # Corrections are read-modify-write; the file lock serializes them across threads and processes
+        with period_lock(path):
+            try:
+                state = PeriodState.load(path)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 409
+            result = state.apply(correction.get('added', ()), correction.get('removed', ()), correction.get('edited'))
+            state.save(path)
+    except FileNotFoundError:
+        return jsonify({'error': 'Period not found'}), 404  # Expired while the correction waited for the lock
+    except KeyError as e:
+        return jsonify({'error': str(e.args[0])}), 400
+    except ValueError as e:
+        return jsonify({'error': f'Invalid correction: {str(e)}'}), 400
+    except Exception as e:
+        print(f"Error correcting period: {e}")
+        return jsonify({'error': f'Error applying correction: {str(e)}'}), 500
+    
+    if output_format == 'json':
+        return jsonify(result_to_dict(result))
+    output = BytesIO()
+    render(result, output_format, output)
+    renderer = get_renderer(output_format)
+    if output_format == 'xlsx':
+        return send_file(BytesIO(output.getvalue()), as_attachment=True,
+                         download_name=f"period_{period_id}.{renderer.extension}", mimetype=renderer.mimetype)
+    return Response(output.getvalue(), mimetype=renderer.mimetype)
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = job_queue.status(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    response = {'job_id': job_id, 'status': job['status']}
+    if job['status'] == 'done':
+        response.update({
+            'success': True,
+            'download_url': f'/jobs/{job_id}/result',
+            'original_name': job['info']['original_name'],
+            'message': report_message(job['info']['original_name'])
+        })
+    elif job['status'] == 'failed':
+        response['error'] = f"Error processing files: {job['error']}"
+    return jsonify(response)
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    job = job_queue.status(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] != 'done':
+        return jsonify({'error': 'Report is not ready yet', 'status': job['status']}), 409
+    return download_file(job['info']['output_filename'])
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+def report_mimetype(filename):
+    renderer = renderer_for_file(filename)
+    return renderer.mimetype if renderer else XLSX_MIMETYPE
+
+def send_report(file_data, original_name):
+    return send_file(
+        BytesIO(file_data),
+        as_attachment=True,
+        download_name=original_name,
+        mimetype=report_mimetype(original_name)
+    )
+
+def stream_report(file_path, filename, original_name):
+    """
+    Sends a report from disk in chunks instead of reading it into memory,
+    answering conditional and Range requests so an interrupted download can
+    resume. Once a complete copy has been sent the report and its inputs are
+    deleted; after a partial one they stay until the reaper's deadline.
+    """
+    response = send_file(
+        os.path.abspath(file_path),
+        as_attachment=True,
+        download_name=original_name,
+        mimetype=report_mimetype(original_name),
+        conditional=True,
+        max_age=0
+    )
+    if request.method == 'GET' and response.status_code == 200:
+        def delete_report():
+            try:
+                os.remove(file_path)
+                print(f"File deleted after download: {file_path}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Error during cleanup: {e}")
+            
+            # Delete this report's remaining input files; other jobs' files are left alone
+            file_reaper.release(filename)
+        
+        # Runs when the server closes the response, after the last chunk is sent; a
+        # passthrough file would go to the server as is and never close the response
+        response.direct_passthrough = False
+        response.call_on_close(delete_report)
+    return response
+
 @app.route('/download/<filename>')
 def download_file(filename):
     try:
-        file_path = os.path.join(UPLOAD_FOLDER, filename)
-        if not os.path.exists(file_path):
-            return jsonify({'error': 'File not found'}), 404
-        
         # Extract original filename (after the unique ID and underscore)
         if '_' in filename:
             original_name = '_'.join(filename.split('_')[1:])  # Skip the unique ID part
         else:
             original_name = filename
         
-        # Read file into memory first
-        with open(file_path, 'rb') as f:
-            file_data = f.read()
-        
-        # Delete the file immediately after reading it
-        try:
-            os.remove(file_path)
-            print(f"File deleted immediately: {file_path}")
-            
-            # Delete all remaining files in temp_uploads folder
-            for remaining_file in os.listdir(UPLOAD_FOLDER):
-                remaining_path = os.path.join(UPLOAD_FOLDER, remaining_file)
-                if os.path.isfile(remaining_path):
-                    os.remove(remaining_path)
-                    print(f"Deleted remaining file: {remaining_path}")
-            
-        except Exception as e:
-            print(f"Error during cleanup: {e}")
+        # Reports built in memory are handed out once and never touch disk
+        file_data = report_store.pop(filename)
+        if file_data is not None:
+            return send_report(file_data, original_name)
         
-        # Create a BytesIO object to send the file data
-        from io import BytesIO
-        file_obj = BytesIO(file_data)
+        file_path = os.path.join(UPLOAD_FOLDER, filename)
+        if not os.path.exists(file_path):
+            return jsonify({'error': 'File not found'}), 404
         
-        # Send the file from memory
-        return send_file(
-            file_obj,
-            as_attachment=True,
-            download_name=original_name,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
+        # Stream the file from disk; it is deleted once the download completes
+        return stream_report(file_path, filename, original_name)
         
     except Exception as e:
         print(f"Error downloading file: {e}")
         return jsonify({'error': 'Error downloading file'}), 500
 
+@app.route('/stats')
+def stats():
+    return jsonify({
+        'jobs': job_queue.stats(),
+        'cache': report_cache.stats(),
+        'store': report_store.stats(),
+        'cleanup': file_reaper.stats()
+    })
+
+@app.route('/metrics')
+def metrics():
+    jobs = job_queue.stats()
+    cache = report_cache.stats()
+    store = report_store.stats()
+    cleanup = file_reaper.stats()
+    counters = [
+        ('payroll_jobs_total', 'Report jobs, by outcome.', jobs[outcome], {'outcome': outcome})
+        for outcome in ('submitted', 'rejected', 'succeeded', 'failed')
+    ] + [
+        ('payroll_report_cache_lookups_total', 'Report cache lookups, by result.', cache['hits'], {'result': 'hit'}),
+        ('payroll_report_cache_lookups_total', 'Report cache lookups, by result.', cache['misses'], {'result': 'miss'}),
+        ('payroll_cleanup_files_total', 'Temp files deleted, by cause.', cleanup['reaped'], {'cause': 'expired'}),
+        ('payroll_cleanup_files_total', 'Temp files deleted, by cause.', cleanup['released'], {'cause': 'downloaded'}),
+    ]
+    gauges = [
+        ('payroll_jobs_pending', 'Report jobs queued or running.', jobs['pending'], {}),
+        ('payroll_report_cache_bytes', 'Size of the report cache on disk.', cache['bytes'], {}),
+        ('payroll_report_store_bytes', 'Size of finished reports held in memory.', store['bytes'], {}),
+        ('payroll_cleanup_pending_files', 'Temp files waiting to be deleted.', cleanup['pending'], {}),
+    ]
+    return Response(report_metrics.render(counters, gauges), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -0,0 +1,70 @@
+# bench_report.py
+"""
+Times each phase of the payroll report on synthetic exports of increasing
+size: parse, shift split, pivot, tip allocation, workbook build and save.
+Every size runs in a fresh process so its peak memory is measured on its own.
+
+    python benchmarks/bench_report.py [punches ...] [--write-only] [--multi-sheet] [--chunk-rows=N]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic
+from report_stats import peak_rss_bytes
+from tip import create_final_payroll_report
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000, 500000]
+PHASES = ['parse', 'split', 'pivot', 'allocate', 'build', 'save']
+
+
+def _megabytes(value):
+    return value / (1024 * 1024) if value is not None else None
+
+
+def run(hours_path, tips_path, write_only=False, chunksize=None, multi_sheet=False):
+    """Builds one report. Returns (phase timings, employees, baseline MB, peak MB)."""
+    baseline = peak_rss_bytes()
+    output_path = os.path.join(tempfile.mkdtemp(), 'bench.xlsx')
+    # The report prints per employee progress, which would dominate small runs
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = create_final_payroll_report(hours_path, output_path, tips_path, write_only=write_only, chunksize=chunksize,
+                                            multi_sheet=multi_sheet)
+    if stats.error:
+        raise RuntimeError(stats.error)
+    os.remove(output_path)
+    return stats.phases, stats.counts['employees'], _megabytes(baseline), _megabytes(stats.worker_peak_rss_bytes)
+
+
+def main(argv):
+    write_only = '--write-only' in argv
+    multi_sheet = '--multi-sheet' in argv
+    chunksize = next((int(arg.split('=', 1)[1]) for arg in argv if arg.startswith('--chunk-rows=')), None)
+    sizes = [int(arg) for arg in argv if not arg.startswith('--')] or DEFAULT_SIZES
+    data_dir = tempfile.mkdtemp()
+
+    print(f"{'writer:':<8} {'multi-sheet, parallel' if multi_sheet else 'write-only' if write_only else 'in-memory'}")
+    print(f"{'hours:':<8} {f'{chunksize} punch chunks' if chunksize else 'whole file'}")
+    print(f"{'punches':>8} {'employees':>9} " + ' '.join(f"{phase + ' s':>10}" for phase in PHASES)
+          + f" {'total s':>9} {'peak MB':>8} {'+MB':>7}")
+    for punches in sizes:
+        hours_path, tips_path = synthetic.generate(data_dir, punches)
+        # A fresh process per size keeps one run's memory high-water mark out of the next
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            timings, employees, baseline, peak = executor.submit(run, hours_path, tips_path, write_only, chunksize,
+                                                                       multi_sheet).result()
+        memory = f"{peak:>8.0f} {peak - baseline:>7.0f}" if peak is not None else f"{'n/a':>8} {'n/a':>7}"
+        print(f"{punches:>8} {employees:>9} " + ' '.join(f"{timings[phase]:>10.3f}" for phase in PHASES)
+              + f" {sum(timings.values()):>9.3f} {memory}")
+        os.remove(hours_path)
+        os.remove(tips_path)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
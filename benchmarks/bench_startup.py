@@ -0,0 +1,92 @@
+# bench_startup.py
+"""
+Measures what a new web worker pays before it serves its first report:
+a cold worker imports the app in a fresh interpreter, while a preloaded
+worker is forked from a process that already imported wsgi.py (heavy
+libraries, compiled rules and the warm-up report), as gunicorn does with
+preload_app. Each scenario runs in its own interpreter.
+
+    python benchmarks/bench_startup.py [punches]
+
+The preloaded scenario uses os.fork, so it only runs on Linux and macOS.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Both scripts print one JSON line of timings; report progress output is discarded
+COMMON = """
+import contextlib, io, json, os, sys, time
+sys.path.insert(0, {root!r})
+
+def report_seconds():
+    from tip import create_final_payroll_report
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = create_final_payroll_report({hours!r}, io.BytesIO(), {tips!r})
+    assert stats.error is None, stats.error
+    return time.perf_counter() - start
+"""
+
+COLD = COMMON + """
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+ready = time.perf_counter() - start
+first = report_seconds()
+print(json.dumps({{'startup': ready, 'first': first, 'second': report_seconds()}}))
+"""
+
+PRELOADED = COMMON + """
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    import wsgi
+preload = time.perf_counter() - start
+
+read_end, write_end = os.pipe()
+forked = time.perf_counter()
+pid = os.fork()
+if pid == 0:
+    ready = time.perf_counter() - forked
+    first = report_seconds()
+    os.write(write_end, json.dumps({{'startup': ready, 'first': first, 'second': report_seconds()}}).encode())
+    os._exit(0)
+os.close(write_end)
+timings = json.loads(os.read(read_end, 4096))
+os.waitpid(pid, 0)
+timings['preload'] = preload
+print(json.dumps(timings))
+"""
+
+
+def run(script, hours_path, tips_path):
+    code = script.format(root=ROOT, hours=hours_path, tips=tips_path)
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv):
+    punches = int(argv[0]) if argv else 2000
+    hours_path, tips_path = synthetic.generate(tempfile.mkdtemp(), punches)
+
+    print(f"{punches} punch report")
+    print(f"{'worker':<10} {'master preload s':>16} {'worker start s':>15} {'first report s':>15} {'second report s':>16}")
+    scenarios = [('cold', COLD)] + ([('preloaded', PRELOADED)] if hasattr(os, 'fork') else [])
+    for name, script in scenarios:
+        timings = run(script, hours_path, tips_path)
+        preload = f"{timings['preload']:>16.3f}" if 'preload' in timings else f"{'-':>16}"
+        print(f"{name:<10} {preload} {timings['startup']:>15.3f} {timings['first']:>15.3f} {timings['second']:>16.3f}")
+    os.remove(hours_path)
+    os.remove(tips_path)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,94 @@
+# bench_styles.py
+"""
+Compares the shared style registry with building a new style object per cell
+on a synthetic roster, for both the in-memory and the write-only writer.
+
+    python benchmarks/bench_styles.py [employees]
+"""
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from openpyxl import Workbook
+from openpyxl.styles import Font, Alignment, PatternFill, Border
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from allocation import allocate_tips
+from styles import StyleRegistry
+from payroll import RULES
+from roster import Roster
+from tip import HEADER_STRUCTURE, SALARY_EMPLOYEES, write_payroll_sheet
+from xlsx_stream import stream_payroll_sheet
+
+
+def synthetic_roster(employees, seed=0):
+    """Builds a Roster with random hours for each employee and role column."""
+    rng = np.random.default_rng(seed)
+    columns = RULES.columns
+    names = [f"Employee {i:05d}" for i in range(employees - len(SALARY_EMPLOYEES))] + list(SALARY_EMPLOYEES)
+    # Most employees work one or two roles
+    hours = rng.uniform(0, 80, size=(len(names), len(columns))) * (rng.random((len(names), len(columns))) < 0.15)
+    return Roster(names, list(columns), hours)
+
+
+@contextmanager
+def count_style_objects():
+    """Counts Font/PatternFill/Border/Alignment objects created inside the block."""
+    counts = {'styles': 0}
+    originals = {cls: cls.__init__ for cls in (Font, PatternFill, Border, Alignment)}
+
+    def counting(original):
+        def __init__(self, *args, **kwargs):
+            counts['styles'] += 1
+            original(self, *args, **kwargs)
+        return __init__
+
+    for cls, original in originals.items():
+        cls.__init__ = counting(original)
+    try:
+        yield counts
+    finally:
+        for cls, original in originals.items():
+            cls.__init__ = original
+
+
+def run(roster, allocation, styles, write_only):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.xlsx')
+    with count_style_objects() as counts:
+        start = time.perf_counter()
+        if write_only:
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("Payroll Summary")
+            stream_payroll_sheet(ws, roster, HEADER_STRUCTURE, allocation, SALARY_EMPLOYEES, styles=styles)
+        else:
+            wb = Workbook()
+            ws = wb.active
+            ws.title = "Payroll Summary"
+            write_payroll_sheet(ws, roster, HEADER_STRUCTURE, allocation, styles=styles)
+        built = time.perf_counter()
+        wb.save(path)
+        saved = time.perf_counter()
+    size = os.path.getsize(path)
+    os.remove(path)
+    return counts['styles'], built - start, saved - built, size
+
+
+def main(employees=5000):
+    roster = synthetic_roster(employees)
+    allocation = allocate_tips(roster.hours, roster.columns, roster.employees, 25000, 40000, 9000, 60000, RULES)
+
+    print(f"{employees} employees x {len(roster.columns)} role columns")
+    print(f"{'writer':<12} {'styles':<10} {'style objects':>14} {'build s':>9} {'save s':>9} {'bytes':>10}")
+    for write_only in (False, True):
+        for shared in (False, True):
+            style_objects, build_time, save_time, size = run(roster, allocation, StyleRegistry(shared=shared), write_only)
+            print(f"{'write-only' if write_only else 'in-memory':<12} {'registry' if shared else 'per-cell':<10} "
+                  f"{style_objects:>14} {build_time:>9.2f} {save_time:>9.2f} {size:>10}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
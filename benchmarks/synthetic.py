@@ -0,0 +1,129 @@
+# synthetic.py
+"""
+Generates realistic hours and tips exports for benchmarking.
+
+The hours CSV matches the POS "hours and wages summary" export: First, Last,
+Role, In Time, Out Time and Regular hours, with padded values and the raw
+role names that tip.ROLE_MAP folds together. The tips CSV matches the POS
+tips export: labeled pool rows in the 6 line preamble, then Server / Tip in
+columns 8 and 15 for every server who worked.
+
+    python benchmarks/synthetic.py <output dir> <punches> [employees]
+"""
+import csv
+import os
+import random
+import sys
+
+# Raw POS role names and how often they show up on a punch
+ROLE_WEIGHTS = {
+    'Server': 20, 'Busser': 12, 'Barrista': 8, 'Case': 6, 'Register': 8, 'Runner': 6,
+    'Dishwasher': 6, 'Prep Cook': 5, 'Pasta': 3, 'Salad': 3, 'Grill': 4, 'Kitchen': 2,
+    'Shift Leader': 4, 'Lead': 2, 'Host/Hostess': 5, 'Training': 2, '': 4
+}
+
+# (start window, length range) in minutes after midnight
+SHIFTS = {
+    'lunch': ((9 * 60, 11 * 60), (4 * 60, 6 * 60)),
+    'dinner': ((15 * 60, 17 * 60 + 30), (5 * 60, 7 * 60)),
+    'double': ((10 * 60, 12 * 60), (9 * 60, 11 * 60)),
+    'close': ((20 * 60, 22 * 60), (3 * 60, 5 * 60)),  # Runs past midnight
+}
+SHIFT_WEIGHTS = {'lunch': 40, 'dinner': 40, 'double': 15, 'close': 5}
+
+FIRST_NAMES = ['Maria', 'Jose', 'Ana', 'Luis', 'Sofia', 'Carlos', 'Emma', 'Noah', 'Olivia', 'Liam',
+               'Ava', 'Mateo', 'Mia', 'Diego', 'Isabella', 'Lucas', 'Camila', 'Ethan', 'Valeria', 'Leo']
+LAST_NAMES = ['Garcia', 'Martinez', 'Lopez', 'Smith', 'Johnson', 'Hernandez', 'Brown', 'Gonzalez',
+              'Perez', 'Davis', 'Rodriguez', 'Wilson', 'Sanchez', 'Ramirez', 'Torres', 'Flores']
+
+GENERAL_POOL_LABEL = 'Total Allocated General Pool'
+SERVER_CONTRIBUTION_LABEL = 'Server Contribution to General Pool'
+SERVER_CASH_CC_LABEL = 'Less Server Cash & CC Tips'
+TIPS_WIDTH = 16  # Columns in the tips export
+
+
+def _clock(minutes):
+    """Minutes after midnight as the POS's 12 hour "h:MMAM" format."""
+    hour, minute = divmod(minutes % (24 * 60), 60)
+    return f"{hour % 12 or 12}:{minute:02d}{'AM' if hour < 12 else 'PM'}"
+
+
+def _roster(employees, rng):
+    """Unique (first, last) names, each with the one or two roles that employee usually works."""
+    roles, weights = list(ROLE_WEIGHTS), list(ROLE_WEIGHTS.values())
+    roster = []
+    for i in range(employees):
+        first = FIRST_NAMES[i % len(FIRST_NAMES)]
+        last = LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        repeat = i // (len(FIRST_NAMES) * len(LAST_NAMES))
+        if repeat:
+            last = f"{last}{repeat}"  # Keep names unique on large rosters
+        roster.append((first, last, rng.choices(roles, weights, k=rng.choice((1, 1, 2)))))
+    return roster
+
+
+def write_hours_csv(path, punches, employees=None, seed=0):
+    """
+    Writes an hours export with the given number of punches spread over the
+    roster and returns the "First Last" names of everyone who worked as a server.
+    """
+    rng = random.Random(seed)
+    roster = _roster(employees or max(20, punches // 12), rng)
+    shift_names, shift_weights = list(SHIFT_WEIGHTS), list(SHIFT_WEIGHTS.values())
+    servers = set()
+
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['First', ' Last', 'Role', 'In Time', 'Out Time', 'Regular hours'])
+        for _ in range(punches):
+            first, last, roles = rng.choice(roster)
+            role = rng.choice(roles)
+            (earliest, latest), (shortest, longest) = SHIFTS[rng.choices(shift_names, shift_weights)[0]]
+            start = rng.randrange(earliest, latest, 15)
+            length = rng.randrange(shortest, longest + 1, 15)
+            if role == 'Server':
+                servers.add(f"{first} {last}")
+            writer.writerow([f"{first} ", f" {last}", role, f" {_clock(start)}", f"{_clock(start + length)} ",
+                             round(length / 60 - (0.5 if length > 6 * 60 else 0), 2)])
+    return sorted(servers)
+
+
+def write_tips_csv(path, servers, seed=0):
+    """Writes a tips export with pool totals sized to the number of servers and a tip for each server."""
+    rng = random.Random(seed)
+    scale = max(1, len(servers))
+
+    def row(fields=None):
+        """A tips export line with the given {column: value} fields filled in."""
+        values = [''] * TIPS_WIDTH
+        for column, value in (fields or {}).items():
+            values[column] = value
+        return values
+
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(row({0: 'Tips Report'}))
+        writer.writerow(row({1: GENERAL_POOL_LABEL, 2: round(45 * scale, 2), 3: round(80 * scale, 2)}))
+        writer.writerow(row({1: SERVER_CONTRIBUTION_LABEL, 3: round(25 * scale, 2)}))
+        writer.writerow(row({1: SERVER_CASH_CC_LABEL, 3: round(150 * scale, 2)}))
+        writer.writerow(row())
+        writer.writerow(row())
+        writer.writerow(row({8: 'Server', 15: 'Tip'}))
+        for name in servers:
+            first, last = name.split(' ', 1)
+            writer.writerow(row({8: f"{last}, {first}", 15: round(rng.uniform(50, 400), 2)}))
+
+
+def generate(directory, punches, employees=None, seed=0):
+    """Writes hours_<punches>.csv and tips_<punches>.csv for one synthetic period and returns their paths."""
+    os.makedirs(directory, exist_ok=True)
+    hours_path = os.path.join(directory, f"hours_{punches}.csv")
+    tips_path = os.path.join(directory, f"tips_{punches}.csv")
+    servers = write_hours_csv(hours_path, punches, employees, seed)
+    write_tips_csv(tips_path, servers, seed)
+    return hours_path, tips_path
+
+
+if __name__ == '__main__':
+    hours, tips = generate(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]) if len(sys.argv) > 3 else None)
+    print(f"Wrote {hours} and {tips}")
@@ -0,0 +1,51 @@
+# gunicorn.conf.py
+"""
+Production serving profile:
+
+    gunicorn -c gunicorn.conf.py
+
+Every setting can be overridden through the environment (PORT,
+GUNICORN_THREADS, GUNICORN_TIMEOUT) or on the command line, except the
+single worker process (see on_starting).
+"""
+import os
+import sys
+
+wsgi_app = 'wsgi:app'
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+
+# wsgi.py is imported once in the master: heavy imports, compiled payroll rules
+# and the warm-up report are shared copy-on-write by every worker it forks
+preload_app = True
+
+# Report jobs, their status and in-memory downloads live in the worker process
+# that took the upload, and gunicorn can't send a client's later requests to
+# the same worker, so exactly one worker runs per instance. Reports run in
+# parallel in its REPORT_WORKERS processes and requests in its threads; scale
+# out with more instances behind a sticky load balancer.
+workers = 1
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# Large uploads are parsed in the request for /api/compute and /api/periods
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Workers are never recycled (max_requests stays 0): the one worker holds the
+# job queue, in-memory downloads and cleanup schedule, which a restart would lose
+
+accesslog = '-'
+
+
+def on_starting(server):
+    # workers above ignores WEB_CONCURRENCY, which some platforms set on their
+    # own; this catches -w / --workers on the command line or in
+    # GUNICORN_CMD_ARGS, which override this file, before any worker is forked
+    if server.cfg.workers != 1:
+        server.log.error(
+            f"Refusing to start {server.cfg.workers} workers: report jobs and downloads are held by the worker "
+            f"that took the upload, so /jobs and /download would 404 on the others. Run one worker and "
+            f"raise REPORT_WORKERS and GUNICORN_THREADS instead."
+        )
+        sys.exit(1)
@@ -0,0 +1,181 @@
+# hours_reader.py
+import io
+from datetime import datetime, time
+from functools import lru_cache
+from importlib.util import find_spec
+
+import numpy as np
+import pandas as pd
+
+# --- Hours File Layout ---
+HOURS_COLUMNS = ['First', 'Last', 'Role', 'In Time', 'Out Time', 'Regular hours']  # The only columns the report reads
+HOURS_DTYPES = {'Regular hours': 'float64'}  # Everything else is read as a categorical
+TIME_FORMAT = '%I:%M%p'
+NO_ROLE = 'No Role'
+
+# pyarrow parses CSVs on several threads; pandas' C parser is the fallback
+CSV_ENGINE = 'pyarrow' if find_spec('pyarrow') is not None else 'c'
+
+
+def _seekable(source):
+    """Paths pass through; streams that can't be rewound are read into memory."""
+    if hasattr(source, 'read') and not (hasattr(source, 'seekable') and source.seekable()):
+        data = source.read()
+        return io.BytesIO(data) if isinstance(data, bytes) else io.StringIO(data)
+    return source
+
+
+def _header(source):
+    """Maps stripped column names to the export's raw names (e.g. 'Last' -> ' Last')."""
+    start = source.tell() if hasattr(source, 'tell') else None
+    columns = pd.read_csv(source, nrows=0).columns
+    if start is not None:
+        source.seek(start)
+    return {str(name).strip(): name for name in columns}
+
+
+def _per_row(values, column, missing):
+    """Expands one value per category of a categorical column to every row, with missing for blanks."""
+    return np.append(values, missing)[column.cat.codes.to_numpy()]
+
+
+def _stripped_categories(column):
+    return column.cat.categories.astype(str).str.strip()
+
+
+def _team_members(first, last):
+    """ "First Last" for every row, joined once per distinct name pair instead of once per punch."""
+    first_names = np.append(_stripped_categories(first).to_numpy(dtype=object), None)
+    last_names = np.append(_stripped_categories(last).to_numpy(dtype=object), None)
+    # Code -1 (blank) becomes the trailing None of each name list
+    first_codes = first.cat.codes.to_numpy().astype(np.int64) % len(first_names)
+    last_codes = last.cat.codes.to_numpy().astype(np.int64) % len(last_names)
+    pairs, rows = np.unique(first_codes * len(last_names) + last_codes, return_inverse=True)
+    names = np.array([
+        np.nan if first_name is None or last_name is None else f"{first_name} {last_name}"
+        for first_name, last_name in zip(first_names[pairs // len(last_names)], last_names[pairs % len(last_names)])
+    ], dtype=object)
+    return names[rows]
+
+
+def _roles(role, role_map):
+    """Cleaned roles as a categorical: blanks become No Role, then role_map folds POS names together."""
+    cleaned = _per_row(_stripped_categories(role).map(lambda name: role_map.get(name, name)).to_numpy(dtype=object),
+                       role, NO_ROLE)
+    return pd.Categorical(cleaned)
+
+
+@lru_cache(maxsize=4096)
+def clock_minutes(text):
+    """
+    Minutes since midnight of one "h:MMAM" punch time. Memoized: exports only
+    use a few hundred distinct times, so every file, chunk and correction after
+    the first finds its times already parsed.
+    """
+    parsed = datetime.strptime(text, TIME_FORMAT)
+    return parsed.hour * 60 + parsed.minute
+
+
+def format_clock_minutes(minutes):
+    """A time in minutes since midnight in the export's own format, None when missing."""
+    return None if pd.isna(minutes) else time(*divmod(int(minutes), 60)).strftime(TIME_FORMAT)
+
+
+def _clock_times(column):
+    """
+    Punch times as nullable Int16 minutes since midnight: each distinct
+    "h:MMAM" string is parsed once and the codes map it back onto every row.
+    """
+    minutes = [clock_minutes(text) if text else -1 for text in _stripped_categories(column)]
+    per_row = _per_row(np.array(minutes, dtype=np.int16), column, -1).astype(np.int16)
+    return pd.arrays.IntegerArray(per_row, per_row < 0)
+
+
+def read_hours_csv(source, role_map):
+    """
+    Reads an hours export (path or buffer) into a frame with Team Member, a
+    categorical Role, In Time / Out Time in minutes since midnight (nullable
+    Int16) and float Regular hours columns. Only the columns the report uses are read, and the text ones as
+    categoricals, so names, roles and times are cleaned once per distinct
+    value rather than once per punch.
+    """
+    source = _seekable(source)
+    raw_names = _header(source)
+    usecols = [raw_names[name] for name in HOURS_COLUMNS if name in raw_names]
+    dtypes = {name: HOURS_DTYPES.get(name.strip(), 'category') for name in usecols}
+    df = pd.read_csv(source, usecols=usecols, dtype=dtypes, engine=CSV_ENGINE)
+    df.columns = df.columns.str.strip()
+    return _clean(df, role_map)
+
+
+def iter_hours_csv(source, role_map, chunksize):
+    """
+    Reads an hours export chunksize rows at a time and yields each chunk
+    cleaned like read_hours_csv, so memory holds one chunk of punches at a
+    time. Uses pandas' C parser, since pyarrow can't read in chunks.
+    """
+    source = _seekable(source)
+    raw_names = _header(source)
+    usecols = [raw_names[name] for name in HOURS_COLUMNS if name in raw_names]
+    dtypes = {name: HOURS_DTYPES.get(name.strip(), 'category') for name in usecols}
+    with pd.read_csv(source, usecols=usecols, dtype=dtypes, chunksize=chunksize) as chunks:
+        for df in chunks:
+            df.columns = df.columns.str.strip()
+            yield _clean(df, role_map)
+
+
+def check_punch(row, label='punch'):
+    """
+    Raises ValueError unless row is a dict with exactly the HOURS_COLUMNS
+    fields, times like 9:30AM and a number of hours. Times and hours may be
+    blank, as they can be in an export. label names the punch in the error.
+    """
+    if not isinstance(row, dict):
+        raise ValueError(f"{label} must be an object with {', '.join(HOURS_COLUMNS)}")
+    missing = [name for name in HOURS_COLUMNS if name not in row]
+    if missing:
+        raise ValueError(f"{label} is missing {', '.join(missing)}")
+    unknown = [str(name) for name in row if name not in HOURS_COLUMNS]
+    if unknown:
+        raise ValueError(f"{label} has unknown fields {', '.join(unknown)}")
+    for name in ('In Time', 'Out Time'):
+        value = row[name]
+        if value is None or value == '':
+            continue
+        try:
+            clock_minutes(value.strip())
+        except (AttributeError, ValueError):
+            raise ValueError(f"{label} has {name} {value!r}, which is not a time like 9:30AM") from None
+    hours = row['Regular hours']
+    if hours is not None and hours != '':
+        try:
+            if isinstance(hours, bool):
+                raise TypeError
+            float(hours)
+        except (TypeError, ValueError):
+            raise ValueError(f"{label} has Regular hours {hours!r}, which is not a number") from None
+
+
+def hours_from_rows(rows, role_map, labels=None):
+    """
+    Cleans punches given as dicts in the export's format (First, Last, Role,
+    In Time, Out Time, Regular hours) exactly like read_hours_csv does.
+    Every punch is checked with check_punch first; labels name them in errors.
+    """
+    rows = list(rows)
+    labels = list(labels) if labels is not None else [f"punch {position + 1}" for position in range(len(rows))]
+    for row, label in zip(rows, labels):
+        check_punch(row, label)
+    df = pd.DataFrame(rows, columns=HOURS_COLUMNS).replace('', np.nan)  # Empty cells, as read_csv sees them
+    df = df.astype({name: HOURS_DTYPES.get(name, 'category') for name in HOURS_COLUMNS})
+    return _clean(df, role_map)
+
+
+def _clean(df, role_map):
+    hours = pd.DataFrame(index=df.index)
+    hours['Team Member'] = _team_members(df['First'], df['Last'])
+    hours['Role'] = _roles(df['Role'], role_map)
+    hours['In Time'] = _clock_times(df['In Time'])
+    hours['Out Time'] = _clock_times(df['Out Time'])
+    hours['Regular hours'] = df['Regular hours']
+    return hours
@@ -0,0 +1,130 @@
+# jobs.py
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+class QueueFullError(Exception):
+    """Raised when too many report jobs are already queued or running."""
+
+
+class JobQueue:
+    """
+    Runs report jobs in a bounded process pool so web requests don't block
+    while pandas and openpyxl do their work. At most max_workers jobs run at
+    once and at most max_pending jobs may be queued or running; anything past
+    that is rejected with QueueFullError. Finished jobs are forgotten after
+    keep_finished seconds. If a worker dies (killed for memory, say) the pool
+    is broken for good, so it is dropped and a new one started for the next job.
+    """
+
+    def __init__(self, max_workers=2, max_pending=10, keep_finished=600):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        self._executor = None
+        self._jobs = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._counters = {'submitted': 0, 'rejected': 0, 'succeeded': 0, 'failed': 0}
+
+    def _get_executor(self):
+        # Created on first use so importing the app never forks worker processes
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _discard_executor(self, executor):
+        """Drops a broken pool so the next submit starts a fresh one."""
+        with self._lock:
+            if self._executor is not executor:
+                return  # Already replaced by another job of the same pool
+            self._executor = None
+        print("A report worker stopped unexpectedly; restarting the worker pool")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _prune(self):
+        cutoff = time.time() - self.keep_finished
+        for job_id, job in list(self._jobs.items()):
+            if job['finished'] and job['finished'] < cutoff:
+                del self._jobs[job_id]
+                self._futures.pop(job_id, None)
+
+    def submit(self, func, *args, on_done=None, keep_result=True, **info):
+        """
+        Queues func(*args) and returns the new job id straight away. Extra keyword
+        arguments are stored with the job and returned by status(). on_done is
+        called with the job dict once the job finishes, successfully or not,
+        before status() reports it as finished, and also gets the exception a
+        failed job raised under 'exception'; if on_done raises, the job fails
+        with its error, since its result can't be used. With keep_result=False the return
+        value is only handed to on_done and not kept on the job.
+        """
+        with self._lock:
+            self._prune()
+            pending = sum(1 for job in self._jobs.values() if not job['finished'])
+            if pending >= self.max_pending:
+                self._counters['rejected'] += 1
+                raise QueueFullError(f"{pending} reports are already in progress, please try again shortly")
+
+            job_id = uuid.uuid4().hex
+            job = {'id': job_id, 'status': 'queued', 'error': None, 'result': None,
+                   'submitted': time.time(), 'finished': None, 'info': info}
+            executor = self._get_executor()
+            try:
+                future = executor.submit(func, *args)
+            except BrokenProcessPool:
+                # The pool broke before its jobs' callbacks could drop it
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                executor = self._get_executor()
+                future = executor.submit(func, *args)
+            self._futures[job_id] = future
+            self._jobs[job_id] = job
+            self._counters['submitted'] += 1
+
+        future.add_done_callback(lambda f: self._finish(job, f, on_done, keep_result, executor))
+        return job_id
+
+    def _finish(self, job, future, on_done, keep_result, executor=None):
+        exception = None
+        try:
+            outcome = {'status': 'done', 'result': future.result(), 'error': None}
+        except Exception as e:
+            exception = e
+            outcome = {'status': 'failed', 'result': None, 'error': str(e)}
+            if isinstance(e, BrokenProcessPool) and executor is not None:
+                self._discard_executor(executor)
+
+        # Callbacks run before the job is reported finished, so pollers never see
+        # a finished job whose follow-up work is still in progress
+        if on_done:
+            try:
+                on_done(dict(job, exception=exception, **outcome))
+            except Exception as e:
+                print(f"Error in job callback for {job['id']}: {e}")
+                outcome = {'status': 'failed', 'result': None, 'error': str(e)}
+        if not keep_result:
+            outcome['result'] = None
+
+        with self._lock:
+            job.update(outcome, finished=time.time())
+            self._counters['succeeded' if outcome['status'] == 'done' else 'failed'] += 1
+
+    def status(self, job_id):
+        """Returns a copy of the job dict, or None if the job is unknown or expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job = dict(job)
+            if job['status'] == 'queued' and self._futures[job_id].running():
+                job['status'] = 'running'
+            return job
+
+    def stats(self):
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if not job['finished'])
+            return dict(self._counters, pending=pending, max_workers=self.max_workers, max_pending=self.max_pending)
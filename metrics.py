@@ -0,0 +1,100 @@
+# metrics.py
+import threading
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels.items()) + '}' if labels else ''
+
+
+class Histogram:
+    """Cumulative Prometheus-style histogram for one label set."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, **labels):
+        for bound, count in zip(self.buckets, self.counts):
+            yield f"{name}_bucket{_labels(**labels, le=bound)} {count}"
+        yield f"{name}_bucket{_labels(**labels, le='+Inf')} {self.count}"
+        yield f"{name}_sum{_labels(**labels)} {self.sum}"
+        yield f"{name}_count{_labels(**labels)} {self.count}"
+
+
+class ReportMetrics:
+    """
+    Aggregates the ReportStats of finished reports (per-phase latency
+    histograms, row/cell/byte totals and the largest worker peak RSS seen) and renders
+    them, along with any counters and gauges the caller passes in, in the
+    Prometheus text exposition format.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._phases = {}
+        self._report_seconds = Histogram(buckets)
+        self._reports = {'ok': 0, 'error': 0}
+        self._counts = {}
+        self._worker_peak_rss_bytes = 0
+        self._lock = threading.Lock()
+
+    def observe(self, stats):
+        with self._lock:
+            self._reports['error' if stats.error else 'ok'] += 1
+            self._report_seconds.observe(stats.total_seconds)
+            for phase, seconds in stats.phases.items():
+                self._phases.setdefault(phase, Histogram(self.buckets)).observe(seconds)
+            for name, value in stats.counts.items():
+                self._counts[name] = self._counts.get(name, 0) + value
+            self._worker_peak_rss_bytes = max(self._worker_peak_rss_bytes, stats.worker_peak_rss_bytes or 0)
+
+    def render(self, counters=(), gauges=()):
+        """
+        Returns the exposition text. counters and gauges are extra
+        (name, help, value, labels) tuples; samples sharing a name are grouped.
+        """
+        with self._lock:
+            lines = [
+                '# HELP payroll_report_phase_seconds Time spent in each phase of building a report.',
+                '# TYPE payroll_report_phase_seconds histogram',
+            ]
+            for phase, histogram in self._phases.items():
+                lines += histogram.lines('payroll_report_phase_seconds', phase=phase)
+            lines += [
+                '# HELP payroll_report_seconds Time spent building a whole report.',
+                '# TYPE payroll_report_seconds histogram',
+                *self._report_seconds.lines('payroll_report_seconds'),
+            ]
+            report_counters = [('payroll_reports_total', 'Reports built, by outcome.', count, {'outcome': outcome})
+                               for outcome, count in self._reports.items()]
+            report_counters += [('payroll_report_items_total', 'Rows, cells and bytes processed by reports.', value, {'item': name})
+                                for name, value in self._counts.items()]
+            peak = [('payroll_worker_peak_rss_bytes', 'Largest lifetime peak RSS of a report worker process '
+                     '(covers every report the worker built, not one report).', self._worker_peak_rss_bytes, {})]
+
+        lines += self._samples('counter', report_counters + list(counters))
+        lines += self._samples('gauge', peak + list(gauges))
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _samples(kind, samples):
+        lines, seen = [], set()
+        for name, help_text, _, _ in samples:
+            if name in seen:
+                continue
+            seen.add(name)
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            lines += [f"{name}{_labels(**labels)} {value}" for sample_name, _, value, labels in samples if sample_name == name]
+        return lines
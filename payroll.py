@@ -0,0 +1,223 @@
+# payroll.py
+from collections import namedtuple
+from types import MappingProxyType
+
+import pandas as pd
+from shifts import split_shifts
+from hours_reader import read_hours_csv, iter_hours_csv
+from allocation import allocate_tips
+from tips_parser import parse_tips_file
+from report_stats import ReportStats
+from roster import Roster, build_roster
+from rules import load_rules
+
+# --- Payroll Rules (allocation rates, salary employees, report columns, role cleanup) ---
+# Loaded from payroll_rules.json (or PAYROLL_RULES_FILE), validated and compiled once per process
+RULES = load_rules()
+ALLOCATION_TABLE = RULES.allocation_table
+SALARY_EMPLOYEES = RULES.salary_employees
+HEADER_STRUCTURE = RULES.header_structure
+ROLE_MAP = RULES.role_map
+SPLIT_ROLES = RULES.split_roles  # Split into Lunch / Dinner
+
+
+class PayrollResult(namedtuple('PayrollResult', ['roster', 'allocation', 'servers_tips'])):
+    """
+    Everything a report shows, computed without building a workbook.
+
+    roster: the Roster of employees x report columns hours
+    allocation: TipAllocation with the three tip pools per column (role_tips)
+        and the per-employee tip matrix (employee_tips), or None without tips
+    servers_tips: read-only {"First Last": tip} server overrides from the tips export
+
+    The roster and allocation arrays are the result's own read-only copies, so
+    a renderer can't reach back into the state it came from (such as a saved
+    PeriodState).
+    """
+    __slots__ = ()
+
+    def __reduce__(self):
+        # Batch workers send results between processes; mappingproxy can't be pickled
+        return (payroll_result, (self.roster, self.allocation, dict(self.servers_tips)))
+
+    @property
+    def hours(self):
+        """The final_summary pivot as a DataFrame, built on each access for renderers that need pandas."""
+        return self.roster.to_frame()
+
+    @property
+    def role_columns(self):
+        return list(self.roster.columns)
+
+    @property
+    def role_totals(self):
+        """Hours per report column, the ROLE TOTALS row."""
+        return self.roster.role_totals()
+
+    @property
+    def total_hours(self):
+        return self.roster.hours.sum(axis=1).sum()
+
+
+def payroll_result(roster, allocation, servers_tips):
+    """Builds a PayrollResult with its own read-only copies of the roster, tip arrays and server tips."""
+    if allocation is not None:
+        arrays = {name: value.copy() for name, value in allocation._asdict().items() if hasattr(value, 'setflags')}
+        for value in arrays.values():
+            value.setflags(write=False)
+        allocation = allocation._replace(**arrays)
+    hours = roster.hours.copy()
+    hours.setflags(write=False)
+    roster = Roster(tuple(roster.employees), tuple(roster.columns), hours)
+    return PayrollResult(roster, allocation, MappingProxyType(dict(servers_tips)))
+
+
+def compute_payroll(csv_file_path, tips_csv_path=None, stats=None, chunksize=None):
+    """
+    Runs steps 1-4 of the report and returns a PayrollResult. Errors reading
+    the hours file are raised to the caller; an unusable tips file leaves the
+    result without an allocation. Phase timings and row counts go to stats.
+    With chunksize the hours file is read and split that many punches at a
+    time (see read_shift_hours), for exports too large to load at once.
+    """
+    stats = stats if stats is not None else ReportStats()
+    if chunksize:
+        shift_rows = read_shift_hours(csv_file_path, chunksize, stats)
+    else:
+        with stats.phase('parse'):
+            df = read_hours_file(csv_file_path)
+        stats.count('hours_rows', len(df))
+
+        # --- 2. Process Each Shift (The Core Logic) ---
+        # Split-role shifts are divided at 5:00 PM for the whole frame at once
+        with stats.phase('split'):
+            shift_rows = split_shifts(df, SPLIT_ROLES)
+        stats.count('shift_rows', len(shift_rows))
+
+    with stats.phase('pivot'):
+        roster = aggregate_hours(shift_rows)
+    stats.count('employees', len(roster.employees))
+
+    allocation, servers_tips = None, {}
+    if tips_csv_path:
+        with stats.phase('allocate'):
+            allocation, servers_tips = allocate_period_tips(roster, tips_csv_path)
+        if allocation is not None:
+            stats.count('unmatched_servers', len(allocation.unmatched_servers))
+    return payroll_result(roster, allocation, {name: server['tip'] for name, server in servers_tips.items()})
+
+
+def read_hours_file(csv_file_path):
+    """Step 1: reads the hours CSV and cleans names, roles and punch times."""
+    # --- 1. Read and Clean Raw Data ---
+    # Only the needed columns are read, and each distinct name, role and time is cleaned once
+    return read_hours_csv(csv_file_path, ROLE_MAP)
+
+
+def read_shift_hours(csv_file_path, chunksize, stats=None):
+    """
+    Steps 1-2 in chunks: reads chunksize punches at a time, splits their
+    shifts and folds them into running hours per Team Member and Role_Shift,
+    so memory grows with the number of employees rather than punches. Returns
+    one row per pair in the same Team Member / Role_Shift / Hours layout as
+    split_shifts, ready for aggregate_hours.
+    """
+    stats = stats if stats is not None else ReportStats()
+    # Per-chunk sums are folded together once they outgrow the running totals, so
+    # each chunk costs about its own size and memory stays within ~2x the result
+    partials, pending_rows, running_rows = [], 0, 0
+    chunks = iter_hours_csv(csv_file_path, ROLE_MAP, chunksize)
+    while True:
+        with stats.phase('parse'):
+            df = next(chunks, None)
+        if df is None:
+            break
+        stats.count('hours_rows', len(df))
+
+        with stats.phase('split'):
+            shift_rows = split_shifts(df, SPLIT_ROLES)
+        stats.count('shift_rows', len(shift_rows))
+
+        with stats.phase('pivot'):
+            partials.append(_sum_shift_hours(shift_rows))
+            pending_rows += len(partials[-1])
+            if pending_rows > running_rows:
+                partials = [_sum_shift_hours(pd.concat(partials, ignore_index=True))]
+                pending_rows, running_rows = 0, len(partials[0])
+
+    if not partials:
+        return pd.DataFrame(columns=['Team Member', 'Role_Shift', 'Hours'])
+    with stats.phase('pivot'):
+        return _sum_shift_hours(pd.concat(partials, ignore_index=True))
+
+
+def _sum_shift_hours(shift_rows):
+    return shift_rows.groupby(['Team Member', 'Role_Shift'], sort=False, as_index=False)['Hours'].sum()
+
+
+def aggregate_hours(shift_rows):
+    """
+    Steps 2.5-3: adds salary employees to the split shifts and totals hours per
+    employee and column. Returns the Roster; Roster.to_frame gives the
+    final_summary pivot.
+    """
+    # --- 2.5. Add Salary Employees ---
+    print("Adding salary employees to payroll...")
+    for employee_name, employee_config in SALARY_EMPLOYEES.items():
+        lunch_hours = employee_config['lunch_hours']
+        dinner_hours = employee_config['dinner_hours']
+        print(f"Adding {employee_name}: {lunch_hours} lunch hours + {dinner_hours} dinner hours = {lunch_hours + dinner_hours} total hours in {employee_config['role']}")
+
+    # --- 3. Aggregate Data ---
+    # Kitchen and other unsplit roles get the full hours; split roles get _Lunch / _Dinner rows
+    # Employees are interned and their hours added into one employees x columns matrix
+    salary_rows = pd.DataFrame(RULES.salary_rows, columns=['Team Member', 'Role_Shift', 'Hours'])
+    summary_df = pd.concat([shift_rows, salary_rows], ignore_index=True)
+    return build_roster(summary_df, RULES.columns)
+
+
+def allocate_period_tips(roster, tips_csv_path):
+    """
+    Step 4: reads the tips export and allocates every tip pool over the
+    roster's hours. Returns the TipAllocation (None if the file can't be used)
+    and the server tips.
+    """
+    # --- 4. Read Tips and Calculate Tip Pools ---
+    allocation, servers_tips = None, {}
+    try:
+        # Server tips and pool totals come from a single pass over the file
+        tips = parse_tips_file(tips_csv_path)
+        servers_tips = tips.servers_tips
+        lunch_tips_total = tips.lunch_tips_total
+        dinner_tips_total = tips.dinner_tips_total
+        server_contribution_total = tips.server_contribution_total
+        server_cash_cc_tips = tips.server_cash_cc_tips
+        print(servers_tips)
+        
+        print(f"Found tips - Lunch: ${lunch_tips_total:.2f}, Dinner: ${dinner_tips_total:.2f}, Server Contribution: ${server_contribution_total:.2f}, Server Cash & CC: ${server_cash_cc_tips:.2f}")
+        
+        # --- Allocate all tip pools at once ---
+        allocation = allocate_tips(
+            roster.hours, list(roster.columns), roster.employees,
+            lunch_tips_total, dinner_tips_total, server_contribution_total, server_cash_cc_tips,
+            RULES, servers_tips
+        )
+        lunch_tip_total, dinner_tip_total, server_tip_total = allocation.role_tips.sum(axis=1)
+        final_grand_total = lunch_tip_total + dinner_tip_total + server_tip_total
+
+        for employee_name, server_tip in allocation.matched_servers.items():
+            print(f"Corrected server tip for {employee_name} is {server_tip}")
+        for server, server_tip in allocation.unmatched_servers.items():
+            print(f"Warning: no employee matches server '{server}'; their tip of ${server_tip:.2f} was not applied")
+        
+        print(f"Lunch tips calculated: ${lunch_tip_total:.2f}")
+        print(f"Dinner tips general calculated: ${dinner_tip_total:.2f}")
+        print(f"Dinner tips servers calculated: ${server_tip_total:.2f}")
+        print(f"GRAND TOTAL of all tips: ${final_grand_total:.2f}")
+        
+    except FileNotFoundError:
+        print(f"Warning: Tips file '{tips_csv_path}' not found. Skipping tip calculations.")
+    except Exception as e:
+        print(f"Error processing tips file: {e}")
+
+    return allocation, servers_tips
@@ -0,0 +1,236 @@
+# period_state.py
+import os
+import pickle
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+from allocation import allocate_tips, SERVER_COLUMN
+from hours_reader import hours_from_rows
+from payroll import RULES, ROLE_MAP, SPLIT_ROLES, read_hours_file, aggregate_hours, payroll_result
+from roster import roster_from_frame
+from shifts import split_shifts
+from tips_parser import parse_tips_file
+
+STATE_VERSION = 2  # 2: punch times are minutes since midnight
+
+_local_lock = threading.Lock()  # Without fcntl, corrections are only serialized within this process
+
+
+@contextmanager
+def period_lock(path):
+    """
+    Holds an exclusive lock on a saved period for a read-modify-write
+    correction, across threads and processes (fcntl.flock). The lock is taken
+    on a <path>.lock file beside the state, since save() replaces the state
+    file itself and a lock on the replaced file would guard nothing.
+    """
+    if fcntl is None:
+        with _local_lock:
+            yield
+        return
+    with open(f"{path}.lock", 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _allocate(hours, columns, tips):
+    return allocate_tips(
+        hours[columns].to_numpy(), columns, hours.index,
+        tips.lunch_tips_total, tips.dinner_tips_total, tips.server_contribution_total, tips.server_cash_cc_tips,
+        RULES, tips.servers_tips
+    )
+
+
+def _punch_id(value):
+    """A punch id from a correction: an int, or a string of digits as JSON object keys are."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    raise ValueError(f"{value!r} is not a punch id")
+
+
+def expire_period_states(directory, max_age):
+    """
+    Deletes the saved periods in directory that weren't saved or corrected in
+    the last max_age seconds, with their lock files, plus lock and temp files
+    left behind by periods that are gone. Returns how many periods were deleted.
+    """
+    now = time.time()
+    expired = 0
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        try:
+            if name.endswith('.pkl') and now - os.path.getmtime(path) > max_age:
+                # Under the lock, so a correction in progress finishes (and renews the period) first
+                with period_lock(path):
+                    if now - os.path.getmtime(path) > max_age:
+                        os.remove(path)
+                        if fcntl is not None:
+                            os.remove(f"{path}.lock")
+                        expired += 1
+            elif name.endswith('.tmp') and now - os.path.getmtime(path) > max_age:
+                os.remove(path)
+            elif name.endswith('.pkl.lock') and not os.path.exists(path[:-len('.lock')]):
+                os.remove(path)
+        except FileNotFoundError:
+            continue  # Removed by a sweep in another process
+    return expired
+
+
+class PeriodState:
+    """
+    The intermediate state of one pay period, kept so corrections don't need a
+    full recompute: the cleaned punches (indexed by punch id, the row number
+    in the original export), the final_summary hours pivot, the role totals
+    and the parsed tips with their allocation.
+
+    apply() takes added, removed and edited punches, rebuilds the pivot rows
+    of just the employees they touch, updates the role totals and reallocates
+    tips only for the columns whose hours changed. The result matches a full
+    recompute of the corrected export.
+    """
+
+    def __init__(self, punches, hours, tips=None, allocation=None):
+        self.punches = punches
+        self.hours = hours
+        self.role_totals = hours.drop(columns='Total Hours').sum()
+        self.tips = tips
+        self.allocation = allocation
+        self.fingerprint = RULES.fingerprint
+
+    @classmethod
+    def build(cls, csv_file_path, tips_csv_path=None):
+        """Computes the state of a period from its hours export and optional tips export."""
+        punches = read_hours_file(csv_file_path)
+        punches['Role'] = punches['Role'].astype(object)  # Corrections may bring new roles
+        hours = aggregate_hours(split_shifts(punches, SPLIT_ROLES)).to_frame()
+        tips = parse_tips_file(tips_csv_path) if tips_csv_path else None
+        allocation = _allocate(hours, list(hours.columns[:-1]), tips) if tips else None
+        return cls(punches, hours, tips, allocation)
+
+    def result(self):
+        """The period as a PayrollResult, ready for any renderer."""
+        servers_tips = {name: server['tip'] for name, server in self.tips.servers_tips.items()} if self.tips else {}
+        return payroll_result(roster_from_frame(self.hours), self.allocation, servers_tips)
+
+    def employee_punches(self, employee_name):
+        """The cleaned punches of one employee, indexed by punch id."""
+        return self.punches[self.punches['Team Member'] == employee_name]
+
+    def apply(self, added=(), removed=(), edited=None):
+        """
+        Applies a correction and returns the updated PayrollResult. added is a
+        list of punches and edited a {punch id: punch} dict, both in the export's
+        format (First, Last, Role, In Time, Out Time, Regular hours); removed is a
+        list of punch ids. Raises KeyError for unknown punch ids and ValueError
+        for a malformed correction (see hours_reader.check_punch); the state is
+        left unchanged either way.
+        """
+        added = () if added is None else added
+        removed = () if removed is None else removed
+        if not isinstance(added, (list, tuple)):
+            raise ValueError('added must be a list of punches')
+        if not isinstance(removed, (list, tuple)):
+            raise ValueError('removed must be a list of punch ids')
+        if edited is not None and not isinstance(edited, dict):
+            raise ValueError('edited must map punch ids to punches')
+        edited = {_punch_id(punch_id): row for punch_id, row in (edited or {}).items()}
+        removed = [_punch_id(punch_id) for punch_id in removed]
+        both = sorted(set(edited) & set(removed))
+        if both:
+            raise ValueError(f"punch ids {', '.join(map(str, both))} are both edited and removed")
+        missing = [punch_id for punch_id in list(edited) + removed if punch_id not in self.punches.index]
+        if missing:
+            raise KeyError(f"Unknown punch ids: {', '.join(map(str, missing))}")
+
+        changed_ids = list(edited) + removed
+        affected = set(self.punches.loc[changed_ids, 'Team Member'].dropna())
+
+        # Edited punches keep their position so sums run in the same order as a full recompute
+        replacements = []
+        if edited:
+            labels = [f"edited punch {punch_id}" for punch_id in edited]
+            replacements.append(hours_from_rows(edited.values(), ROLE_MAP, labels).set_axis(list(edited)))
+        if added:
+            next_id = int(self.punches.index.max()) + 1 if len(self.punches) else 0
+            labels = [f"added punch {position + 1}" for position in range(len(added))]
+            new_rows = hours_from_rows(added, ROLE_MAP, labels)
+            replacements.append(new_rows.set_axis(range(next_id, next_id + len(new_rows))))
+        for rows in replacements:
+            rows['Role'] = rows['Role'].astype(object)
+            affected.update(rows['Team Member'].dropna())
+
+        punches = self.punches.drop(index=changed_ids)
+        if replacements:
+            punches = pd.concat([punches] + replacements).sort_index()
+        self.punches = punches
+        self._update_hours(affected)
+        return self.result()
+
+    def _update_hours(self, affected):
+        affected_punches = self.punches[self.punches['Team Member'].isin(affected)]
+        recomputed = aggregate_hours(split_shifts(affected_punches, SPLIT_ROLES)).to_frame()
+        recomputed = recomputed[recomputed.index.isin(affected)]
+
+        old_rows = self.hours[self.hours.index.isin(affected)]
+        hours = pd.concat([self.hours.drop(index=old_rows.index), recomputed]).sort_index()
+        role_columns = list(hours.columns[:-1])
+        self.role_totals = self.role_totals - old_rows[role_columns].sum() + recomputed[role_columns].sum()
+
+        previous_hours = self.hours
+        self.hours = hours
+        if self.tips is None:
+            return
+
+        # Only columns where a touched employee has hours can change; the Server
+        # column also carries per-employee overrides, so it follows the roster
+        touched = (old_rows[role_columns] != 0).any() | (recomputed[role_columns] != 0).any()
+        if SERVER_COLUMN in touched.index and not hours.index.equals(previous_hours.index):
+            touched[SERVER_COLUMN] = True
+        touched_columns = [column for column in role_columns if touched[column]]
+
+        old_tips = pd.DataFrame(self.allocation.employee_tips, index=previous_hours.index, columns=role_columns)
+        employee_tips = old_tips.reindex(hours.index, fill_value=0.0).to_numpy()
+        role_tips = np.array(self.allocation.role_tips)
+        if touched_columns:
+            partial = _allocate(hours, touched_columns, self.tips)
+            positions = [role_columns.index(column) for column in touched_columns]
+            employee_tips[:, positions] = partial.employee_tips
+            role_tips[:, positions] = partial.role_tips
+        self.allocation = self.allocation._replace(
+            employees=list(hours.index), role_tips=role_tips, employee_tips=employee_tips
+        )
+        if SERVER_COLUMN in touched_columns:
+            # Servers were matched against the new roster
+            self.allocation = self.allocation._replace(
+                matched_servers=partial.matched_servers, unmatched_servers=partial.unmatched_servers
+            )
+
+    def save(self, path):
+        """Writes the state atomically so a crash never leaves a half-written period."""
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((STATE_VERSION, self), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Reads a saved state. Raises ValueError if it was built by another version or rules file."""
+        with open(path, 'rb') as f:
+            version, state = pickle.load(f)
+        if version != STATE_VERSION or state.fingerprint != RULES.fingerprint:
+            raise ValueError('Saved period state is out of date, rebuild it from the exports')
+        return state
@@ -0,0 +1,90 @@
+# reaper.py
+import heapq
+import itertools
+import os
+import threading
+import time
+
+
+class FileReaper:
+    """
+    Deletes temporary files once their deadline passes. Every scheduled path
+    goes on one heap of (deadline, path) served by a single worker thread,
+    so a burst of uploads costs heap entries instead of sleeping threads.
+    Paths can be scheduled under an owner (such as a report's download name)
+    so release(owner) removes that job's files without touching anyone else's.
+    """
+
+    def __init__(self):
+        self._heap = []  # (deadline, sequence, path)
+        self._owners = {}  # owner -> set of paths
+        self._path_owners = {}  # path -> owner
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self.reaped = 0
+        self.released = 0
+        self.errors = 0
+
+    def _ensure_worker(self):
+        # Started on first use so importing the app doesn't spawn threads
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='file-reaper', daemon=True)
+            self._thread.start()
+
+    def schedule(self, path, delay=300, owner=None):
+        """Deletes path after delay seconds, or earlier when its owner is released."""
+        with self._condition:
+            heapq.heappush(self._heap, (time.time() + delay, next(self._sequence), path))
+            if owner is not None:
+                self._owners.setdefault(owner, set()).add(path)
+                self._path_owners[path] = owner
+            self._ensure_worker()
+            self._condition.notify()
+
+    def release(self, owner):
+        """Deletes every file scheduled under owner right away and returns how many were removed."""
+        with self._condition:
+            paths = self._owners.pop(owner, set())
+            if paths:
+                for path in paths:
+                    del self._path_owners[path]
+                self._heap = [entry for entry in self._heap if entry[2] not in paths]
+                heapq.heapify(self._heap)
+        removed = sum(1 for path in paths if self._remove(path))
+        with self._condition:
+            self.released += removed
+        return removed
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            print(f"Error cleaning up {path}: {e}")
+            with self._condition:
+                self.errors += 1
+            return False
+        print(f"Cleaned up: {path}")
+        return True
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._heap or self._heap[0][0] > time.time():
+                    self._condition.wait(self._heap[0][0] - time.time() if self._heap else None)
+                _, _, path = heapq.heappop(self._heap)
+                owner = self._path_owners.pop(path, None)
+                if owner is not None:
+                    self._owners[owner].discard(path)
+                    if not self._owners[owner]:
+                        del self._owners[owner]
+            if self._remove(path):
+                with self._condition:
+                    self.reaped += 1
+
+    def stats(self):
+        with self._condition:
+            return {'pending': len(self._heap), 'owners': len(self._owners),
+                    'reaped': self.reaped, 'released': self.released, 'errors': self.errors}
@@ -0,0 +1,152 @@
+# renderers.py
+import importlib.util
+import json
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from allocation import POOLS
+
+# render(result, target, **options) writes a PayrollResult to a path or binary buffer
+Renderer = namedtuple('Renderer', ['render', 'mimetype', 'extension', 'label'])
+RENDERERS = {}
+
+# Parquet output needs one of pandas' Parquet engines: pyarrow (in requirements.txt) or fastparquet.
+# The format is left out where neither is installed.
+PARQUET_ENGINE = next((engine for engine in ('pyarrow', 'fastparquet') if importlib.util.find_spec(engine)), None)
+
+# Labels of the tip pool rows, matching the workbook
+POOL_LABELS = dict(zip(POOLS, ['LUNCH TIPS', 'DINNER TIPS GENERAL', 'DINNER TIPS SERVERS']))
+
+
+def register_renderer(name, mimetype, extension, label=None):
+    """Decorator adding a renderer under a format name such as 'csv'; label is how the format is offered to users."""
+    def register(render_func):
+        RENDERERS[name] = Renderer(render_func, mimetype, extension, label or name)
+        return render_func
+    return register
+
+
+def get_renderer(name):
+    try:
+        return RENDERERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown report format '{name}', expected one of: {', '.join(RENDERERS)}") from None
+
+
+def renderer_for_file(filename):
+    """The renderer that writes files with this name's extension, None for an unknown extension."""
+    extension = filename.rsplit('.', 1)[-1]
+    return next((renderer for renderer in RENDERERS.values() if renderer.extension == extension), None)
+
+
+def render(result, name, target, **options):
+    """Writes a PayrollResult in the named format to a path or binary buffer."""
+    get_renderer(name).render(result, target, **options)
+
+
+def _write(target, data):
+    if hasattr(target, 'write'):
+        target.write(data)
+    else:
+        with open(target, 'wb') as f:
+            f.write(data)
+
+
+def _by_column(columns, values, skip_zero=False):
+    return {column: float(value) for column, value in zip(columns, values) if value or not skip_zero}
+
+
+def result_to_dict(result):
+    """
+    Plain dict of a PayrollResult for JSON. Per-employee hours and tips only
+    list the columns the employee has a non-zero amount in.
+    """
+    roster = result.roster
+    columns = result.role_columns
+    report_hours = roster.report_hours()
+    allocation = result.allocation
+    employees = []
+    for e_idx, name in enumerate(roster.employees):
+        employee = {'name': name, 'hours': _by_column(columns, roster.hours[e_idx], skip_zero=True),
+                    'total_hours': float(report_hours[e_idx, -1])}
+        if allocation is not None:
+            employee['tips'] = _by_column(columns, allocation.employee_tips[e_idx], skip_zero=True)
+            employee['total_tips'] = float(allocation.employee_tips[e_idx].sum())
+        employees.append(employee)
+
+    data = {
+        'columns': columns,
+        'employees': employees,
+        'role_totals': _by_column(columns, result.role_totals),
+        'total_hours': float(result.total_hours),
+        'tip_pools': None,
+        'total_tips': None,
+        'servers_tips': dict(result.servers_tips),
+        'unmatched_servers': dict(allocation.unmatched_servers) if allocation is not None else {},
+    }
+    if allocation is not None:
+        data['tip_pools'] = {
+            pool: {'by_column': _by_column(columns, role_tips), 'total': float(role_tips.sum())}
+            for pool, role_tips in zip(POOLS, allocation.role_tips)
+        }
+        data['total_tips'] = float(allocation.role_tips.sum())
+    return data
+
+
+@register_renderer('json', 'application/json', 'json', 'JSON')
+def render_json(result, target):
+    _write(target, json.dumps(result_to_dict(result)).encode('utf-8'))
+
+
+def result_to_frame(result):
+    """
+    Per-employee table of a PayrollResult, indexed by Team Member: hours per
+    column, Total Hours and, when tips were allocated, tips per column and Total Tips.
+    """
+    frame = result.hours.rename_axis(columns=None)
+    allocation = result.allocation
+    if allocation is not None:
+        tips = np.column_stack([allocation.employee_tips, allocation.employee_tips.sum(axis=1)])
+        tip_columns = [f"{column} Tips" for column in result.role_columns] + ['Total Tips']
+        frame = pd.concat([frame, pd.DataFrame(tips, index=frame.index, columns=tip_columns)], axis=1)
+    return frame
+
+
+def _totals_frame(result, frame):
+    """ROLE TOTALS and, with tips, one row per tip pool, in the columns of result_to_frame."""
+    role_totals = list(result.role_totals) + [result.total_hours]
+    allocation = result.allocation
+    if allocation is None:
+        return pd.DataFrame([role_totals], index=['ROLE TOTALS'], columns=frame.columns)
+    role_tips = np.column_stack([allocation.role_tips, allocation.role_tips.sum(axis=1)])
+    blank_hours = np.full((len(POOLS), len(role_totals)), np.nan)
+    rows = np.vstack([role_totals + list(role_tips.sum(axis=0)), np.hstack([blank_hours, role_tips])])
+    return pd.DataFrame(rows, index=['ROLE TOTALS'] + [POOL_LABELS[pool] for pool in POOLS], columns=frame.columns)
+
+
+@register_renderer('csv', 'text/csv', 'csv', 'CSV')
+def render_csv(result, target):
+    """
+    One row per employee with hours per column, Total Hours and, when tips were
+    allocated, tips per column and Total Tips; then ROLE TOTALS and the tip pool rows.
+    """
+    frame = result_to_frame(result)
+    text = pd.concat([frame, _totals_frame(result, frame)]).to_csv(index_label='Team Member', na_rep='',
+                                                                    lineterminator='\r\n')
+    _write(target, text.encode('utf-8'))
+
+
+if PARQUET_ENGINE is not None:
+    @register_renderer('parquet', 'application/vnd.apache.parquet', 'parquet', 'Parquet')
+    def render_parquet(result, target):
+        """The per-employee table of result_to_frame, for payroll imports and data tools."""
+        result_to_frame(result).to_parquet(target, engine=PARQUET_ENGINE)
+
+
+@register_renderer('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx', 'Excel')
+def render_xlsx(result, target, write_only=False, stats=None, conditional_formatting=False, multi_sheet=False):
+    # Imported here so JSON and CSV rendering never load openpyxl
+    from tip import render_payroll_workbook
+    render_payroll_workbook(result, target, write_only, stats, conditional_formatting, multi_sheet)
@@ -0,0 +1,129 @@
+# report_cache.py
+import hashlib
+import os
+import shutil
+import threading
+import time
+
+# Entries hold the bytes of any report format (the format is part of the key)
+ENTRY_SUFFIX = '.bin'
+LEGACY_SUFFIX = '.xlsx'  # Entries from before other formats were cached; dropped on the next eviction
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _digest(source):
+    """Digest of in-memory bytes or of a file on disk."""
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha256(source).hexdigest()
+    return file_digest(source)
+
+
+class ReportCache:
+    """
+    Disk cache of generated reports keyed by the contents of the hours and tips
+    files plus a fingerprint of the configuration that shaped the report, so the
+    same uploads under a different report name are served without recomputing.
+    Entries older than max_age seconds are dropped, and the least recently used
+    entries are dropped once the cache grows past max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024, max_age=24 * 3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, hours, tips, fingerprint):
+        """Cache key for the hours and tips uploads, given as file paths or bytes (tips may be None)."""
+        digest = hashlib.sha256()
+        digest.update(_digest(hours).encode())
+        digest.update(_digest(tips).encode() if tips else b'no-tips')
+        digest.update(fingerprint.encode())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}{ENTRY_SUFFIX}")
+
+    def get(self, key, destination):
+        """Copies a cached report to destination and returns True, or returns False on a miss."""
+        data = self.read(key)
+        if data is None:
+            return False
+        with open(destination, 'wb') as f:
+            f.write(data)
+        return True
+
+    def read(self, key):
+        """Returns the cached report's bytes, or None on a miss."""
+        path = self._path(key)
+        with self._lock:
+            try:
+                if time.time() - os.path.getmtime(path) > self.max_age:
+                    os.remove(path)
+                    raise FileNotFoundError(path)
+                with open(path, 'rb') as f:
+                    data = f.read()
+                os.utime(path)  # Mark as recently used
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return data
+
+    def write(self, key, data):
+        """Stores the bytes of a freshly built report, then evicts old or excess entries."""
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with self._lock:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def put(self, key, report_path):
+        """Stores a copy of a freshly built report, then evicts old or excess entries."""
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with self._lock:
+            shutil.copyfile(report_path, tmp_path)
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def _evict(self):
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not name.endswith((ENTRY_SUFFIX, LEGACY_SUFFIX)) or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            if name.endswith(LEGACY_SUFFIX) or now - stat.st_mtime > self.max_age:
+                os.remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def stats(self):
+        with self._lock:
+            sizes = [
+                os.path.getsize(os.path.join(self.directory, name))
+                for name in os.listdir(self.directory) if name.endswith(ENTRY_SUFFIX)
+            ]
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(sizes), 'bytes': sum(sizes)}
@@ -0,0 +1,80 @@
+# report_stats.py
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_bytes():
+    """High-water mark of this process's resident memory, or None where it can't be read."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def output_size(target):
+    """Bytes written to a saved workbook, whether it went to a path or a buffer."""
+    if hasattr(target, 'getbuffer'):
+        return target.getbuffer().nbytes
+    if hasattr(target, 'tell'):
+        return target.tell()
+    return os.path.getsize(target)
+
+
+class ReportFailedError(RuntimeError):
+    """Raised by report jobs whose report wasn't written; carries the ReportStats of the attempt."""
+
+    def __init__(self, message, stats):
+        super().__init__(message, stats)  # Both in args, so the error pickles back from worker processes
+        self.stats = stats
+
+    def __str__(self):
+        return self.args[0]
+
+
+class ReportStats:
+    """
+    What happened while one report was built: seconds spent in each phase in
+    the order they ran, counts such as hours rows, employees and cells
+    written, bytes saved, the worker's peak RSS and the error, if any.
+
+    worker_peak_rss_bytes is the high-water mark of the process that built
+    the report over its whole life, not of this report alone: a pool worker
+    that built a large report earlier keeps reporting that peak.
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.counts = {}
+        self.worker_peak_rss_bytes = None
+        self.error = None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + time.perf_counter() - start
+
+    def count(self, name, value):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def finish(self):
+        self.worker_peak_rss_bytes = peak_rss_bytes()
+        return self
+
+    @property
+    def total_seconds(self):
+        return sum(self.phases.values())
+
+    def as_dict(self):
+        return {'phases': dict(self.phases), 'counts': dict(self.counts), 'total_seconds': self.total_seconds,
+                'worker_peak_rss_bytes': self.worker_peak_rss_bytes, 'error': self.error}
@@ -0,0 +1,71 @@
+# report_store.py
+import threading
+import time
+from collections import OrderedDict
+
+
+class ReportTooLargeError(Exception):
+    """Raised when a single report is bigger than the whole store may hold."""
+
+
+class ReportStore:
+    """
+    Holds finished workbooks in memory until they are downloaded. Reports expire
+    after ttl seconds, and the oldest reports are dropped once the store holds
+    more than max_bytes, so an abandoned download can't pin memory forever.
+    A report bigger than max_bytes on its own is refused with ReportTooLargeError.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, ttl=600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._reports = OrderedDict()  # name -> (expires, data), oldest first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def _drop(self, name):
+        _, data = self._reports.pop(name)
+        self._bytes -= len(data)
+
+    def _evict(self):
+        now = time.time()
+        for name, (expires, _) in list(self._reports.items()):
+            if expires <= now:
+                self._drop(name)
+                self.evicted += 1
+        while self._bytes > self.max_bytes and self._reports:
+            self._drop(next(iter(self._reports)))
+            self.evicted += 1
+
+    def put(self, name, data):
+        if len(data) > self.max_bytes:
+            raise ReportTooLargeError(
+                f"the report is too large to hold for download ({len(data):,} bytes, the limit is "
+                f"{self.max_bytes:,}); build it on disk with IN_MEMORY_REPORTS=0"
+            )
+        with self._lock:
+            if name in self._reports:
+                self._drop(name)
+            self._reports[name] = (time.time() + self.ttl, data)
+            self._bytes += len(data)
+            self._evict()
+
+    def pop(self, name):
+        """Removes and returns a report's bytes, or None if it is unknown or expired."""
+        with self._lock:
+            self._evict()
+            if name not in self._reports:
+                return None
+            _, data = self._reports[name]
+            self._drop(name)
+            return data
+
+    def __contains__(self, name):
+        with self._lock:
+            self._evict()
+            return name in self._reports
+
+    def stats(self):
+        with self._lock:
+            return {'reports': len(self._reports), 'bytes': self._bytes, 'evicted': self.evicted}
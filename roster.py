@@ -0,0 +1,76 @@
+# roster.py
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+TOTAL_COLUMN = 'Total Hours'
+
+
+class Roster(namedtuple('Roster', ['employees', 'columns', 'hours'])):
+    """
+    The hours of a pay period with employees and report columns coded as integers.
+
+    employees: the interning table, employee names in sorted order; an
+        employee's id is its position, which is also its row in hours
+    columns: the report columns in order (RULES.columns); a column's id is its position
+    hours: float64 employees x columns matrix
+
+    Allocation and the workbook writers read the roster directly; to_frame
+    builds the final_summary DataFrame for the callers that want pandas.
+    """
+    __slots__ = ()
+
+    @property
+    def report_columns(self):
+        """The report columns followed by Total Hours, as laid out in the hours table."""
+        return list(self.columns) + [TOTAL_COLUMN]
+
+    def report_hours(self):
+        """employees x report_columns matrix: each employee's hours and their Total Hours."""
+        values = np.empty((len(self.employees), len(self.columns) + 1))
+        values[:, :-1] = self.hours
+        values[:, -1] = self.hours.sum(axis=1)
+        return values
+
+    def role_totals(self):
+        """Hours per report column, the ROLE TOTALS row."""
+        return self.hours.sum(axis=0)
+
+    def to_frame(self):
+        """The final_summary pivot: one row per employee, the report columns and Total Hours."""
+        return pd.DataFrame(
+            self.report_hours(),
+            index=pd.Index(self.employees, dtype=object, name='Team Member'),
+            columns=pd.Index(self.report_columns, name='Role_Shift'),
+            copy=False
+        )
+
+
+def roster_from_frame(final_summary):
+    """The Roster of a final_summary pivot, the inverse of Roster.to_frame."""
+    columns = [col_name for col_name in final_summary.columns if col_name != TOTAL_COLUMN]
+    return Roster(final_summary.index.to_numpy(dtype=object), columns, final_summary[columns].to_numpy(dtype=float))
+
+
+def build_roster(shift_rows, columns):
+    """
+    Interns the employees of Team Member / Role_Shift / Hours rows and adds
+    their hours into the matrix with np.add.at. Rows missing a name or role are
+    skipped and missing hours count as 0. Hours under a Role_Shift that isn't a
+    report column are dropped, but their employee still gets a row, as in the
+    pivot this replaces.
+    """
+    hours = np.nan_to_num(shift_rows['Hours'].to_numpy(dtype=float, na_value=np.nan))
+
+    # Missing names and roles get id -1; roles are coded first so only the few
+    # distinct Role_Shift values are looked up among the report columns
+    role_ids, role_shifts = pd.factorize(shift_rows['Role_Shift'].to_numpy(dtype=object))
+    keep = role_ids >= 0
+    employee_ids, employees = pd.factorize(shift_rows['Team Member'].to_numpy(dtype=object)[keep], sort=True)
+    column_ids = pd.Index(columns).get_indexer(role_shifts)[role_ids[keep]]
+    known = (employee_ids >= 0) & (column_ids >= 0)
+
+    matrix = np.zeros((len(employees), len(columns)))
+    np.add.at(matrix, (employee_ids[known], column_ids[known]), hours[keep][known])
+    return Roster(employees, list(columns), matrix)
@@ -0,0 +1,167 @@
+# rules.py
+import hashlib
+import json
+import os
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from allocation import POOLS, POOL_SUFFIXES
+
+# --- Rules File ---
+RULES_FILE = os.environ.get('PAYROLL_RULES_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'payroll_rules.json'))
+RULE_SECTIONS = ('allocation_table', 'salary_employees', 'header_structure', 'role_map', 'split_roles')
+SPLIT_SUB_HEADERS = ['Lunch', 'Dinner']  # The sub columns split_shifts fills
+RATE_TOLERANCE = 1e-9
+
+
+class RulesError(ValueError):
+    """Raised when a rules file is missing sections or its rates don't add up."""
+
+
+class PayrollRules(namedtuple('PayrollRules', [
+        'allocation_table', 'salary_employees', 'header_structure', 'role_map', 'split_roles',
+        'name_aliases', 'columns', 'column_rates', 'salary_rows', 'fingerprint'])):
+    """
+    A validated rules file compiled for lookups.
+
+    name_aliases: {tips export server name, First Last: roster name} for servers
+        whose names don't match the roster even after normalizing (optional section)
+    columns: the report columns in order, e.g. Server, Busser_Lunch, Busser_Dinner
+    column_rates: {column: pool rates in POOLS order}, resolved once so the
+        allocation never parses '_Lunch' / '_Dinner' column names
+    salary_rows: (employee, column, hours) rows the salary employees add
+    fingerprint: hash of the whole rules file, for caches and saved state
+    """
+    __slots__ = ()
+
+    @property
+    def servers_to_pool_rate(self):
+        return self.allocation_table['Servers_to_Pool_Rate']
+
+    def rate_matrix(self, columns):
+        """Pool x column rate matrix for the given report columns; unknown columns get 0."""
+        rates = np.zeros((len(POOLS), len(columns)))
+        for c_idx, col_name in enumerate(columns):
+            if col_name in self.column_rates:
+                rates[:, c_idx] = self.column_rates[col_name]
+        return rates
+
+
+def config_fingerprint(*configs):
+    """Stable hash of configuration values such as a rules config, for caches and saved state."""
+    return hashlib.sha256(json.dumps(configs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _check_rates(config, problems):
+    table = config['allocation_table']
+    roles = config['header_structure']
+    expected_totals = config.get('pool_rate_totals', {})
+    for pool in POOLS:
+        pool_rates = table.get(pool)
+        if not isinstance(pool_rates, dict):
+            problems.append(f"allocation_table has no '{pool}' rates")
+            continue
+        for role, rate in pool_rates.items():
+            if role not in roles:
+                problems.append(f"{pool} rate for '{role}', which is not a report column")
+            if not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+                problems.append(f"{pool} rate for '{role}' must be between 0 and 1, got {rate!r}")
+        total = sum(rate for rate in pool_rates.values() if isinstance(rate, (int, float)))
+        expected = expected_totals.get(pool, 1)
+        if abs(total - expected) > RATE_TOLERANCE:
+            problems.append(f"{pool} rates add up to {total:g}, expected {expected:g}")
+
+    pool_rate = table.get('Servers_to_Pool_Rate')
+    if not isinstance(pool_rate, (int, float)) or not 0 <= pool_rate <= 1:
+        problems.append(f"Servers_to_Pool_Rate must be between 0 and 1, got {pool_rate!r}")
+
+
+def validate_rules(config):
+    """Raises RulesError listing every problem found in a rules config."""
+    missing = [section for section in RULE_SECTIONS if section not in config]
+    if missing:
+        raise RulesError(f"Rules are missing: {', '.join(missing)}")
+
+    problems = []
+    roles = config['header_structure']
+    _check_rates(config, problems)
+    for role in config['split_roles']:
+        if roles.get(role) != SPLIT_SUB_HEADERS:
+            problems.append(f"Split role '{role}' needs Lunch and Dinner sub columns")
+    for role, sub_headers in roles.items():
+        if sub_headers and role not in config['split_roles']:
+            problems.append(f"'{role}' has sub columns but is not a split role")
+    for pos_role, role in config['role_map'].items():
+        if role not in roles:
+            problems.append(f"role_map sends '{pos_role}' to '{role}', which is not a report column")
+    aliases = config.get('name_aliases', {})
+    if not isinstance(aliases, dict) or not all(isinstance(name, str) for item in aliases.items() for name in item):
+        problems.append("name_aliases must map POS server names to roster names")
+    for name, employee in config['salary_employees'].items():
+        if employee.get('role') not in roles:
+            problems.append(f"Salary employee {name} has unknown role {employee.get('role')!r}")
+        for field in ('lunch_hours', 'dinner_hours'):
+            hours = employee.get(field)
+            if not isinstance(hours, (int, float)) or hours < 0:
+                problems.append(f"Salary employee {name} needs a non-negative {field}, got {hours!r}")
+    if problems:
+        raise RulesError('Invalid payroll rules:\n  ' + '\n  '.join(problems))
+
+
+def compile_rules(config):
+    """Validates a rules config and resolves its column rates and salary rows."""
+    validate_rules(config)
+    table = config['allocation_table']
+    split_roles = config['split_roles']
+
+    columns = [f"{main}_{sub}" if sub else main for main, subs in config['header_structure'].items() for sub in (subs or [''])]
+    column_rates = {}
+    for main, subs in config['header_structure'].items():
+        if subs:
+            # '<Role>_Lunch' takes the Lunch rate, '<Role>_Dinner' the two dinner rates
+            for sub in subs:
+                column_rates[f"{main}_{sub}"] = tuple(
+                    table[pool].get(main, 0) if POOL_SUFFIXES[pool] == f"_{sub}" else 0 for pool in POOLS)
+        else:
+            column_rates[main] = tuple(table[pool].get(main, 0) for pool in POOLS)
+
+    salary_rows = []
+    for name, employee in config['salary_employees'].items():
+        role = employee['role']
+        if role in split_roles:
+            salary_rows += [(name, f"{role}_{sub}", employee[f"{sub.lower()}_hours"])
+                            for sub in SPLIT_SUB_HEADERS if employee[f"{sub.lower()}_hours"] > 0]
+        else:
+            # Unsplit roles such as Kitchen get the full hours under the plain role name
+            salary_rows.append((name, role, employee['lunch_hours'] + employee['dinner_hours']))
+
+    return PayrollRules(
+        table, config['salary_employees'], config['header_structure'], config['role_map'], split_roles,
+        config.get('name_aliases', {}), columns, column_rates, salary_rows, config_fingerprint(config)
+    )
+
+
+_compiled = {}  # path -> PayrollRules
+_compiled_lock = threading.Lock()
+
+
+def load_rules(path=RULES_FILE):
+    """
+    Reads, validates and compiles a rules file, once per path and process.
+    payroll.RULES and the constants derived from it are bound at import, so
+    edits to the file take effect when the process (or server) restarts.
+    """
+    path = os.path.abspath(path)
+    with _compiled_lock:
+        if path in _compiled:
+            return _compiled[path]
+    with open(path, encoding='utf-8') as f:
+        try:
+            config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise RulesError(f"Rules file {path} is not valid JSON: {e}") from None
+    rules = compile_rules(config)
+    with _compiled_lock:
+        return _compiled.setdefault(path, rules)
@@ -0,0 +1,63 @@
+# server_names.py
+import numpy as np
+import pandas as pd
+
+
+def normalize_names(names):
+    """Casefolds names and collapses runs of whitespace, so 'SMITH,  John' spacing and case don't matter."""
+    return pd.Series(names, dtype=object).str.split().str.join(' ').str.casefold()
+
+
+class NameIndex:
+    """
+    Finds roster employees for the server names of a tips export. Built once
+    per allocation from the roster names and an optional alias table
+    ({POS name: roster name}, RULES.name_aliases) for people whose names differ
+    between the two systems.
+
+    Names are matched exactly first, then by normalized name. A normalized
+    name shared by two employees is ambiguous and only matches exactly.
+    """
+
+    def __init__(self, employees, aliases=None):
+        self.employees = pd.Index(employees, dtype=object)
+        keys = pd.DataFrame({'key': normalize_names(self.employees), 'position': np.arange(len(self.employees))})
+        if aliases:
+            targets = self.employees.get_indexer(list(aliases.values()))
+            alias_keys = pd.DataFrame({'key': normalize_names(list(aliases)), 'position': targets})
+            keys = pd.concat([keys, alias_keys[targets >= 0]], ignore_index=True)
+        keys = keys.dropna().drop_duplicates()
+        keys = keys[~keys['key'].duplicated(keep=False)]
+        self._keys = pd.Index(keys['key'])
+        self._positions = np.append(keys['position'].to_numpy(), -1)  # A miss (-1) reads the trailing -1
+
+    def match(self, names):
+        """Roster positions of the given names in one join each way; -1 where nothing matched."""
+        names = pd.Index(names, dtype=object)
+        positions = self.employees.get_indexer(names)
+        missing = positions < 0
+        if missing.any():
+            positions[missing] = self._positions[self._keys.get_indexer(normalize_names(names[missing]))]
+        return positions
+
+
+def match_servers(employees, servers_tips, aliases=None):
+    """
+    Matches the servers of a tips export ({"First Last": {'tip': amount}}) to
+    roster employees. Returns (positions, tips, matched, unmatched): the roster
+    positions and tips of the matched servers, {employee: tip} for them and
+    {server: tip} for the servers no employee matched.
+    """
+    servers = list(servers_tips)
+    tips = np.array([servers_tips[server]['tip'] for server in servers], dtype=float)
+    positions = NameIndex(employees, aliases).match(servers)
+    found = positions >= 0
+
+    # An exact name wins over a normalized one for the same employee
+    exact = pd.Index(employees, dtype=object).get_indexer(servers) >= 0
+    order = np.argsort(exact[found], kind='stable')
+    positions, tips = positions[found][order], tips[found][order]
+
+    matched = {employees[position]: float(tip) for position, tip in zip(positions, tips)}
+    unmatched = {server: servers_tips[server]['tip'] for server, is_found in zip(servers, found) if not is_found}
+    return positions, tips, matched, unmatched
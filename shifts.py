@@ -0,0 +1,71 @@
+# shifts.py
+import numpy as np
+import pandas as pd
+
+# --- Shift Split Settings ---
+DINNER_START_HOUR = 17  # 5:00 PM
+MIN_SHIFT_HOURS = 0.001  # Segments at or below this are dropped
+MINUTES_PER_DAY = 24 * 60
+
+
+def time_column_to_minutes(times):
+    """
+    Splits a nullable integer column of punch times (minutes since midnight,
+    as read_hours_csv returns them) into an int32 array and a mask of the
+    rows that have a time. Missing times read as 0 in the array.
+    """
+    return times.to_numpy(dtype=np.int32, na_value=0), times.notna().to_numpy()
+
+
+def split_shifts(df, split_roles, dinner_start_hour=DINNER_START_HOUR):
+    """
+    Splits every punch in the frame into lunch and dinner hours at once.
+
+    Split roles are divided at the dinner boundary: a shift that ends by then is
+    all lunch, one that starts at or after it is all dinner (both use the
+    'Regular hours' column), and a shift that straddles it is divided by clock
+    time. Overnight shifts (Out Time before In Time) wrap into the next day.
+    Other roles keep their full hours under the plain role name.
+
+    Returns the long-format table with columns Team Member, Role_Shift and Hours,
+    in the same row order the per-row loop produced.
+    """
+    start, has_start = time_column_to_minutes(df['In Time'])
+    end, has_end = time_column_to_minutes(df['Out Time'])
+    end = np.where(has_start & has_end & (end < start), end + MINUTES_PER_DAY, end)
+    dinner_start = dinner_start_hour * 60
+
+    total_hours = df['Regular hours'].to_numpy(dtype=float, na_value=np.nan)
+    is_split = df['Role'].isin(split_roles).to_numpy()
+
+    # A missing time never decides a punch is all lunch or all dinner, and a
+    # straddling punch gets no hours on the side of the boundary it's missing
+    all_lunch = has_end & (end <= dinner_start)
+    all_dinner = ~all_lunch & has_start & (start >= dinner_start)
+    lunch_straddle = np.where(has_start, (dinner_start - start) / 60, np.nan)
+    dinner_straddle = np.where(has_end, (end - dinner_start) / 60, np.nan)
+    lunch_hours = np.where(all_lunch, total_hours, np.where(all_dinner, 0, lunch_straddle))
+    dinner_hours = np.where(all_lunch, 0, np.where(all_dinner, total_hours, dinner_straddle))
+
+    lunch_mask = is_split & (lunch_hours > MIN_SHIFT_HOURS)
+    dinner_mask = is_split & (dinner_hours > MIN_SHIFT_HOURS)
+    whole_mask = ~is_split & (total_hours > 0)
+
+    names = df['Team Member'].to_numpy(dtype=object)
+    roles = df['Role'].to_numpy(dtype=object)
+    positions = np.arange(len(df))
+
+    # Each punch contributes up to two rows; order them lunch before dinner per punch
+    parts = [
+        (lunch_mask, roles[lunch_mask] + '_Lunch', lunch_hours, 0),
+        (dinner_mask, roles[dinner_mask] + '_Dinner', dinner_hours, 1),
+        (whole_mask, roles[whole_mask], total_hours, 0),
+    ]
+    order_keys = np.concatenate([positions[mask] * 2 + sub for mask, _, _, sub in parts])
+    order = np.argsort(order_keys, kind='stable')
+
+    return pd.DataFrame({
+        'Team Member': np.concatenate([names[mask] for mask, _, _, _ in parts])[order],
+        'Role_Shift': np.concatenate([role_shift.astype(object) for _, role_shift, _, _ in parts])[order],
+        'Hours': np.concatenate([hours[mask] for mask, _, hours, _ in parts])[order],
+    })
@@ -0,0 +1,164 @@
+# styles.py
+from copy import copy
+
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
+from openpyxl.styles.differential import DifferentialStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+
+# --- Report Colours ---
+SALARY_COLOR = "E6F3FF"  # Light blue for salary employees
+SALARY_TOTAL_COLOR = "B3D9FF"  # Darker blue for salary employee totals
+
+# Label fill and value fill of each summary row, keyed by its label
+SECTION_COLORS = {
+    'ROLE TOTALS': ("4472C4", "E7E6E6"),
+    'LUNCH TIPS': ("70AD47", "D5E8D4"),
+    'DINNER TIPS GENERAL': ("FF6B35", "FFE5DB"),
+    'DINNER TIPS SERVERS': ("8E44AD", "E8DAEF"),
+    'TOTAL': ("2E2E2E", "F2F2F2"),
+    'INDIVIDUAL EMPLOYEE TIPS': ("1F4E79", None),
+    'INDIVIDUAL TOTALS': ("1F4E79", "D9E2F3"),
+}
+SECTION_LABEL_SIZES = {'TOTAL': 12, 'INDIVIDUAL EMPLOYEE TIPS': 14}
+SECTION_VALUE_SIZES = {'TOTAL': 11}
+
+# Tip bands as (minimum amount, colour), checked top to bottom
+TIP_BANDS = [(50, "C6E0B4"), (20, "FFE699"), (0, "F2F2F2")]
+TOTAL_TIP_BANDS = [(100, "92D050"), (50, "C6E0B4"), (20, "FFE699")]
+LOW_TIP_COLOR = "F2F2F2"
+
+# Whole-cell formats of the conditional formatting mode: name -> (number format, bold, alignment)
+CELL_STYLES = {
+    'Payroll Hours': ('0.00', False, None),
+    'Payroll Name': ('General', False, 'left'),
+    'Payroll Tip': ('$0.00', False, 'center'),
+    'Payroll Total Tip': ('$0.00', True, 'center'),
+}
+
+
+class StyleRegistry:
+    """
+    Hands out the Font/PatternFill/Border/Alignment objects used by the report,
+    keyed by what they style (header, section, tip band, salary highlight).
+    openpyxl styles are immutable, so one object can be shared by every cell
+    instead of building a new one per cell. shared=False builds a fresh object
+    on every call, which is how the report used to behave.
+    """
+
+    def __init__(self, shared=True):
+        self.shared = shared
+        self._cache = {}
+
+    def _get(self, key, factory):
+        if not self.shared:
+            return factory()
+        style = self._cache.get(key)
+        if style is None:
+            style = self._cache[key] = factory()
+        return style
+
+    # --- Building Blocks ---
+    def fill(self, color):
+        return self._get(('fill', color), lambda: PatternFill(start_color=color, fill_type="solid"))
+
+    def font(self, bold=True, color=None, size=None):
+        return self._get(('font', bold, color, size), lambda: Font(bold=bold, color=color, size=size))
+
+    @property
+    def header_font(self):
+        return self.font(color="FFFFFF")
+
+    @property
+    def bold_font(self):
+        return self.font()
+
+    @property
+    def thin_border(self):
+        return self._get('thin_border', lambda: Border(
+            left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')
+        ))
+
+    @property
+    def centered_alignment(self):
+        return self._get('centered', lambda: Alignment(horizontal='center', vertical='center', wrap_text=True))
+
+    @property
+    def left_alignment(self):
+        return self._get('left', lambda: Alignment(horizontal='left', vertical='center'))
+
+    # --- Headers ---
+    @property
+    def main_header_fill(self):
+        return self.fill("4472C4")
+
+    @property
+    def sub_header_fill(self):
+        return self.fill("D9D9D9")
+
+    @property
+    def single_header_fill(self):
+        return self.fill("808080")
+
+    # --- Summary Sections ---
+    def section_label_font(self, label):
+        return self.font(color="FFFFFF", size=SECTION_LABEL_SIZES.get(label))
+
+    def section_label_fill(self, label):
+        return self.fill(SECTION_COLORS[label][0])
+
+    def section_value_font(self, label):
+        return self.font(size=SECTION_VALUE_SIZES.get(label))
+
+    def section_value_fill(self, label):
+        return self.fill(SECTION_COLORS[label][1])
+
+    # --- Salary Employees and Tip Bands ---
+    @property
+    def salary_fill(self):
+        return self.fill(SALARY_COLOR)
+
+    def tip_fill(self, individual_tip, is_salary=False):
+        """Fill for one individual tip cell, or None when the cell is left plain."""
+        if is_salary:
+            return self.salary_fill
+        if individual_tip > 0:
+            for minimum, color in TIP_BANDS:
+                if individual_tip >= minimum:
+                    return self.fill(color)
+        return None
+
+    def total_tip_fill(self, employee_total_tips, is_salary=False):
+        """Fill for an employee's Total Tips cell."""
+        if is_salary:
+            return self.fill(SALARY_TOTAL_COLOR)
+        for minimum, color in TOTAL_TIP_BANDS:
+            if employee_total_tips >= minimum:
+                return self.fill(color)
+        return self.fill(LOW_TIP_COLOR)
+
+    # --- Conditional Formatting ---
+    def cell_style(self, wb, name):
+        """
+        Registers one of CELL_STYLES on the workbook, once, and returns its name.
+        Assigning the name sets a cell's font, border, alignment and number
+        format in one step instead of one style lookup per attribute.
+        """
+        if name not in wb.named_styles:
+            number_format, bold, alignment = CELL_STYLES[name]
+            alignments = {'left': self.left_alignment, 'center': self.centered_alignment, None: Alignment()}
+            wb.add_named_style(NamedStyle(
+                name, font=self.bold_font if bold else copy(DEFAULT_FONT), border=self.thin_border,
+                alignment=alignments[alignment], number_format=number_format
+            ))
+        return name
+
+    def highlight(self, color, bold=False):
+        """Differential style for a conditional formatting rule: a fill, optionally with bold text."""
+        return self._get(('highlight', color, bold), lambda: DifferentialStyle(
+            fill=PatternFill(start_color=color, end_color=color, fill_type="solid"),
+            font=Font(bold=True) if bold else None
+        ))
+
+
+# Shared registry used by every writer
+STYLES = StyleRegistry()
@@ -0,0 +1,107 @@
+# conftest.py
+"""
+Shared fixtures for the test suite. The modules live at the top of the repo
+and the synthetic export generator in benchmarks/, so both go on sys.path.
+"""
+import os
+import shutil
+import sys
+import time
+
+from io import BytesIO
+
+import pytest
+from openpyxl import load_workbook
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import synthetic  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def period_files(tmp_path_factory):
+    """A small synthetic hours and tips export, shared by every test that only reads them."""
+    return synthetic.generate(str(tmp_path_factory.mktemp('period')), 600, employees=60, seed=1)
+
+
+@pytest.fixture(scope='session')
+def hours_file(period_files):
+    return period_files[0]
+
+
+@pytest.fixture(scope='session')
+def tips_file(period_files):
+    return period_files[1]
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """The app module, with its uploads, report cache and saved periods in a temp directory."""
+    base = tmp_path_factory.mktemp('app')
+    os.environ.update(REPORT_WORKERS='1', REPORT_CACHE_FOLDER=str(base / 'report_cache'),
+                      PERIOD_STATE_FOLDER=str(base / 'period_states'))
+    cwd = os.getcwd()
+    os.chdir(base)  # temp_uploads is created relative to the working directory
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    app.UPLOAD_FOLDER = str(base / 'temp_uploads')
+    yield app
+    if app.job_queue._executor is not None:
+        app.job_queue._executor.shutdown(cancel_futures=True)
+
+
+@pytest.fixture
+def client(app_module):
+    """A test client with an empty report cache, so every upload builds its report."""
+    shutil.rmtree(app_module.report_cache.directory)
+    os.makedirs(app_module.report_cache.directory)
+    return app_module.app.test_client()
+
+
+def upload(*paths):
+    """Form fields for the hours and (optional) tips files at the given paths."""
+    fields = {}
+    for field, path in zip(('hoursFile', 'tipsFile'), paths):
+        with open(path, 'rb') as f:
+            fields[field] = (BytesIO(f.read()), os.path.basename(path))
+    return fields
+
+
+def wait_for_job(client, job_id, timeout=60):
+    """Polls /jobs/<id> until the job is finished and returns its last status."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = client.get(f'/jobs/{job_id}').get_json()
+        if status['status'] in ('done', 'failed'):
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def workbook_cells(path, styles=True):
+    """
+    Every non-empty or styled cell of every sheet as comparable tuples, with
+    floats rounded so equivalent reports compare equal.
+    """
+    wb = load_workbook(path)
+    cells = []
+    for ws in wb.worksheets:
+        cells.append(('sheet', ws.title, sorted(str(merged) for merged in ws.merged_cells.ranges)))
+        for row in ws.iter_rows():
+            for cell in row:
+                if cell.value is None and not cell.has_style:
+                    continue
+                value = round(cell.value, 6) if isinstance(cell.value, float) else cell.value
+                if not styles:
+                    cells.append((ws.title, cell.coordinate, value))
+                    continue
+                cells.append((ws.title, cell.coordinate, value, cell.number_format, cell.font.b,
+                              cell.font.color.rgb if cell.font.color else None,
+                              cell.fill.fgColor.rgb if cell.fill.fill_type else None,
+                              cell.border.left.style, cell.alignment.horizontal))
+        cells.append(('widths', ws.title, {key: dim.width for key, dim in ws.column_dimensions.items()}))
+    return cells
@@ -0,0 +1,43 @@
+# test_allocation.py
+import numpy as np
+import pytest
+
+from allocation import allocate_tips
+from payroll import ALLOCATION_TABLE, RULES
+
+COLUMNS = ['Server', 'Busser_Lunch', 'Busser_Dinner', 'Kitchen', 'Hostess']
+HOURS = [
+    [6.0, 0.0, 0.0, 0.0, 0.0],
+    [0.0, 3.0, 2.0, 0.0, 0.0],
+    [0.0, 1.0, 0.0, 8.0, 0.0],
+]
+EMPLOYEES = ['Ana Lopez', 'Luis Perez', 'Emma Smith']
+
+
+def allocate(servers_tips=None):
+    return allocate_tips(HOURS, COLUMNS, EMPLOYEES, 100.0, 200.0, 50.0, 300.0, RULES, servers_tips)
+
+
+def test_pools_follow_the_allocation_table():
+    allocation = allocate()
+    lunch, dinner_general, dinner_servers = allocation.role_tips
+    assert lunch[1] == pytest.approx(100 * ALLOCATION_TABLE['Lunch']['Busser'])
+    assert dinner_general[2] == pytest.approx(200 * ALLOCATION_TABLE['Dinner_General']['Busser'])
+    assert dinner_servers[2] == pytest.approx(50 * ALLOCATION_TABLE['Dinner_Servers']['Busser'])
+    assert dinner_servers[0] == pytest.approx(300 * (1 - ALLOCATION_TABLE['Servers_to_Pool_Rate']))
+    # Hostess has a dinner rate but no hours, so nothing is allocated to it
+    assert allocation.role_tips[:2, 4].tolist() == [0.0, 0.0]
+
+
+def test_individual_tips_split_by_share_of_hours():
+    allocation = allocate()
+    role_tips = allocation.role_tips.sum(axis=0)
+    np.testing.assert_allclose(allocation.employee_tips[:, 1], role_tips[1] * np.array([0, 0.75, 0.25]))
+    np.testing.assert_allclose(allocation.employee_tips.sum(axis=0)[:4], role_tips[:4])
+
+
+def test_server_tips_replace_the_server_share():
+    allocation = allocate({'Ana Lopez': {'tip': 123.45}, 'Nobody Here': {'tip': 10.0}})
+    assert allocation.employee_tips[0, 0] == 123.45
+    assert allocation.matched_servers == {'Ana Lopez': 123.45}
+    assert allocation.unmatched_servers == {'Nobody Here': 10.0}
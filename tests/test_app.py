@@ -0,0 +1,180 @@
+# test_app.py
+import os
+import time
+
+import pytest
+
+from conftest import upload, wait_for_job
+
+
+@pytest.fixture(params=[True, False], ids=['in_memory', 'on_disk'])
+def report_mode(request, app_module):
+    """Runs a test with reports built in memory and again through temp_uploads."""
+    app_module.app.config['IN_MEMORY_REPORTS'] = request.param
+    yield request.param
+    app_module.app.config['IN_MEMORY_REPORTS'] = True
+
+
+def generate(client, *paths, **form):
+    form.setdefault('filename', 'Payroll')
+    response = client.post('/generate', data=dict(upload(*paths), **form))
+    assert response.status_code in (200, 202), response.get_json()
+    return response.get_json()
+
+
+def download(client, response):
+    """The report bytes of a /generate response, waiting for its job if it was queued."""
+    if not response['cached']:
+        status = wait_for_job(client, response['job_id'])
+        assert status['status'] == 'done', status
+        response = status
+    download = client.get(response['download_url'])
+    assert download.status_code == 200
+    return download.get_data()
+
+
+def test_repeat_upload_is_served_from_cache(client, report_mode, hours_file, tips_file):
+    first = generate(client, hours_file, tips_file)
+    assert not first['cached']
+    report = download(client, first)
+
+    second = generate(client, hours_file, tips_file, filename='Renamed')
+    assert second['cached'] and second['original_name'] == 'Renamed.xlsx'
+    assert download(client, second) == report
+
+
+def test_cache_is_keyed_on_the_format(client, hours_file, tips_file):
+    download(client, generate(client, hours_file, tips_file))
+    csv_report = generate(client, hours_file, tips_file, format='csv')
+    assert not csv_report['cached']
+    assert download(client, csv_report).startswith(b'Team Member,')
+
+
+@pytest.fixture
+def small_store(app_module):
+    app_module.report_store.max_bytes = 100
+    yield app_module.report_store
+    app_module.report_store.max_bytes = app_module.app.config['REPORT_STORE_MAX_BYTES']
+
+
+def test_oversize_report_fails_its_job(client, small_store, hours_file, tips_file):
+    status = wait_for_job(client, generate(client, hours_file, tips_file)['job_id'])
+    assert status['status'] == 'failed'
+    assert 'too large' in status['error'] and 'IN_MEMORY_REPORTS=0' in status['error']
+
+
+def test_oversize_cached_report_is_refused(client, app_module, small_store, hours_file, tips_file):
+    small_store.max_bytes = app_module.app.config['REPORT_STORE_MAX_BYTES']
+    download(client, generate(client, hours_file, tips_file))
+    small_store.max_bytes = 100
+    response = client.post('/generate', data=dict(upload(hours_file, tips_file), filename='Payroll'))
+    assert response.status_code == 413
+    assert 'too large' in response.get_json()['error']
+
+
+def test_failed_report_is_counted_in_metrics(client, tmp_path):
+    bad_hours = tmp_path / 'hours.csv'
+    bad_hours.write_text('First,Last,Role,In Time,Out Time,Regular hours\nAna,Lopez,Busser,25:00XM,1:00PM,4\n')
+    before = client.get('/metrics').get_data(as_text=True)
+    status = wait_for_job(client, generate(client, str(bad_hours))['job_id'])
+    assert status['status'] == 'failed' and 'could not be generated' in status['error']
+
+    after = client.get('/metrics').get_data(as_text=True)
+    errors = 'payroll_reports_total{outcome="error"}'
+    assert metric(after, errors) == metric(before, errors) + 1
+    assert metric(after, 'payroll_report_phase_seconds_count{phase="parse"}') > 0
+
+
+def metric(text, sample):
+    """Value of one sample in /metrics output, 0 if it isn't there yet."""
+    for line in text.splitlines():
+        if line.startswith(sample + ' '):
+            return float(line.split()[-1])
+    return 0
+
+
+@pytest.fixture
+def period_id(client, hours_file, tips_file):
+    response = client.post('/api/periods', data=upload(hours_file, tips_file))
+    assert response.status_code == 201
+    return response.get_json()['period_id']
+
+
+def test_correction_returns_the_updated_figures(client, period_id):
+    punches = client.get(f'/api/periods/{period_id}/punches?employee=Ana Garcia').get_json()
+    correction = {'removed': [punches[0]['id']] if punches else [],
+                  'added': [{'First': 'Nora', 'Last': 'Quinn', 'Role': 'Busser', 'In Time': '3:00PM',
+                             'Out Time': '9:30PM', 'Regular hours': 6.5}]}
+    response = client.post(f'/api/periods/{period_id}/corrections', json=correction)
+    assert response.status_code == 200
+    assert 'Nora Quinn' in response.get_data(as_text=True)
+    csv_report = client.post(f'/api/periods/{period_id}/corrections?format=csv', json={})
+    assert csv_report.status_code == 200 and b'Nora Quinn' in csv_report.get_data()
+
+
+@pytest.mark.parametrize('correction', [
+    {'removed': 5},
+    {'removed': ['x']},
+    {'edited': {'0': {'First': 'Ana'}}},
+    {'added': [{'First': 'Nora', 'Last': 'Quinn', 'Role': 'Busser', 'In Time': 'noon', 'Out Time': '9:30PM',
+                'Regular hours': 6.5}]},
+    {'removed': [10 ** 9]},
+    [],
+])
+def test_malformed_correction_is_a_bad_request(client, period_id, correction):
+    response = client.post(f'/api/periods/{period_id}/corrections', json=correction)
+    assert response.status_code == 400, response.get_json()
+
+
+def test_expired_period_is_not_found_and_swept(client, app_module, period_id, hours_file):
+    path = os.path.join(app_module.app.config['PERIOD_STATE_FOLDER'], f'{period_id}.pkl')
+    stale = time.time() - app_module.app.config['PERIOD_STATE_TTL'] - 60
+    os.utime(path, (stale, stale))
+    assert client.post(f'/api/periods/{period_id}/corrections', json={}).status_code == 404
+    assert client.get(f'/api/periods/{period_id}/punches').status_code == 404
+
+    # Saving another period sweeps the expired one
+    assert client.post('/api/periods', data=upload(hours_file)).status_code == 201
+    assert not os.path.exists(path)
+
+
+def test_download_resumes_with_range_requests(client, app_module, hours_file, tips_file):
+    app_module.app.config['IN_MEMORY_REPORTS'] = False
+    try:
+        url = wait_for_job(client, generate(client, hours_file, tips_file)['job_id'])['download_url']
+        partial = client.get(url, headers={'Range': 'bytes=0-99'})
+        assert partial.status_code == 206 and len(partial.get_data()) == 100
+        partial.close()
+        rest = client.get(url, headers={'Range': 'bytes=100-'})
+        assert rest.status_code == 206
+        report = partial.get_data() + rest.get_data()
+        rest.close()
+
+        # A partial download leaves the report in place; a complete one deletes it
+        full = client.get(url)
+        assert full.status_code == 200 and full.get_data() == report
+        assert full.mimetype == 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        full.close()
+        assert client.get(url).status_code == 404
+    finally:
+        app_module.app.config['IN_MEMORY_REPORTS'] = True
+
+
+def test_compute_returns_the_figures(client, hours_file, tips_file):
+    response = client.post('/api/compute', data=upload(hours_file, tips_file))
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['employees'] and set(data['tip_pools']) == {'Lunch', 'Dinner_General', 'Dinner_Servers'}
+
+    csv_response = client.post('/api/compute?format=csv', data=upload(hours_file, tips_file))
+    assert csv_response.mimetype == 'text/csv' and csv_response.get_data().startswith(b'Team Member,')
+
+
+@pytest.mark.parametrize('output_format', ['xlsx', 'pdf'])
+def test_compute_rejects_workbook_and_unknown_formats(client, hours_file, output_format):
+    response = client.post(f'/api/compute?format={output_format}', data=upload(hours_file))
+    assert response.status_code == 400 and 'format must be one of' in response.get_json()['error']
+
+
+def test_compute_needs_an_hours_file(client):
+    assert client.post('/api/compute', data={}).status_code == 400
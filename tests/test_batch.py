@@ -0,0 +1,122 @@
+# test_batch.py
+import os
+import shutil
+
+import pytest
+from openpyxl import load_workbook
+
+import tip
+from tip import _find_tips_file, find_batch_periods, read_batch_manifest
+
+START, END = '2025-07-28', '2025-08-10'
+
+
+def touch(directory, *names):
+    for name in names:
+        (directory / name).write_text('')
+
+
+def find(directory, location='downtown', period_locations=('downtown',), locations=('downtown', 'uptown')):
+    path = _find_tips_file(str(directory), START, END, location, locations, period_locations)
+    return os.path.basename(path) if path else None
+
+
+def test_file_naming_the_location_wins(tmp_path):
+    touch(tmp_path, f'tips_{END}.csv', f'tips_{END}_downtown.csv', f'tips_{END}_uptown.csv')
+    assert find(tmp_path, period_locations=('downtown', 'uptown')) == f'tips_{END}_downtown.csv'
+    assert find(tmp_path, 'uptown', ('downtown', 'uptown')) == f'tips_{END}_uptown.csv'
+
+
+def test_longer_location_is_not_this_one(tmp_path):
+    touch(tmp_path, f'tips_{END}_uptown-east.csv')
+    assert find(tmp_path, 'uptown', locations=('uptown', 'uptown-east')) is None
+
+
+def test_unnamed_file_is_used_for_a_single_location(tmp_path):
+    touch(tmp_path, f'tips_{START}_{END}.csv')
+    assert find(tmp_path) == f'tips_{START}_{END}.csv'
+
+
+def test_unnamed_file_is_ambiguous_across_locations(tmp_path, capsys):
+    touch(tmp_path, f'tips_{START}_{END}.csv')
+    assert find(tmp_path, period_locations=('downtown', 'uptown')) is None
+    assert 'no tips file for 2025-07-28 to 2025-08-10 names downtown' in capsys.readouterr().out
+
+
+def test_month_day_file_when_full_dates_are_for_other_locations(tmp_path, capsys):
+    touch(tmp_path, f'tips_{END}_uptown.csv', 'tips-8-10-downtown.csv')
+    assert find(tmp_path) == 'tips-8-10-downtown.csv'
+    touch(tmp_path, 'tips-8-10.csv')
+    os.remove(tmp_path / 'tips-8-10-downtown.csv')
+    assert find(tmp_path) == 'tips-8-10.csv'
+    assert 'Warning' not in capsys.readouterr().out
+
+
+def test_only_other_locations_warns(tmp_path, capsys):
+    touch(tmp_path, f'tips_{END}_uptown.csv', 'tips-8-10-uptown.csv')
+    assert find(tmp_path) is None
+    assert 'every tips file for 2025-07-28 to 2025-08-10' in capsys.readouterr().out
+
+
+def test_month_day_does_not_match_other_days(tmp_path):
+    touch(tmp_path, 'tips-8-100.csv', 'tips-18-10.csv')
+    assert find(tmp_path) is None
+
+
+@pytest.fixture
+def batch_dir(tmp_path, hours_file, tips_file):
+    """Two locations for one period, each with its own tips export."""
+    for location in ('downtown', 'uptown'):
+        shutil.copy(hours_file, tmp_path / f'hours-and-wages-summary_{START}_{END}_{location}.csv')
+        shutil.copy(tips_file, tmp_path / f'tips_{END}_{location}.csv')
+    return tmp_path
+
+
+def test_find_batch_periods(batch_dir):
+    periods = find_batch_periods(str(batch_dir), '/out')
+    assert [(period.location, os.path.basename(period.tips), period.output) for period in periods] == [
+        ('downtown', f'tips_{END}_downtown.csv', f'/out/payroll_{START}_{END}_downtown.xlsx'),
+        ('uptown', f'tips_{END}_uptown.csv', f'/out/payroll_{START}_{END}_uptown.xlsx'),
+    ]
+
+
+def test_manifest_paths_are_relative_to_it(batch_dir):
+    (batch_dir / 'manifest.csv').write_text(
+        'hours,tips,output,name\n'
+        f'hours-and-wages-summary_{START}_{END}_downtown.csv,tips_{END}_downtown.csv,,\n'
+        f'hours-and-wages-summary_{START}_{END}_uptown.csv,,uptown.xlsx,Uptown\n'
+    )
+    downtown, uptown = read_batch_manifest(str(batch_dir / 'manifest.csv'))
+    assert (downtown.location, downtown.tips) == ('downtown', str(batch_dir / f'tips_{END}_downtown.csv'))
+    assert (uptown.name, uptown.tips, uptown.output) == ('Uptown', None, str(batch_dir / 'uptown.xlsx'))
+
+
+def test_cli_writes_each_period_and_a_summary(batch_dir, tmp_path_factory):
+    output_dir = tmp_path_factory.mktemp('out')
+    assert tip.main([str(batch_dir), '-o', str(output_dir), '-j', '1']) == 0
+    assert sorted(os.listdir(output_dir)) == [
+        'batch-summary.xlsx', f'payroll_{START}_{END}_downtown.xlsx', f'payroll_{START}_{END}_uptown.xlsx'
+    ]
+    summary = load_workbook(output_dir / 'batch-summary.xlsx')['Summary']
+    downtown, uptown, total = summary.iter_rows(min_row=2, values_only=True)
+    assert (downtown[1], uptown[1], total[0]) == ('downtown', 'uptown', 'TOTAL')
+    assert downtown[2:] == uptown[2:] and downtown[-1] > 0  # Same exports, same figures
+    assert total[-1] == pytest.approx(downtown[-1] + uptown[-1])
+
+
+def test_cli_combined_workbook(batch_dir, tmp_path):
+    combined = tmp_path / 'combined.xlsx'
+    assert tip.main([str(batch_dir), '--combined', str(combined), '-j', '1', '--write-only']) == 0
+    assert load_workbook(combined).sheetnames == ['Summary', f'downtown_{START}', f'uptown_{START}']
+
+
+def test_cli_reports_failed_periods(batch_dir, tmp_path_factory, capsys):
+    (batch_dir / f'hours-and-wages-summary_{START}_{END}_uptown.csv').write_text('First,Last\nAna,Lopez\n')
+    output_dir = tmp_path_factory.mktemp('out')
+    assert tip.main([str(batch_dir), '-o', str(output_dir), '-j', '1']) == 1
+    assert f'1 of 2 periods failed: {START}_{END}_uptown' in capsys.readouterr().out
+    assert os.path.exists(output_dir / f'payroll_{START}_{END}_downtown.xlsx')
+
+
+def test_cli_without_hours_files(tmp_path):
+    assert tip.main([str(tmp_path)]) == 1
@@ -0,0 +1,29 @@
+# test_gunicorn_conf.py
+import importlib.util
+import logging
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import ROOT
+
+
+@pytest.fixture
+def conf():
+    spec = importlib.util.spec_from_file_location('gunicorn_conf', os.path.join(ROOT, 'gunicorn.conf.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_one_worker_that_is_never_recycled(conf):
+    assert conf.workers == 1 and conf.preload_app
+    assert not hasattr(conf, 'max_requests') and not hasattr(conf, 'max_requests_jitter')
+
+
+def test_refuses_more_workers(conf):
+    server = SimpleNamespace(cfg=SimpleNamespace(workers=2), log=logging.getLogger('gunicorn.test'))
+    with pytest.raises(SystemExit):
+        conf.on_starting(server)
+    conf.on_starting(SimpleNamespace(cfg=SimpleNamespace(workers=1), log=server.log))
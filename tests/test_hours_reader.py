@@ -0,0 +1,66 @@
+# test_hours_reader.py
+import io
+
+import pandas as pd
+import pytest
+
+import hours_reader
+from hours_reader import clock_minutes, format_clock_minutes, read_hours_csv
+from payroll import ROLE_MAP
+
+EXPORT = (
+    'First, Last,Role,In Time,Out Time,Regular hours,Wage\n'
+    'Ana , Lopez,Shift Leader, 9:00AM,2:30PM ,5.5,18\n'
+    'Luis, Perez,, 4:00PM,12:15AM,8.25,15\n'
+    ',Smith,Busser,,,0,15\n'
+)
+
+
+def test_cleans_names_roles_and_times():
+    df = read_hours_csv(io.BytesIO(EXPORT.encode()), ROLE_MAP)
+    assert list(df.columns) == ['Team Member', 'Role', 'In Time', 'Out Time', 'Regular hours']
+    assert df['Team Member'].tolist()[:2] == ['Ana Lopez', 'Luis Perez'] and pd.isna(df['Team Member'][2])
+    assert df['Role'].tolist() == ['Lead', 'No Role', 'Busser']
+    assert df['In Time'].tolist()[:2] == [9 * 60, 16 * 60] and df['Out Time'].tolist()[:2] == [14 * 60 + 30, 15]
+    assert df['In Time'].isna().tolist() == [False, False, True]
+    assert df['Regular hours'].tolist() == [5.5, 8.25, 0.0]
+
+
+def test_engines_read_the_same(tmp_path, monkeypatch, hours_file):
+    pytest.importorskip('pyarrow')
+    monkeypatch.setattr(hours_reader, 'CSV_ENGINE', 'pyarrow')
+    with_pyarrow = read_hours_csv(hours_file, ROLE_MAP)
+    monkeypatch.setattr(hours_reader, 'CSV_ENGINE', 'c')
+    pd.testing.assert_frame_equal(with_pyarrow, read_hours_csv(hours_file, ROLE_MAP), check_categorical=False)
+
+
+def test_unseekable_stream_is_buffered():
+    class Upload(io.BytesIO):
+        def seekable(self):
+            return False
+
+    df = read_hours_csv(Upload(EXPORT.encode()), ROLE_MAP)
+    assert len(df) == 3
+
+
+def test_bad_time_is_rejected():
+    with pytest.raises(ValueError):
+        read_hours_csv(io.StringIO(EXPORT.replace('9:00AM', '9:00XM')), ROLE_MAP)
+
+
+def test_clock_round_trip():
+    assert clock_minutes('12:05AM') == 5 and clock_minutes('12:05PM') == 12 * 60 + 5
+    assert format_clock_minutes(clock_minutes('4:30PM')) == '04:30PM'
+    assert format_clock_minutes(pd.NA) is None
+
+
+def test_clock_times_are_memoized():
+    read_hours_csv(io.StringIO(EXPORT), ROLE_MAP)
+    misses = clock_minutes.cache_info().misses
+    df = read_hours_csv(io.StringIO(EXPORT), ROLE_MAP)
+    assert clock_minutes.cache_info().misses == misses  # Every time was already parsed
+    assert str(df['In Time'].dtype) == 'Int16'
+    # Bad times raise each time rather than being cached
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            clock_minutes('9:00XM')
@@ -0,0 +1,88 @@
+# test_jobs.py
+import os
+import signal
+import time
+
+import pytest
+
+from jobs import JobQueue, QueueFullError
+
+
+def kill_worker():
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+def fail():
+    raise ValueError('bad hours file')
+
+
+def wait_for(queue, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.status(job_id)
+        if job['finished']:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+@pytest.fixture
+def queue():
+    queue = JobQueue(max_workers=1, max_pending=2)
+    yield queue
+    if queue._executor is not None:
+        queue._executor.shutdown(cancel_futures=True)
+
+
+def test_job_result_and_info(queue):
+    job = wait_for(queue, queue.submit(pow, 2, 10, filename='hours.csv'))
+    assert (job['status'], job['result'], job['error'], job['info']) == ('done', 1024, None, {'filename': 'hours.csv'})
+    assert queue.stats()['succeeded'] == 1
+
+
+def test_failed_job_reaches_on_done(queue):
+    seen = []
+    job = wait_for(queue, queue.submit(fail, on_done=seen.append))
+    assert (job['status'], job['error']) == ('failed', 'bad hours file')
+    assert isinstance(seen[0]['exception'], ValueError)
+
+
+def test_on_done_error_fails_the_job(queue):
+    def on_done(job):
+        raise OSError('disk full')
+
+    job = wait_for(queue, queue.submit(pow, 2, 10, on_done=on_done))
+    assert (job['status'], job['error']) == ('failed', 'disk full')
+
+
+def test_keep_result_false_drops_the_result(queue):
+    seen = []
+    job = wait_for(queue, queue.submit(pow, 2, 10, on_done=seen.append, keep_result=False))
+    assert job['result'] is None and seen[0]['result'] == 1024
+
+
+def test_full_queue_rejects(queue):
+    queue.submit(time.sleep, 0.5)
+    queue.submit(time.sleep, 0.5)
+    with pytest.raises(QueueFullError):
+        queue.submit(time.sleep, 0.5)
+    assert queue.stats()['rejected'] == 1
+
+
+def test_pool_recovers_after_a_worker_is_killed(queue):
+    job = wait_for(queue, queue.submit(kill_worker))
+    assert job['status'] == 'failed'
+
+    job = wait_for(queue, queue.submit(pow, 2, 10))
+    assert (job['status'], job['result']) == ('done', 1024)
+    assert queue.stats()['failed'] == 1 and queue.stats()['succeeded'] == 1
+
+
+def test_submit_to_a_pool_broken_before_its_callback_ran(queue):
+    wait_for(queue, queue.submit(pow, 2, 10))
+    broken = queue._executor
+    broken._broken = 'A child process terminated abruptly'  # As the pool marks itself when a worker dies
+
+    job = wait_for(queue, queue.submit(pow, 2, 10))
+    assert (job['status'], job['result']) == ('done', 1024)
+    assert queue._executor is not broken
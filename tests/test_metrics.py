@@ -0,0 +1,46 @@
+# test_metrics.py
+import pickle
+
+from metrics import ReportMetrics
+from report_stats import ReportFailedError, ReportStats
+
+
+def report_stats(seconds, error=None, **counts):
+    stats = ReportStats()
+    stats.phases['parse'] = seconds
+    stats.counts.update(counts)
+    stats.error = error
+    return stats.finish()
+
+
+def test_stats_record_phases_counts_and_worker_peak():
+    stats = ReportStats()
+    with stats.phase('parse'):
+        pass
+    with stats.phase('parse'):
+        pass
+    stats.count('cells', 10)
+    stats.count('cells', 5)
+    stats.finish()
+    assert list(stats.phases) == ['parse'] and stats.counts == {'cells': 15}
+    assert stats.as_dict()['worker_peak_rss_bytes'] > 0
+
+
+def test_failed_report_error_pickles_with_its_stats():
+    error = pickle.loads(pickle.dumps(ReportFailedError('the report could not be generated', report_stats(0.2, 'bad'))))
+    assert str(error) == 'the report could not be generated'
+    assert error.stats.error == 'bad' and error.stats.phases == {'parse': 0.2}
+
+
+def test_render_groups_reports_by_outcome():
+    metrics = ReportMetrics(buckets=(0.1, 1))
+    metrics.observe(report_stats(0.05, hours_rows=100))
+    metrics.observe(report_stats(0.5, 'bad hours file', hours_rows=20))
+    text = metrics.render(gauges=[('payroll_jobs_pending', 'Report jobs queued or running.', 3, {})])
+    assert 'payroll_reports_total{outcome="ok"} 1' in text
+    assert 'payroll_reports_total{outcome="error"} 1' in text
+    assert 'payroll_report_phase_seconds_bucket{phase="parse",le="0.1"} 1' in text
+    assert 'payroll_report_phase_seconds_count{phase="parse"} 2' in text
+    assert 'payroll_report_items_total{item="hours_rows"} 120' in text
+    assert '# TYPE payroll_worker_peak_rss_bytes gauge' in text
+    assert 'payroll_jobs_pending 3' in text
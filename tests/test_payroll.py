@@ -0,0 +1,58 @@
+# test_payroll.py
+import pickle
+
+import numpy as np
+import pytest
+
+import payroll
+import tip
+from payroll import compute_payroll, payroll_result
+
+
+@pytest.fixture(scope='module')
+def result(hours_file, tips_file):
+    return compute_payroll(hours_file, tips_file)
+
+
+def test_settings_are_still_importable_from_tip():
+    for name in ('ALLOCATION_TABLE', 'SALARY_EMPLOYEES', 'HEADER_STRUCTURE', 'ROLE_MAP', 'SPLIT_ROLES'):
+        assert getattr(tip, name) is getattr(payroll, name)
+
+
+def test_result_totals(result):
+    assert result.total_hours == pytest.approx(result.role_totals.sum())
+    assert 'Total Hours' not in result.role_columns
+    assert result.allocation.employees == list(result.roster.employees)
+    assert list(result.hours.index) == list(result.roster.employees)  # The DataFrame edge
+
+
+def test_result_is_detached_from_its_inputs(result):
+    hours = result.roster.hours.copy()
+    copy = payroll_result(result.roster._replace(hours=hours), result.allocation, {'Ana Lopez': 10.0})
+    hours[0, 0] = -1
+    assert copy.roster.hours[0, 0] != -1
+    with pytest.raises(ValueError):
+        copy.roster.hours[0, 0] = 1
+    with pytest.raises(ValueError):
+        copy.allocation.employee_tips[0, 0] = 1
+    with pytest.raises(TypeError):
+        copy.servers_tips['Ana Lopez'] = 1
+
+
+def test_result_pickles_for_batch_workers(result):
+    copy = pickle.loads(pickle.dumps(result))
+    assert copy.roster.employees == result.roster.employees
+    np.testing.assert_array_equal(copy.roster.hours, result.roster.hours)
+    assert dict(copy.servers_tips) == dict(result.servers_tips)
+    np.testing.assert_array_equal(copy.allocation.employee_tips, result.allocation.employee_tips)
+
+
+def test_unusable_tips_file_leaves_no_allocation(tmp_path, hours_file):
+    (tmp_path / 'tips.csv').write_bytes(b'\xff\xfe not a tips export')
+    assert compute_payroll(hours_file, str(tmp_path / 'tips.csv')).allocation is None
+
+
+def test_chunked_read_sums_like_a_whole_read(hours_file):
+    whole = payroll.aggregate_hours(payroll.split_shifts(payroll.read_hours_file(hours_file), payroll.SPLIT_ROLES))
+    chunked = payroll.aggregate_hours(payroll.read_shift_hours(hours_file, 50))
+    assert chunked.to_frame().equals(whole.to_frame())
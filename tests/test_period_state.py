@@ -0,0 +1,131 @@
+# test_period_state.py
+import copy
+import csv
+import io
+import os
+import time
+
+import numpy as np
+import pytest
+
+from hours_reader import HOURS_COLUMNS
+from payroll import compute_payroll
+from period_state import PeriodState, expire_period_states
+
+
+@pytest.fixture(scope='module')
+def saved_state(hours_file, tips_file):
+    return PeriodState.build(hours_file, tips_file)
+
+
+@pytest.fixture
+def state(saved_state):
+    return copy.deepcopy(saved_state)
+
+
+@pytest.fixture(scope='module')
+def export_rows(hours_file):
+    """The hours export as {punch id: punch} in the format corrections use."""
+    with open(hours_file, newline='') as f:
+        return {punch_id: {name.strip(): value for name, value in row.items()}
+                for punch_id, row in enumerate(csv.DictReader(f))}
+
+
+def recompute(rows, tips_file):
+    """A full recompute of the corrected export."""
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=HOURS_COLUMNS)
+    writer.writeheader()
+    writer.writerows(rows)
+    return compute_payroll(io.StringIO(output.getvalue()), tips_file)
+
+
+def assert_same_result(result, expected):
+    assert result.hours.equals(expected.hours)
+    np.testing.assert_allclose(result.allocation.employee_tips, expected.allocation.employee_tips)
+    np.testing.assert_allclose(result.allocation.role_tips, expected.allocation.role_tips)
+    assert result.allocation.matched_servers == expected.allocation.matched_servers
+
+
+def punch(**fields):
+    row = {'First': 'Nora', 'Last': 'Quinn', 'Role': 'Busser', 'In Time': '3:00PM', 'Out Time': '9:30PM',
+           'Regular hours': '6.5'}
+    row.update(fields)
+    return row
+
+
+def test_added_punches_match_a_full_recompute(state, export_rows, tips_file):
+    added = [punch(), punch(First=export_rows[0]['First'], Last=export_rows[0]['Last'], Role='Server')]
+    result = state.apply(added=added)
+    assert_same_result(result, recompute(list(export_rows.values()) + added, tips_file))
+
+
+def test_edited_punches_match_a_full_recompute(state, export_rows, tips_file):
+    edited = {3: dict(export_rows[3], Role='Host/Hostess'), '7': dict(export_rows[7], **{'Out Time': '11:45PM'})}
+    result = state.apply(edited=edited)
+    rows = {**export_rows, 3: edited[3], 7: edited['7']}
+    assert_same_result(result, recompute(rows.values(), tips_file))
+
+
+def test_removed_punches_match_a_full_recompute(state, export_rows, tips_file):
+    result = state.apply(removed=[1, 5, 8])
+    rows = [row for punch_id, row in export_rows.items() if punch_id not in (1, 5, 8)]
+    assert_same_result(result, recompute(rows, tips_file))
+
+
+def test_removing_an_employee_matches_a_full_recompute(state, export_rows, tips_file):
+    name = state.punches.loc[0, 'Team Member']
+    removed = list(state.employee_punches(name).index)
+    result = state.apply(removed=removed)
+    assert name not in result.hours.index
+    assert_same_result(result, recompute([row for punch_id, row in export_rows.items() if punch_id not in removed],
+                                         tips_file))
+
+
+def test_save_and_load(state, tmp_path):
+    state.apply(added=[punch()])
+    state.save(str(tmp_path / 'period.pkl'))
+    loaded = PeriodState.load(str(tmp_path / 'period.pkl'))
+    assert loaded.result().hours.equals(state.result().hours)
+
+
+@pytest.mark.parametrize('correction, message', [
+    ({'added': [{k: v for k, v in punch().items() if k != 'Role'}]}, 'added punch 1 is missing Role'),
+    ({'added': [punch(Wage='15')]}, 'added punch 1 has unknown fields Wage'),
+    ({'added': [punch(**{'In Time': '25:00PM'})]}, "added punch 1 has In Time '25:00PM'"),
+    ({'added': [punch(**{'Out Time': 930})]}, 'added punch 1 has Out Time 930'),
+    ({'edited': {'2': punch(**{'Regular hours': 'six'})}}, "edited punch 2 has Regular hours 'six'"),
+    ({'added': ['Nora Quinn']}, 'added punch 1 must be an object'),
+    ({'added': punch()}, 'added must be a list'),
+    ({'removed': 5}, 'removed must be a list'),
+    ({'removed': ['first']}, "'first' is not a punch id"),
+    ({'edited': [punch()]}, 'edited must map punch ids'),
+    ({'removed': [2], 'edited': {'2': punch()}}, 'punch ids 2 are both edited and removed'),
+])
+def test_malformed_corrections_are_rejected(state, saved_state, correction, message):
+    with pytest.raises(ValueError, match=message):
+        state.apply(**correction)
+    assert state.punches.equals(saved_state.punches) and state.hours.equals(saved_state.hours)
+
+
+def test_blank_times_are_allowed(state):
+    state.apply(added=[punch(**{'In Time': '', 'Out Time': None})])
+
+
+def test_unknown_punch_ids(state):
+    with pytest.raises(KeyError, match='Unknown punch ids: 99999'):
+        state.apply(removed=[99999])
+
+
+def test_expired_periods_are_swept(tmp_path, state):
+    old, new = str(tmp_path / 'old.pkl'), str(tmp_path / 'new.pkl')
+    state.save(old)
+    state.save(new)
+    for name in ('old.pkl.lock', 'gone.pkl.lock', 'old.pkl.123.tmp'):
+        (tmp_path / name).write_text('')
+    stale = time.time() - 3600
+    for name in ('old.pkl', 'old.pkl.123.tmp'):
+        os.utime(tmp_path / name, (stale, stale))
+
+    assert expire_period_states(str(tmp_path), max_age=60) == 1
+    assert sorted(os.listdir(tmp_path)) == ['new.pkl']
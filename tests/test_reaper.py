@@ -0,0 +1,32 @@
+# test_reaper.py
+import time
+
+from reaper import FileReaper
+
+
+def test_files_are_removed_after_their_delay(tmp_path):
+    reaper = FileReaper()
+    soon, later = tmp_path / 'soon.csv', tmp_path / 'later.csv'
+    soon.write_text('x')
+    later.write_text('x')
+    reaper.schedule(str(later), delay=60)
+    reaper.schedule(str(soon), delay=0.05)
+
+    deadline = time.time() + 5
+    while reaper.stats()['reaped'] < 1 and time.time() < deadline:  # Counted once the file is gone
+        time.sleep(0.01)
+    assert not soon.exists() and later.exists()
+    assert reaper.stats()['reaped'] == 1 and reaper.stats()['pending'] == 1
+
+
+def test_release_removes_only_the_owners_files(tmp_path):
+    reaper = FileReaper()
+    paths = [tmp_path / name for name in ('a_hours.csv', 'a_report.xlsx', 'b_hours.csv')]
+    for path in paths:
+        path.write_text('x')
+    for path in paths:
+        reaper.schedule(str(path), delay=60, owner=path.name[0])
+
+    assert reaper.release('a') == 2
+    assert [path.exists() for path in paths] == [False, False, True]
+    assert reaper.stats() == {'pending': 1, 'owners': 1, 'reaped': 0, 'released': 2, 'errors': 0}
@@ -0,0 +1,98 @@
+# test_renderers.py
+import csv
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from allocation import POOLS
+from payroll import compute_payroll
+from renderers import PARQUET_ENGINE, POOL_LABELS, get_renderer, render, renderer_for_file, result_to_frame
+from tip import create_final_payroll_report
+
+
+@pytest.fixture(scope='module')
+def result(hours_file, tips_file):
+    return compute_payroll(hours_file, tips_file)
+
+
+@pytest.fixture(scope='module')
+def result_without_tips(hours_file):
+    return compute_payroll(hours_file)
+
+
+def rendered(result, name):
+    output = io.BytesIO()
+    render(result, name, output)
+    return output.getvalue()
+
+
+def test_csv_layout(result):
+    data = rendered(result, 'csv')
+    assert data.count(b'\r\n') == data.count(b'\n')  # Excel-style line endings
+    header, *rows = list(csv.reader(io.StringIO(data.decode('utf-8'))))
+    columns = result.role_columns
+    assert header == (['Team Member'] + columns + ['Total Hours'] + [f"{column} Tips" for column in columns]
+                      + ['Total Tips'])
+
+    employees, totals = rows[:-len(POOLS) - 1], rows[-len(POOLS) - 1:]
+    assert [row[0] for row in employees] == list(result.roster.employees)
+    for row, hours in zip(employees, result.roster.report_hours()):
+        assert [float(value) for value in row[1:len(columns) + 2]] == pytest.approx(list(hours))
+
+    assert [row[0] for row in totals] == ['ROLE TOTALS'] + [POOL_LABELS[pool] for pool in POOLS]
+    role_totals = [float(value) for value in totals[0][1:len(columns) + 1]]
+    assert role_totals == pytest.approx(list(result.role_totals))
+    # Pool rows only fill the tip columns
+    for row, role_tips in zip(totals[1:], result.allocation.role_tips):
+        assert row[1:len(columns) + 2] == [''] * (len(columns) + 1)
+        assert [float(value) for value in row[len(columns) + 2:-1]] == pytest.approx(list(role_tips))
+
+
+def test_csv_without_tips(result_without_tips):
+    header, *rows = list(csv.reader(io.StringIO(rendered(result_without_tips, 'csv').decode('utf-8'))))
+    assert header[-1] == 'Total Hours' and rows[-1][0] == 'ROLE TOTALS'
+    assert float(rows[-1][-1]) == pytest.approx(result_without_tips.total_hours)
+
+
+def test_json_structure(result):
+    data = json.loads(rendered(result, 'json'))
+    assert data['columns'] == result.role_columns
+    assert [employee['name'] for employee in data['employees']] == list(result.roster.employees)
+    # Only non-zero amounts are listed per employee
+    for employee, hours in zip(data['employees'], result.roster.hours):
+        assert employee['hours'] == {column: value for column, value in zip(data['columns'], hours) if value}
+        assert employee['total_hours'] == pytest.approx(hours.sum())
+    assert set(data['tip_pools']) == set(POOLS)
+    assert data['total_tips'] == pytest.approx(sum(pool['total'] for pool in data['tip_pools'].values()))
+    assert data['total_hours'] == pytest.approx(sum(data['role_totals'].values()))
+
+
+def test_json_without_tips(result_without_tips):
+    data = json.loads(rendered(result_without_tips, 'json'))
+    assert (data['tip_pools'], data['total_tips'], data['unmatched_servers']) == (None, None, {})
+    assert all('tips' not in employee for employee in data['employees'])
+
+
+@pytest.mark.skipif(PARQUET_ENGINE is None, reason='no Parquet engine installed')
+def test_parquet_round_trip(result):
+    frame = pd.read_parquet(io.BytesIO(rendered(result, 'parquet')), engine=PARQUET_ENGINE)
+    pd.testing.assert_frame_equal(frame, result_to_frame(result))
+
+
+def test_unknown_format(tmp_path, hours_file):
+    with pytest.raises(ValueError, match="Unknown report format 'pdf'"):
+        get_renderer('pdf')
+    assert renderer_for_file('report.csv') is get_renderer('csv') and renderer_for_file('report.pdf') is None
+
+    stats = create_final_payroll_report(hours_file, str(tmp_path / 'report.pdf'), output_format='pdf')
+    assert 'Unknown report format' in stats.error and 'hours_rows' not in stats.counts
+    assert not (tmp_path / 'report.pdf').exists()
+
+
+def test_report_in_another_format(tmp_path, hours_file, tips_file, result):
+    path = tmp_path / 'report.csv'
+    stats = create_final_payroll_report(hours_file, str(path), tips_file, output_format='csv')
+    assert stats.error is None and stats.counts['bytes'] == path.stat().st_size
+    assert path.read_bytes() == rendered(result, 'csv')
@@ -0,0 +1,119 @@
+# test_report.py
+"""
+Every report option must produce the same figures as the default in-memory
+workbook, which is what the report looked like before the options existed.
+"""
+import operator
+
+import pytest
+from openpyxl import load_workbook
+from openpyxl.utils import range_boundaries
+
+from conftest import workbook_cells
+from tip import SALARY_EMPLOYEES, create_final_payroll_report
+from xlsx_stream import SHEET_TITLES
+
+COMPARISONS = {'greaterThanOrEqual': operator.ge, 'greaterThan': operator.gt}
+
+
+@pytest.fixture(scope='module')
+def baseline(tmp_path_factory, hours_file, tips_file):
+    """Cells of the default report for the shared synthetic period."""
+    path = str(tmp_path_factory.mktemp('baseline') / 'report.xlsx')
+    stats = create_final_payroll_report(hours_file, path, tips_file)
+    assert stats.error is None
+    return workbook_cells(path)
+
+
+def build(tmp_path, hours_file, tips_file, **options):
+    path = str(tmp_path / 'report.xlsx')
+    stats = create_final_payroll_report(hours_file, path, tips_file, **options)
+    assert stats.error is None
+    return path, stats
+
+
+def test_write_only_matches_baseline(tmp_path, hours_file, tips_file, baseline):
+    path, _ = build(tmp_path, hours_file, tips_file, write_only=True)
+    assert workbook_cells(path) == baseline
+
+
+@pytest.mark.parametrize('chunksize', [37, 10000])
+def test_chunked_hours_match_baseline(tmp_path, hours_file, tips_file, baseline, chunksize):
+    path, stats = build(tmp_path, hours_file, tips_file, chunksize=chunksize)
+    assert workbook_cells(path) == baseline
+    assert stats.counts['hours_rows'] == 600
+
+
+def rule_fill(ws, cell):
+    """The fill colour Excel shows for a cell under the sheet's conditional formatting rules, or None."""
+    rules = []
+    for formatting in ws.conditional_formatting:
+        for cell_range in formatting.sqref.ranges:
+            min_col, min_row, max_col, max_row = range_boundaries(str(cell_range))
+            if min_col <= cell.column <= max_col and min_row <= cell.row <= max_row:
+                rules += formatting.rules
+    for rule in sorted(rules, key=lambda rule: rule.priority):
+        if rule.type == 'expression':
+            # The salary rule matches the row's Team Member; TRUE always matches
+            matched = rule.formula[0] == 'TRUE' or ws.cell(cell.row, 1).value in SALARY_EMPLOYEES
+        else:
+            matched = COMPARISONS[rule.operator](cell.value, float(rule.formula[0]))
+        if matched:
+            return rule.dxf.fill.fgColor.rgb
+    return None
+
+
+def assert_shows_the_same(ws, cell, expected_cell):
+    """cell shows the value, number format and fill of expected_cell, with fills from rules or the cell."""
+    if isinstance(expected_cell.value, float):
+        assert cell.value == pytest.approx(expected_cell.value)
+    else:
+        assert cell.value == expected_cell.value
+    assert cell.number_format == expected_cell.number_format
+    expected_fill = expected_cell.fill.fgColor.rgb if expected_cell.fill.fill_type else None
+    fill = cell.fill.fgColor.rgb if cell.fill.fill_type else rule_fill(ws, cell)
+    assert (fill or '')[-6:] == (expected_fill or '')[-6:], (ws.title, cell.coordinate)
+
+
+@pytest.fixture(scope='module')
+def baseline_sheet(tmp_path_factory, hours_file, tips_file):
+    """The Payroll Summary sheet of the default report, with its per-cell fills."""
+    path = str(tmp_path_factory.mktemp('baseline') / 'report.xlsx')
+    create_final_payroll_report(hours_file, path, tips_file)
+    return load_workbook(path).active
+
+
+@pytest.mark.parametrize('write_only', [False, True])
+def test_conditional_formatting_shows_the_same_fills(tmp_path, hours_file, tips_file, baseline_sheet, write_only):
+    path, _ = build(tmp_path, hours_file, tips_file, write_only=write_only, conditional_formatting=True)
+    ws = load_workbook(path).active
+    assert ws.conditional_formatting
+    for row in baseline_sheet.iter_rows():
+        for expected_cell in row:
+            assert_shows_the_same(ws, ws[expected_cell.coordinate], expected_cell)
+
+
+@pytest.mark.parametrize('conditional_formatting', [False, True])
+def test_multi_sheet_matches_baseline(tmp_path, hours_file, tips_file, baseline_sheet, conditional_formatting):
+    path, stats = build(tmp_path, hours_file, tips_file, multi_sheet=True,
+                        conditional_formatting=conditional_formatting)
+    wb = load_workbook(path)
+    assert wb.sheetnames == list(SHEET_TITLES)
+    employees = wb['Hours'].max_row - 3
+    assert employees == stats.counts['employees']
+
+    # Each sheet's table sits further down the single sheet. With conditional formatting, the Individual
+    # Tips rules only show the right colours if their dxf ids were shifted past the Hours sheet's
+    for title, offset in (('Hours', 0), ('Pool Allocation', employees + 2), ('Individual Tips', employees + 12)):
+        ws = wb[title]
+        assert bool(ws.conditional_formatting) == (conditional_formatting and title != 'Pool Allocation')
+        for row in ws.iter_rows(min_row=3):
+            for cell in row:
+                assert_shows_the_same(ws, cell, baseline_sheet.cell(cell.row + offset, cell.column))
+        assert baseline_sheet.cell(ws.max_row + offset + 1, 1).value is None  # The whole table was compared
+
+
+def test_missing_hours_file_is_reported(tmp_path, tips_file):
+    stats = create_final_payroll_report(str(tmp_path / 'missing.csv'), str(tmp_path / 'report.xlsx'), tips_file)
+    assert stats.error.startswith('File not found')
+    assert not (tmp_path / 'report.xlsx').exists()
@@ -0,0 +1,64 @@
+# test_report_cache.py
+import os
+import time
+
+import pytest
+
+from report_cache import ReportCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ReportCache(str(tmp_path / 'cache'), max_bytes=1000, max_age=3600)
+
+
+def test_key_depends_on_contents_and_fingerprint(tmp_path, cache):
+    hours = tmp_path / 'renamed_hours.csv'
+    hours.write_bytes(b'hours')
+    key = cache.key(b'hours', b'tips', 'config')
+    assert cache.key(str(hours), b'tips', 'config') == key  # Paths and bytes hash the same
+    assert cache.key(b'hours', None, 'config') != key
+    assert cache.key(b'hours', b'tips', 'config:csv') != key
+
+
+def test_hit_miss_and_stats(tmp_path, cache):
+    key = cache.key(b'hours', None, 'config')
+    assert cache.read(key) is None
+    cache.write(key, b'report bytes')
+    destination = tmp_path / 'report.xlsx'
+    assert cache.get(key, str(destination))
+    assert destination.read_bytes() == b'report bytes'
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'entries': 1, 'bytes': len(b'report bytes')}
+
+
+def test_put_copies_a_report_file(tmp_path, cache):
+    report = tmp_path / 'report.csv'
+    report.write_bytes(b'a,b\r\n')
+    cache.put('key', str(report))
+    report.unlink()
+    assert cache.read('key') == b'a,b\r\n'
+
+
+def test_expired_entry_is_a_miss(cache):
+    cache.write('old', b'x')
+    stale = time.time() - 2 * cache.max_age
+    os.utime(cache._path('old'), (stale, stale))
+    assert cache.read('old') is None
+    assert not os.path.exists(cache._path('old'))
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    for index, key in enumerate(['a', 'b', 'c']):
+        cache.write(key, b'x' * 300)
+        os.utime(cache._path(key), (index, time.time() - 100 + index))
+    cache.read('a')  # Now the most recently used
+    cache.write('d', b'x' * 300)
+    assert [key for key in 'abcd' if os.path.exists(cache._path(key))] == ['a', 'c', 'd']
+
+
+def test_legacy_entries_are_dropped(cache):
+    legacy = os.path.join(cache.directory, 'oldkey.xlsx')
+    with open(legacy, 'wb') as f:
+        f.write(b'x')
+    cache.write('new', b'y')
+    assert not os.path.exists(legacy)
@@ -0,0 +1,34 @@
+# test_report_store.py
+import pytest
+
+from report_store import ReportStore, ReportTooLargeError
+
+
+def test_report_is_handed_out_once():
+    store = ReportStore(max_bytes=100)
+    store.put('a.xlsx', b'report')
+    assert 'a.xlsx' in store
+    assert store.pop('a.xlsx') == b'report'
+    assert store.pop('a.xlsx') is None
+
+
+def test_oldest_reports_make_room():
+    store = ReportStore(max_bytes=10)
+    store.put('a.xlsx', b'x' * 6)
+    store.put('b.xlsx', b'x' * 6)
+    assert 'a.xlsx' not in store and 'b.xlsx' in store
+    assert store.stats() == {'reports': 1, 'bytes': 6, 'evicted': 1}
+
+
+def test_expired_reports_are_dropped():
+    store = ReportStore(ttl=0)
+    store.put('a.xlsx', b'report')
+    assert store.pop('a.xlsx') is None
+
+
+def test_oversize_report_is_refused():
+    store = ReportStore(max_bytes=10)
+    store.put('a.xlsx', b'x' * 6)
+    with pytest.raises(ReportTooLargeError, match='11 bytes, the limit is 10'):
+        store.put('b.xlsx', b'x' * 11)
+    assert 'a.xlsx' in store  # Refusing it doesn't evict anything
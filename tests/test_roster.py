@@ -0,0 +1,46 @@
+# test_roster.py
+import numpy as np
+import pandas as pd
+
+from roster import TOTAL_COLUMN, Roster, build_roster, roster_from_frame
+
+COLUMNS = ['Busser_Lunch', 'Busser_Dinner', 'Kitchen']
+
+
+def shift_rows(*rows):
+    return pd.DataFrame(list(rows), columns=['Team Member', 'Role_Shift', 'Hours'])
+
+
+def test_build_roster_interns_and_sums():
+    roster = build_roster(shift_rows(
+        ('Zoe Park', 'Kitchen', 6.0), ('Ana Lopez', 'Busser_Lunch', 3.5), ('Ana Lopez', 'Busser_Lunch', 2.0),
+        ('Ana Lopez', 'Kitchen', None), ('Luis Perez', 'Dishwasher', 8.0), (None, 'Kitchen', 4.0),
+    ), COLUMNS)
+    # Unknown columns are dropped but their employee keeps a row; nameless rows are skipped
+    assert list(roster.employees) == ['Ana Lopez', 'Luis Perez', 'Zoe Park']
+    np.testing.assert_array_equal(roster.hours, [[5.5, 0, 0], [0, 0, 0], [0, 0, 6.0]])
+
+
+def test_report_hours_and_totals():
+    roster = Roster(['Ana Lopez', 'Zoe Park'], COLUMNS, np.array([[1.0, 2.0, 0.0], [0.5, 0.0, 4.0]]))
+    assert roster.report_columns == COLUMNS + [TOTAL_COLUMN]
+    np.testing.assert_array_equal(roster.report_hours(), [[1.0, 2.0, 0.0, 3.0], [0.5, 0.0, 4.0, 4.5]])
+    np.testing.assert_array_equal(roster.role_totals(), [1.5, 2.0, 4.0])
+
+
+def test_frame_round_trip():
+    employees = np.array(['Ana Lopez', 'Zoe Park'], dtype=object)
+    roster = Roster(employees, COLUMNS, np.array([[1.0, 2.0, 0.0], [0.5, 0.0, 4.0]]))
+    frame = roster.to_frame()
+    assert (frame.index.name, frame.columns.name) == ('Team Member', 'Role_Shift')
+    assert list(frame.columns) == roster.report_columns and frame[TOTAL_COLUMN].tolist() == [3.0, 4.5]
+
+    back = roster_from_frame(frame)
+    assert list(back.employees) == list(roster.employees) and back.columns == COLUMNS
+    np.testing.assert_array_equal(back.hours, roster.hours)
+
+
+def test_empty_roster():
+    roster = build_roster(shift_rows(), COLUMNS)
+    assert len(roster.employees) == 0 and roster.hours.shape == (0, len(COLUMNS))
+    assert roster.to_frame().empty and roster.role_totals().tolist() == [0.0, 0.0, 0.0]
@@ -0,0 +1,84 @@
+# test_rules.py
+import copy
+import json
+
+import pytest
+
+from rules import RULES_FILE, RulesError, compile_rules, config_fingerprint, load_rules
+
+
+@pytest.fixture
+def config():
+    with open(RULES_FILE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_shipped_rules_compile(config):
+    rules = compile_rules(config)
+    assert rules.columns[:3] == ['Server', 'Busser_Lunch', 'Busser_Dinner']
+    assert rules.column_rates['Busser_Lunch'] == (0.225, 0, 0)
+    assert rules.column_rates['Busser_Dinner'] == (0, 0.2, 0.25)
+    assert rules.column_rates['Kitchen'] == (0.1, 0.12, 0.15)
+    assert rules.salary_rows == [('Jesus Elizondo', 'Kitchen', 80)]
+
+
+def test_rate_matrix_ignores_unknown_columns(config):
+    rates = compile_rules(config).rate_matrix(['Busser_Lunch', 'Mystery'])
+    assert rates[:, 1].tolist() == [0, 0, 0]
+
+
+@pytest.mark.parametrize('change, problem', [
+    (lambda c: c['allocation_table']['Lunch'].update(Busser=0.3), 'Lunch rates add up to 1.075, expected 1'),
+    (lambda c: c['allocation_table']['Lunch'].update(Busser=-0.1), "Lunch rate for 'Busser' must be between 0 and 1"),
+    (lambda c: c['allocation_table']['Lunch'].update(Valet=0), "Lunch rate for 'Valet', which is not a report column"),
+    (lambda c: c['allocation_table'].pop('Dinner_Servers'), "allocation_table has no 'Dinner_Servers' rates"),
+    (lambda c: c['allocation_table'].update(Servers_to_Pool_Rate=2), 'Servers_to_Pool_Rate must be between 0 and 1'),
+    (lambda c: c['split_roles'].append('Kitchen'), "Split role 'Kitchen' needs Lunch and Dinner sub columns"),
+    (lambda c: c['split_roles'].remove('Runner'), "'Runner' has sub columns but is not a split role"),
+    (lambda c: c['role_map'].update(Valet='Parking'), "role_map sends 'Valet' to 'Parking'"),
+    (lambda c: c.update(name_aliases=['Ana']), 'name_aliases must map POS server names to roster names'),
+    (lambda c: c['salary_employees']['Jesus Elizondo'].update(role='Chef'), "unknown role 'Chef'"),
+    (lambda c: c['salary_employees']['Jesus Elizondo'].update(lunch_hours=-1), 'non-negative lunch_hours'),
+])
+def test_invalid_rules_are_rejected(config, change, problem):
+    change(config)
+    with pytest.raises(RulesError, match='Invalid payroll rules') as error:
+        compile_rules(config)
+    assert problem in str(error.value)
+
+
+def test_every_problem_is_listed(config):
+    config['allocation_table']['Lunch']['Busser'] = 0.3
+    config['role_map']['Valet'] = 'Parking'
+    with pytest.raises(RulesError) as error:
+        compile_rules(config)
+    assert len(str(error.value).splitlines()) == 3
+
+
+def test_missing_sections(config):
+    del config['split_roles'], config['role_map']
+    with pytest.raises(RulesError, match='Rules are missing: role_map, split_roles'):
+        compile_rules(config)
+
+
+def test_load_rules_compiles_once_per_path(tmp_path, config):
+    path = tmp_path / 'rules.json'
+    path.write_text(json.dumps(config))
+    rules = load_rules(str(path))
+    path.write_text('{}')
+    assert load_rules(str(path)) is rules
+
+
+def test_invalid_json(tmp_path):
+    path = tmp_path / 'rules.json'
+    path.write_text('{"allocation_table": ')
+    with pytest.raises(RulesError, match='is not valid JSON'):
+        load_rules(str(path))
+
+
+def test_fingerprint_follows_the_rules(config):
+    changed = copy.deepcopy(config)
+    changed['salary_employees']['Jesus Elizondo']['lunch_hours'] = 41
+    assert compile_rules(config).fingerprint == config_fingerprint(config)
+    assert compile_rules(changed).fingerprint != compile_rules(config).fingerprint
+    assert config_fingerprint({'a': 1, 'b': 2}) == config_fingerprint({'b': 2, 'a': 1})
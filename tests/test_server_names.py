@@ -0,0 +1,49 @@
+# test_server_names.py
+import numpy as np
+
+from server_names import NameIndex, match_servers, normalize_names
+
+EMPLOYEES = ['Ana Lopez', 'Jo Kim', 'JO  KIM', 'Luis Perez', 'Mary-Ann Smith']
+
+
+def test_normalize_names():
+    assert list(normalize_names(['  ANA   Lopez ', 'ana lopez', 'Straße Ö'])) == ['ana lopez', 'ana lopez', 'strasse ö']
+
+
+def test_exact_then_normalized_match():
+    index = NameIndex(EMPLOYEES)
+    assert list(index.match(['Ana Lopez', 'ana  LOPEZ', 'luis perez', 'Nobody'])) == [0, 0, 3, -1]
+
+
+def test_ambiguous_normalized_name_only_matches_exactly():
+    index = NameIndex(EMPLOYEES)
+    # 'Jo Kim' and 'JO  KIM' normalize alike, so only their exact spellings match
+    assert list(index.match(['Jo Kim', 'JO  KIM', 'jo kim'])) == [1, 2, -1]
+
+
+def test_aliases_match_by_normalized_name():
+    index = NameIndex(EMPLOYEES, {'Maryann Smith': 'Mary-Ann Smith', 'Lou Perez': 'Luis Perez', 'Gone': 'Not Here'})
+    assert list(index.match(['MARYANN smith', 'Lou Perez', 'Gone'])) == [4, 3, -1]
+
+
+def test_alias_colliding_with_an_employee_is_ambiguous():
+    # The alias key 'ana lopez' would point at Luis Perez as well as Ana Lopez
+    index = NameIndex(EMPLOYEES, {'ANA LOPEZ': 'Luis Perez'})
+    assert list(index.match(['Ana Lopez', 'ana lopez'])) == [0, -1]
+
+
+def test_match_servers_exact_name_wins_over_normalized():
+    servers_tips = {'ana lopez': {'tip': 5.0}, 'Ana Lopez': {'tip': 7.5}, 'Nobody': {'tip': 3.0}}
+    positions, tips, matched, unmatched = match_servers(EMPLOYEES, servers_tips)
+    # The exact match is applied last, so its tip is the one that sticks
+    assert list(positions) == [0, 0] and list(tips) == [5.0, 7.5]
+    employee_tips = np.zeros(len(EMPLOYEES))
+    employee_tips[positions] = tips
+    assert employee_tips[0] == 7.5
+    assert matched == {'Ana Lopez': 7.5} and unmatched == {'Nobody': 3.0}
+
+
+def test_match_servers_without_matches():
+    positions, tips, matched, unmatched = match_servers(EMPLOYEES, {'Cher': {'tip': 80.0}})
+    assert len(positions) == 0 and len(tips) == 0
+    assert matched == {} and unmatched == {'Cher': 80.0}
@@ -0,0 +1,75 @@
+# test_shifts.py
+from datetime import datetime, time, timedelta
+
+import pandas as pd
+import pytest
+
+from payroll import SPLIT_ROLES, read_hours_file
+from shifts import split_shifts
+
+
+def split_per_row(df, split_roles, dinner_start_time=time(17, 0)):
+    """The original per-row loop the vectorized split replaced, kept as the reference."""
+    rows = []
+    for _, row in df.iterrows():
+        employee_name, role, total_hours = row['Team Member'], row['Role'], row['Regular hours']
+        if role in split_roles:
+            start_dt = datetime.combine(datetime.today(), time(*divmod(int(row['In Time']), 60)))
+            end_dt = datetime.combine(datetime.today(), time(*divmod(int(row['Out Time']), 60)))
+            if end_dt < start_dt:
+                end_dt += timedelta(days=1)
+            dinner_start_dt = datetime.combine(start_dt.date(), dinner_start_time)
+
+            lunch_hours, dinner_hours = 0, 0
+            if end_dt <= dinner_start_dt:
+                lunch_hours = total_hours
+            elif start_dt >= dinner_start_dt:
+                dinner_hours = total_hours
+            else:
+                lunch_hours = (dinner_start_dt - start_dt).total_seconds() / 3600
+                dinner_hours = (end_dt - dinner_start_dt).total_seconds() / 3600
+
+            if lunch_hours > 0.001:
+                rows.append([employee_name, f"{role}_Lunch", lunch_hours])
+            if dinner_hours > 0.001:
+                rows.append([employee_name, f"{role}_Dinner", dinner_hours])
+        elif total_hours > 0:
+            rows.append([employee_name, role, total_hours])
+    return pd.DataFrame(rows, columns=['Team Member', 'Role_Shift', 'Hours'])
+
+
+def punches(*rows):
+    """A cleaned hours frame from (name, role, in minutes, out minutes, hours) rows."""
+    df = pd.DataFrame(rows, columns=['Team Member', 'Role', 'In Time', 'Out Time', 'Regular hours'])
+    df['In Time'] = df['In Time'].astype('Int16')
+    df['Out Time'] = df['Out Time'].astype('Int16')
+    return df
+
+
+def test_split_matches_per_row_loop(hours_file):
+    df = read_hours_file(hours_file)
+    expected = split_per_row(df, SPLIT_ROLES)
+    pd.testing.assert_frame_equal(split_shifts(df, SPLIT_ROLES), expected, check_dtype=False)
+
+
+@pytest.mark.parametrize('start, end, hours, expected', [
+    (9 * 60, 14 * 60, 4.5, [('Busser_Lunch', 4.5)]),  # All lunch uses the paid hours
+    (17 * 60, 22 * 60, 4.5, [('Busser_Dinner', 4.5)]),  # Starting at 5:00 PM is all dinner
+    (15 * 60, 19 * 60 + 30, 4.0, [('Busser_Lunch', 2.0), ('Busser_Dinner', 2.5)]),  # Split by clock time
+    (16 * 60, 60, 9.0, [('Busser_Lunch', 1.0), ('Busser_Dinner', 8.0)]),  # Overnight wraps past midnight
+])
+def test_split_boundaries(start, end, hours, expected):
+    result = split_shifts(punches(('Ana Lopez', 'Busser', start, end, hours)), SPLIT_ROLES)
+    assert list(zip(result['Role_Shift'], result['Hours'])) == expected
+
+
+def test_unsplit_roles_keep_full_hours():
+    df = punches(('Ana Lopez', 'Kitchen', 15 * 60, 20 * 60, 5.0), ('Luis Perez', 'Server', 9 * 60, 9 * 60, 0.0))
+    result = split_shifts(df, SPLIT_ROLES)
+    assert result.values.tolist() == [['Ana Lopez', 'Kitchen', 5.0]]
+
+
+def test_missing_time_never_decides_the_split():
+    df = punches(('Ana Lopez', 'Busser', None, 19 * 60, 4.0), ('Luis Perez', 'Busser', 15 * 60, None, 4.0))
+    result = split_shifts(df, SPLIT_ROLES)
+    assert result.values.tolist() == [['Ana Lopez', 'Busser_Dinner', 2.0], ['Luis Perez', 'Busser_Lunch', 2.0]]
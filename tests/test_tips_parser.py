@@ -0,0 +1,39 @@
+# test_tips_parser.py
+import io
+
+from tips_parser import parse_tips_file
+
+TIPS_EXPORT = '\n'.join([
+    'Tips Report,,,,,,,,,,,,,,,',
+    ',Total Allocated General Pool,450.00,800.50,,,,,,,,,,,,',
+    ',Server Contribution to General Pool,,250,,,,,,,,,,,,',
+    ',Less Server Cash & CC Tips,,1500.25,,,,,,,,,,,,',
+    ',,,,,,,,,,,,,,,',
+    ',,,,,,,,,,,,,,,',
+    ',,,,,,,,Server,,,,,,,Tip',
+    ',,,,,,,," Lopez, Ana ",,,,,,,120.50',
+    ',,,,,,,,"Perez, Luis",,,,,,,0',
+    ',,,,,,,,Cher,,,,,,,80',
+])
+
+
+def test_summary_rows_and_server_tips(tmp_path):
+    path = tmp_path / 'tips.csv'
+    path.write_text(TIPS_EXPORT)
+    tips = parse_tips_file(str(path))
+    assert (tips.lunch_tips_total, tips.dinner_tips_total) == (450.0, 800.5)
+    assert (tips.server_contribution_total, tips.server_cash_cc_tips) == (250.0, 1500.25)
+    # Names are turned around, and servers without a tip are left out
+    assert tips.servers_tips == {'Ana Lopez': {'tip': 120.5}, 'Cher': {'tip': 80.0}}
+
+
+def test_binary_upload_stream_is_left_open():
+    stream = io.BytesIO(('\ufeff' + TIPS_EXPORT).encode('utf-8'))
+    tips = parse_tips_file(stream)
+    assert tips.lunch_tips_total == 450.0
+    assert not stream.closed
+
+
+def test_missing_rows_read_as_zero():
+    tips = parse_tips_file(io.StringIO('Tips Report\n'))
+    assert (tips.lunch_tips_total, tips.server_cash_cc_tips, tips.servers_tips) == (0, 0, {})
@@ -0,0 +1,65 @@
+# test_xlsx_parallel.py
+from io import BytesIO
+
+import pytest
+from openpyxl import load_workbook
+
+import xlsx_parallel
+from payroll import HEADER_STRUCTURE, SALARY_EMPLOYEES, compute_payroll
+from xlsx_parallel import assemble_workbook, build_sheet_part, build_sheet_parts
+from xlsx_stream import SHEET_TITLES
+
+
+@pytest.fixture(scope='module')
+def result(hours_file, tips_file):
+    return compute_payroll(hours_file, tips_file)
+
+
+def part(result, title, conditional_formatting=True):
+    return build_sheet_part(title, result.roster, HEADER_STRUCTURE, result.allocation, SALARY_EMPLOYEES,
+                            conditional_formatting)[0]
+
+
+def rule_fills(ws):
+    return [(str(formatting.sqref), [rule.dxf.fill.fgColor.rgb for rule in formatting.rules])
+            for formatting in ws.conditional_formatting]
+
+
+def test_assembled_sheets_keep_their_rule_styles(tmp_path, result):
+    parts = [part(result, title) for title in SHEET_TITLES]
+    path = str(tmp_path / 'report.xlsx')
+    assemble_workbook(SHEET_TITLES, parts, path)
+    wb = load_workbook(path)
+    for title, sheet_part in zip(SHEET_TITLES, parts):
+        alone = load_workbook(BytesIO(sheet_part))[title]
+        assert rule_fills(wb[title]) == rule_fills(alone)
+    # Every part's dxfs are kept, so the Individual Tips rules point past the Hours ones
+    dxfs = [len(load_workbook(BytesIO(sheet_part))._differential_styles.dxf) for sheet_part in parts]
+    assert dxfs[0] and len(wb._differential_styles.dxf) == sum(dxfs)
+
+
+def test_parts_with_different_styles_are_refused(tmp_path, result):
+    parts = [part(result, 'Hours'), part(result, 'Individual Tips', conditional_formatting=False)]
+    with pytest.raises(RuntimeError, match='different cell styles'):
+        assemble_workbook(['Hours', 'Individual Tips'], parts, str(tmp_path / 'report.xlsx'))
+
+
+class NoPool:
+    def __init__(self, *args, **kwargs):
+        raise AssertionError('started a process pool')
+
+
+def test_no_pool_inside_a_worker_process(monkeypatch, result):
+    monkeypatch.setattr(xlsx_parallel.os, 'cpu_count', lambda: 4)
+    monkeypatch.setattr(xlsx_parallel, 'ProcessPoolExecutor', NoPool)
+    monkeypatch.setattr(xlsx_parallel.multiprocessing, 'parent_process', lambda: object())
+    parts = build_sheet_parts(SHEET_TITLES, result.roster, HEADER_STRUCTURE, result.allocation, SALARY_EMPLOYEES)
+    assert [cells for _, cells in parts] == [
+        cells for _, cells in build_sheet_parts(SHEET_TITLES, result.roster, HEADER_STRUCTURE, result.allocation,
+                                                SALARY_EMPLOYEES, max_workers=1)
+    ]
+
+    # Outside a worker the same call would start one
+    monkeypatch.setattr(xlsx_parallel.multiprocessing, 'parent_process', lambda: None)
+    with pytest.raises(AssertionError, match='process pool'):
+        build_sheet_parts(SHEET_TITLES, result.roster, HEADER_STRUCTURE, result.allocation, SALARY_EMPLOYEES)
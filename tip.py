@@ -1,672 +1,734 @@
 # main.py
-import pandas as pd
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+import argparse
+import csv
+import os
+import re
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from openpyxl import Workbook
 from openpyxl.utils import get_column_letter
-from datetime import datetime, time
-
-# --- Allocation Table (Hardcoded) ---
-ALLOCATION_TABLE = {
-    'Lunch': {
-        'Busser': 0.225, 'Barrista': 0.125, 'Kitchen': 0.1, 'Case': 0.15,
-        'Register': 0.15, 'Lead': 0.25, 'Hostess': 0, 'Runner': 0
-    },
-    'Dinner_General': {
-        'Busser': 0.2, 'Barrista': 0.13, 'Kitchen': 0.12, 'Case': .12,
-        'Register': 0.18, 'Lead': 0.25, 'Hostess': .09, 'Runner': 0
-    },
-    'Dinner_Servers': {
-        'Busser': 0.25, 'Barrista': 0.15, 'Kitchen': 0.15, 'Case': 0,
-        'Register': 0.2, 'Lead': 0.25, 'Hostess': 0, 'Runner': 0
-    },
-    'Servers_to_Pool_Rate': 0.3
-}
-
-# --- Salary Employee Configuration ---
-SALARY_EMPLOYEES = {
-    'Jesus Elizondo': {
-        'role': 'Kitchen',
-        'weekly_hours': 80,
-        'lunch_hours': 40,  # Split evenly between lunch and dinner
-        'dinner_hours': 40
-    }
-}
-
-
-def create_final_payroll_report(csv_file_path, xlsx_file_path, tips_csv_path=None):
+# The payroll settings are re-exported here, where scripts have always imported them from
+from payroll import ALLOCATION_TABLE, SALARY_EMPLOYEES, HEADER_STRUCTURE, ROLE_MAP, SPLIT_ROLES, compute_payroll
+from xlsx_stream import stream_payroll_sheet, stream_summary_sheet, add_band_rules
+from xlsx_parallel import layout_titles, build_sheet_parts, assemble_workbook
+from styles import STYLES
+from report_stats import ReportStats, output_size
+from renderers import get_renderer, render
+
+
+def create_final_payroll_report(csv_file_path, xlsx_file_path, tips_csv_path=None, write_only=False,
+                                conditional_formatting=False, chunksize=None, multi_sheet=False, output_format='xlsx'):
     """
     Reads raw payroll data from a CSV, processes it based on complex role and
     time-based rules, and generates a formatted Excel summary report of hours worked.
-    Now includes salary employees who aren't in the CSV file.
+    Now includes salary employees who aren't in the CSV file. The input and
+    output paths may also be file-like objects such as BytesIO buffers.
+    Returns a ReportStats with the time spent in each phase, row and cell
+    counts, bytes saved and the worker's peak memory. conditional_formatting colours the
+    tip bands and salary employees with sheet-level rules instead of per-cell fills.
+    chunksize reads the hours file that many punches at a time to bound memory.
+    multi_sheet writes the Hours, Pool Allocation and Individual Tips sheets
+    (in parallel processes outside a worker) instead of one Payroll Summary sheet.
+    output_format writes 'csv', 'json' or (with pyarrow installed) 'parquet'
+    straight from the computed figures instead of the workbook; the workbook
+    options are ignored then.
     """
+    stats = ReportStats()
     try:
-        # --- 1. Read and Clean Raw Data ---
-        df = pd.read_csv(csv_file_path)
-        df.columns = df.columns.str.strip()
-        df['Team Member'] = df['First'].str.strip() + ' ' + df['Last'].str.strip()
-        df['Role'] = df['Role'].fillna('No Role')
-        role_map = {
-            'Dishwasher': 'Kitchen', 'Prep Cook': 'Kitchen', 'Pasta': 'Kitchen',
-            'Salad': 'Kitchen', 'Grill': 'Kitchen', 'Shift Leader': 'Lead',
-            'Host/Hostess': 'Hostess'
-        }
-        df['Role'] = df['Role'].str.strip().replace(role_map)
-        split_roles = ['Busser', 'Barrista', 'Case', 'Register', 'Lead', 'Runner']
-        df['In Time'] = pd.to_datetime(df['In Time'].str.strip(), format='%I:%M%p').dt.time
-        df['Out Time'] = pd.to_datetime(df['Out Time'].str.strip(), format='%I:%M%p').dt.time
+        get_renderer(output_format)  # Fails on an unknown format before any work is done
+        result = compute_payroll(csv_file_path, tips_csv_path, stats, chunksize)
+        if output_format == 'xlsx':
+            render_payroll_workbook(result, xlsx_file_path, write_only, stats, conditional_formatting, multi_sheet)
+        else:
+            with stats.phase('save'):
+                render(result, output_format, xlsx_file_path)
+            stats.count('bytes', output_size(xlsx_file_path))
+        print(f"Successfully created payroll report: {xlsx_file_path}")
         
-        # --- 2. Process Each Shift (The Core Logic) ---
-        processed_data = []
-        dinner_start_time = time(17, 0)  # 5:00 PM
-
-        for index, row in df.iterrows():
-            employee_name = row['Team Member']
-            role = row['Role']
-            total_hours = row['Regular hours']
+        # Print summary of salary employees added
+        for emp_name, config in SALARY_EMPLOYEES.items():
+            total_hours = config['lunch_hours'] + config['dinner_hours']
+            print(f"Added salary employee: {emp_name} - {total_hours} hours in {config['role']}")
             
-            if role in split_roles:
-                start_dt = datetime.combine(datetime.today(), row['In Time'])
-                end_dt = datetime.combine(datetime.today(), row['Out Time'])
-                if end_dt < start_dt: end_dt += pd.Timedelta(days=1)
-                dinner_start_dt = datetime.combine(start_dt.date(), dinner_start_time)
-
-                lunch_hours, dinner_hours = 0, 0
-                if end_dt <= dinner_start_dt: lunch_hours = total_hours
-                elif start_dt >= dinner_start_dt: dinner_hours = total_hours
-                else:
-                    lunch_hours = (dinner_start_dt - start_dt).total_seconds() / 3600
-                    dinner_hours = (end_dt - dinner_start_dt).total_seconds() / 3600
-
-                if lunch_hours > 0.001: processed_data.append([employee_name, f"{role}_Lunch", lunch_hours])
-                if dinner_hours > 0.001: processed_data.append([employee_name, f"{role}_Dinner", dinner_hours])
-            elif total_hours > 0:
-                processed_data.append([employee_name, role, total_hours])
-
-        # --- 2.5. Add Salary Employees ---
-        print("Adding salary employees to payroll...")
-        for employee_name, employee_config in SALARY_EMPLOYEES.items():
-            role = employee_config['role']
-            lunch_hours = employee_config['lunch_hours']
-            dinner_hours = employee_config['dinner_hours']
+    except FileNotFoundError as e:
+        print(f"Error: File not found - {e}")
+        stats.error = f"File not found - {e}"
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        stats.error = str(e)
+    return stats.finish()
+
+
+def render_payroll_workbook(result, xlsx_file_path, write_only=False, stats=None, conditional_formatting=False,
+                            multi_sheet=False):
+    """
+    Steps 5-6: renders a PayrollResult as the payroll workbook and saves it to a path or binary buffer.
+    multi_sheet lays the report out over separate sheets, always streamed, each built in its own process
+    unless this already runs in a worker process (see build_sheet_parts).
+    """
+    stats = stats if stats is not None else ReportStats()
+    if multi_sheet:
+        render_sheets_workbook(result, xlsx_file_path, stats, conditional_formatting)
+        return
+
+    # --- 5. Build the Workbook ---
+    with stats.phase('build'):
+        wb = payroll_workbook(write_only)
+        stats.count('cells', add_payroll_sheet(wb, "Payroll Summary", result.roster, result.allocation, conditional_formatting))
+
+    # --- 6. Save ---
+    with stats.phase('save'):
+        wb.save(xlsx_file_path)
+    stats.count('bytes', output_size(xlsx_file_path))
+
+
+def render_sheets_workbook(result, xlsx_file_path, stats=None, conditional_formatting=False):
+    """
+    Steps 5-6 for the multi-sheet layout: the Hours sheet and, with tips, the
+    Pool Allocation and Individual Tips sheets are written at the same time in
+    worker processes (one after another inside a worker) and then assembled
+    into one workbook.
+    """
+    stats = stats if stats is not None else ReportStats()
+    titles = layout_titles(result.allocation)
+
+    # --- 5. Build Each Sheet in Parallel ---
+    with stats.phase('build'):
+        parts = build_sheet_parts(titles, result.roster, HEADER_STRUCTURE, result.allocation, SALARY_EMPLOYEES,
+                                  conditional_formatting)
+    stats.count('cells', sum(cells for _, cells in parts))
+
+    # --- 6. Assemble and Save ---
+    with stats.phase('save'):
+        assemble_workbook(titles, [part for part, _ in parts], xlsx_file_path)
+    stats.count('bytes', output_size(xlsx_file_path))
+
+
+def payroll_workbook(write_only=False):
+    """New workbook with no sheets. write_only workbooks stream rows to disk as they are written."""
+    wb = Workbook(write_only=write_only)
+    if not write_only:
+        wb.remove(wb.active)
+    return wb
+
+
+def add_payroll_sheet(wb, title, roster, allocation=None, conditional_formatting=False):
+    """Adds a payroll report sheet to a workbook from payroll_workbook and returns the number of cells written."""
+    ws = wb.create_sheet(title)
+    if wb.write_only:
+        # Rows are streamed to disk as they are written, so memory stays flat
+        return stream_payroll_sheet(ws, roster, HEADER_STRUCTURE, allocation, SALARY_EMPLOYEES,
+                                    conditional_formatting=conditional_formatting)
+    write_payroll_sheet(ws, roster, HEADER_STRUCTURE, allocation, conditional_formatting=conditional_formatting)
+    return len(ws._cells)
+
+
+def write_payroll_sheet(ws, roster, header_structure, allocation=None, styles=STYLES, conditional_formatting=False):
+    """
+    Writes the hours table and ROLE TOTALS onto a regular worksheet, followed by
+    the tip sections and INDIVIDUAL EMPLOYEE TIPS when tips were allocated.
+    With conditional_formatting the tip bands and salary highlights become
+    sheet-level rules (xlsx_stream.add_band_rules) instead of per-cell fills.
+    """
+    # --- Create Headers and Styles ---
+    header_font = styles.header_font
+    centered_alignment = styles.centered_alignment
+    bold_font = styles.bold_font
+    main_header_fill = styles.main_header_fill
+    sub_header_fill = styles.sub_header_fill
+    single_header_fill = styles.single_header_fill
+    thin_border = styles.thin_border
+
+    tm_cell = ws.cell(row=1, column=1, value='Team Member')
+    ws.merge_cells(start_row=1, start_column=1, end_row=2, end_column=1)
+    
+    col_idx = 2
+    for main_header, sub_headers in header_structure.items():
+        if sub_headers:
+            main_cell = ws.cell(row=1, column=col_idx, value=main_header)
+            ws.merge_cells(start_row=1, start_column=col_idx, end_row=1, end_column=col_idx + 1)
+            ws.cell(row=2, column=col_idx, value=sub_headers[0])
+            ws.cell(row=2, column=col_idx + 1, value=sub_headers[1])
+            col_idx += 2
+        else:
+            main_cell = ws.cell(row=1, column=col_idx, value=main_header)
+            ws.merge_cells(start_row=1, start_column=col_idx, end_row=2, end_column=col_idx)
+            col_idx += 1
+    
+    total_cell = ws.cell(row=1, column=col_idx, value='Total Hours')
+    ws.merge_cells(start_row=1, start_column=col_idx, end_row=2, end_column=col_idx)
+    
+    # Apply styles to headers
+    for r in ws.iter_rows(min_row=1, max_row=2, max_col=col_idx):
+        for cell in r:
+            cell.border = thin_border
+            cell.alignment = centered_alignment
+            if cell.row == 1: cell.font = header_font
+            if cell.row == 2 and cell.value: cell.font = bold_font
+            if cell.column == 1 or not header_structure.get(ws.cell(1, cell.column if cell.row==2 else cell.column).value):
+                 cell.fill = single_header_fill
+            elif cell.row == 1: cell.fill = main_header_fill
+            else: cell.fill = sub_header_fill
+
+    # --- Write Data to Excel ---
+    if conditional_formatting:
+        # One named style per cell; salary rows are highlighted by add_band_rules
+        hours_style = styles.cell_style(ws.parent, 'Payroll Hours')
+        for r_idx, (index, row_hours) in enumerate(zip(roster.employees, roster.report_hours()), 3):
+            ws.cell(row=r_idx, column=1, value=index)
+            for c_idx, value in enumerate(row_hours, 2):
+                ws.cell(row=r_idx, column=c_idx, value=value).style = hours_style
+    else:
+        for r_idx, (index, row_hours) in enumerate(zip(roster.employees, roster.report_hours()), 3):
+            ws.cell(row=r_idx, column=1, value=index)
+            for c_idx, value in enumerate(row_hours, 2):
+                cell = ws.cell(row=r_idx, column=c_idx, value=value)
+                cell.number_format = '0.00'
+                cell.border = thin_border
             
-            print(f"Adding {employee_name}: {lunch_hours} lunch hours + {dinner_hours} dinner hours = {lunch_hours + dinner_hours} total hours in {role}")
+                # Highlight salary employees with different background color
+                if index in SALARY_EMPLOYEES:
+                    cell.fill = styles.salary_fill
 
-            # For Kitchen role, we don't split by lunch/dinner in the same way as other roles
-            # Kitchen workers get their full hours counted as "Kitchen" (no _Lunch or _Dinner suffix)
-            if role == 'Kitchen':
-                total_kitchen_hours = lunch_hours + dinner_hours
-                processed_data.append([employee_name, role, total_kitchen_hours])
-            else:
-                # For other roles that might be added in the future, split them
-                if role in split_roles:
-                    if lunch_hours > 0:
-                        processed_data.append([employee_name, f"{role}_Lunch", lunch_hours])
-                    if dinner_hours > 0:
-                        processed_data.append([employee_name, f"{role}_Dinner", dinner_hours])
-                else:
-                    # For roles that don't split
-                    total_hours = lunch_hours + dinner_hours
-                    processed_data.append([employee_name, role, total_hours])
-
-        # --- 3. Aggregate Data and Build Excel ---
-        summary_df = pd.DataFrame(processed_data, columns=['Team Member', 'Role_Shift', 'Hours'])
-        final_summary = summary_df.pivot_table(index='Team Member', columns='Role_Shift', values='Hours', aggfunc='sum').fillna(0)
+    # --- Add Role Totals Row (RIGHT AFTER EMPLOYEE DATA) ---
+    totals_row = len(roster.employees) + 3  # Row immediately after employee data
+    
+    # Add "ROLE TOTALS" label
+    totals_label_cell = ws.cell(row=totals_row, column=1, value='ROLE TOTALS')
+    totals_label_cell.font = styles.section_label_font('ROLE TOTALS')
+    totals_label_cell.fill = styles.section_label_fill('ROLE TOTALS')
+    totals_label_cell.alignment = centered_alignment
+    totals_label_cell.border = thin_border
+    
+    # Calculate and add totals for each column
+    role_totals = roster.role_totals()
+    for c_idx, total_value in enumerate(role_totals, 2):
+        total_cell = ws.cell(row=totals_row, column=c_idx, value=total_value)
+        total_cell.font = styles.section_value_font('ROLE TOTALS')
+        total_cell.number_format = '0.00'
+        total_cell.border = thin_border
+        total_cell.fill = styles.section_value_fill('ROLE TOTALS')
+    
+    # Add grand total of all hours
+    grand_total = role_totals.sum()
+    grand_total_cell = ws.cell(row=totals_row, column=len(roster.report_columns) + 1, value=grand_total)
+    grand_total_cell.font = styles.section_value_font('ROLE TOTALS')
+    grand_total_cell.number_format = '0.00'
+    grand_total_cell.border = thin_border
+    grand_total_cell.fill = styles.section_value_fill('ROLE TOTALS')
+
+    # --- Add space row after Role Totals ---
+    space_row = totals_row + 1  # This row will be left empty for spacing
+    
+    # --- Write Tips (if tips were allocated) ---
+    if allocation is not None:
+        lunch_tip_amounts, dinner_tip_amounts, server_tip_amounts = allocation.role_tips
+        total_role_tips = allocation.role_tips.sum(axis=0)  # Store total tips per role for individual calculations
+        total_tips_col = len(roster.report_columns) + 1
+
+        # --- LUNCH TIPS SECTION ---
+        lunch_tips_row = space_row + 1
+        
+        # Add "LUNCH TIPS" label
+        lunch_tips_label_cell = ws.cell(row=lunch_tips_row, column=1, value='LUNCH TIPS')
+        lunch_tips_label_cell.font = styles.section_label_font('LUNCH TIPS')
+        lunch_tips_label_cell.fill = styles.section_label_fill('LUNCH TIPS')
+        lunch_tips_label_cell.alignment = centered_alignment
+        lunch_tips_label_cell.border = thin_border
+        
+        # Add tip amount for each lunch role
+        for c_idx, role_tip_amount in enumerate(lunch_tip_amounts, 2):
+            tip_cell = ws.cell(row=lunch_tips_row, column=c_idx, value=role_tip_amount)
+            tip_cell.font = styles.section_value_font('LUNCH TIPS')
+            tip_cell.number_format = '$0.00'
+            tip_cell.border = thin_border
+            tip_cell.fill = styles.section_value_fill('LUNCH TIPS')
+        
+        # Add total lunch tips
+        lunch_tip_total = lunch_tip_amounts.sum()
+        total_tip_cell = ws.cell(row=lunch_tips_row, column=total_tips_col, value=lunch_tip_total)
+        total_tip_cell.font = styles.section_value_font('LUNCH TIPS')
+        total_tip_cell.number_format = '$0.00'
+        total_tip_cell.border = thin_border
+        total_tip_cell.fill = styles.section_value_fill('LUNCH TIPS')
+        
+        # --- DINNER TIPS GENERAL SECTION ---
+        dinner_tips_row = lunch_tips_row + 1
+        
+        # Add "DINNER TIPS GENERAL" label
+        dinner_tips_label_cell = ws.cell(row=dinner_tips_row, column=1, value='DINNER TIPS GENERAL')
+        dinner_tips_label_cell.font = styles.section_label_font('DINNER TIPS GENERAL')
+        dinner_tips_label_cell.fill = styles.section_label_fill('DINNER TIPS GENERAL')
+        dinner_tips_label_cell.alignment = centered_alignment
+        dinner_tips_label_cell.border = thin_border
+        
+        # Add dinner tip amount for each role
+        for c_idx, role_tip_amount in enumerate(dinner_tip_amounts, 2):
+            tip_cell = ws.cell(row=dinner_tips_row, column=c_idx, value=role_tip_amount)
+            tip_cell.font = styles.section_value_font('DINNER TIPS GENERAL')
+            tip_cell.number_format = '$0.00'
+            tip_cell.border = thin_border
+            tip_cell.fill = styles.section_value_fill('DINNER TIPS GENERAL')
+        
+        # Add total dinner tips
+        dinner_tip_total = dinner_tip_amounts.sum()
+        total_dinner_tip_cell = ws.cell(row=dinner_tips_row, column=total_tips_col, value=dinner_tip_total)
+        total_dinner_tip_cell.font = styles.section_value_font('DINNER TIPS GENERAL')
+        total_dinner_tip_cell.number_format = '$0.00'
+        total_dinner_tip_cell.border = thin_border
+        total_dinner_tip_cell.fill = styles.section_value_fill('DINNER TIPS GENERAL')
+        
+        # --- DINNER TIPS SERVERS SECTION ---
+        server_tips_row = dinner_tips_row + 1
+        
+        # Add "DINNER TIPS SERVERS" label
+        server_tips_label_cell = ws.cell(row=server_tips_row, column=1, value='DINNER TIPS SERVERS')
+        server_tips_label_cell.font = styles.section_label_font('DINNER TIPS SERVERS')
+        server_tips_label_cell.fill = styles.section_label_fill('DINNER TIPS SERVERS')
+        server_tips_label_cell.alignment = centered_alignment
+        server_tips_label_cell.border = thin_border
+        
+        # Add server tip amount for each role
+        for c_idx, role_tip_amount in enumerate(server_tip_amounts, 2):
+            tip_cell = ws.cell(row=server_tips_row, column=c_idx, value=role_tip_amount)
+            tip_cell.font = styles.section_value_font('DINNER TIPS SERVERS')
+            tip_cell.number_format = '$0.00'
+            tip_cell.border = thin_border
+            tip_cell.fill = styles.section_value_fill('DINNER TIPS SERVERS')
+        
+        # Add total server tips
+        server_tip_total = server_tip_amounts.sum()
+        total_server_tip_cell = ws.cell(row=server_tips_row, column=total_tips_col, value=server_tip_total)
+        total_server_tip_cell.font = styles.section_value_font('DINNER TIPS SERVERS')
+        total_server_tip_cell.number_format = '$0.00'
+        total_server_tip_cell.border = thin_border
+        total_server_tip_cell.fill = styles.section_value_fill('DINNER TIPS SERVERS')
+        
+        # --- GRAND TOTAL ROW (ALL TIPS COMBINED) ---
+        grand_total_row = server_tips_row + 2  # Add a space row before grand total
+        
+        # Add "TOTAL" label
+        grand_total_label = ws.cell(row=grand_total_row, column=1, value='TOTAL')
+        grand_total_label.font = styles.section_label_font('TOTAL')
+        grand_total_label.fill = styles.section_label_fill('TOTAL')
+        grand_total_label.alignment = centered_alignment
+        grand_total_label.border = thin_border
+        
+        # Add grand totals for each column (sum of all three tip sections)
+        for c_idx, column_grand_total in enumerate(total_role_tips, 2):
+            grand_total_cell = ws.cell(row=grand_total_row, column=c_idx, value=column_grand_total)
+            grand_total_cell.font = styles.section_value_font('TOTAL')
+            grand_total_cell.number_format = '$0.00'
+            grand_total_cell.border = thin_border
+            grand_total_cell.fill = styles.section_value_fill('TOTAL')
+        
+        # Add final grand total (sum of all tips)
+        final_grand_total = lunch_tip_total + dinner_tip_total + server_tip_total
+        final_total_cell = ws.cell(row=grand_total_row, column=total_tips_col, value=final_grand_total)
+        final_total_cell.font = styles.section_value_font('TOTAL')
+        final_total_cell.number_format = '$0.00'
+        final_total_cell.border = thin_border
+        final_total_cell.fill = styles.section_value_fill('TOTAL')
+        
+        # --- INDIVIDUAL EMPLOYEE TIP CALCULATIONS ---
+        individual_tips_start_row = grand_total_row + 3  # Add spacing before individual tips
+        
+        # Add "INDIVIDUAL EMPLOYEE TIPS" header
+        individual_header = ws.cell(row=individual_tips_start_row, column=1, value='INDIVIDUAL EMPLOYEE TIPS')
+        individual_header.font = styles.section_label_font('INDIVIDUAL EMPLOYEE TIPS')
+        individual_header.fill = styles.section_label_fill('INDIVIDUAL EMPLOYEE TIPS')
+        individual_header.alignment = centered_alignment
+        individual_header.border = thin_border
         
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Payroll Summary"
-
-        # --- 4. Create Headers and Styles ---
-        header_font = Font(bold=True, color="FFFFFF")
-        centered_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        bold_font = Font(bold=True)
-        main_header_fill = PatternFill(start_color="4472C4", fill_type="solid")
-        sub_header_fill = PatternFill(start_color="D9D9D9", fill_type="solid")
-        single_header_fill = PatternFill(start_color="808080", fill_type="solid")
-        thin_border = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
-
-        header_structure = {
-            'Server': None, 'Busser': ['Lunch', 'Dinner'], 'Barrista': ['Lunch', 'Dinner'], 'Kitchen': None,
-            'Case': ['Lunch', 'Dinner'], 'Register': ['Lunch', 'Dinner'], 'Training': None,
-            'Lead': ['Lunch', 'Dinner'], 'Hostess': None, 'Runner': ['Lunch', 'Dinner'],
-             'No Role': None
-        }
+        # Merge the header across all columns
+        ws.merge_cells(start_row=individual_tips_start_row, start_column=1, end_row=individual_tips_start_row, end_column=len(roster.report_columns) + 1)
         
-        tm_cell = ws.cell(row=1, column=1, value='Team Member')
-        ws.merge_cells(start_row=1, start_column=1, end_row=2, end_column=1)
+        # Add column headers for individual tips (same as original table)
+        individual_header_row = individual_tips_start_row + 1
         
+        # Team Member header
+        tm_header = ws.cell(row=individual_header_row, column=1, value='Team Member')
+        ws.merge_cells(start_row=individual_header_row, start_column=1, end_row=individual_header_row + 1, end_column=1)
+        tm_header.font = header_font
+        tm_header.fill = single_header_fill
+        tm_header.alignment = centered_alignment
+        tm_header.border = thin_border
+        
+        # Role headers
         col_idx = 2
         for main_header, sub_headers in header_structure.items():
             if sub_headers:
-                main_cell = ws.cell(row=1, column=col_idx, value=main_header)
-                ws.merge_cells(start_row=1, start_column=col_idx, end_row=1, end_column=col_idx + 1)
-                ws.cell(row=2, column=col_idx, value=sub_headers[0])
-                ws.cell(row=2, column=col_idx + 1, value=sub_headers[1])
+                main_cell = ws.cell(row=individual_header_row, column=col_idx, value=main_header)
+                ws.merge_cells(start_row=individual_header_row, start_column=col_idx, end_row=individual_header_row, end_column=col_idx + 1)
+                main_cell.font = header_font
+                main_cell.fill = main_header_fill
+                main_cell.alignment = centered_alignment
+                main_cell.border = thin_border
+                
+                lunch_cell = ws.cell(row=individual_header_row + 1, column=col_idx, value=sub_headers[0])
+                lunch_cell.font = bold_font
+                lunch_cell.fill = sub_header_fill
+                lunch_cell.alignment = centered_alignment
+                lunch_cell.border = thin_border
+                
+                dinner_cell = ws.cell(row=individual_header_row + 1, column=col_idx + 1, value=sub_headers[1])
+                dinner_cell.font = bold_font
+                dinner_cell.fill = sub_header_fill
+                dinner_cell.alignment = centered_alignment
+                dinner_cell.border = thin_border
                 col_idx += 2
             else:
-                main_cell = ws.cell(row=1, column=col_idx, value=main_header)
-                ws.merge_cells(start_row=1, start_column=col_idx, end_row=2, end_column=col_idx)
+                main_cell = ws.cell(row=individual_header_row, column=col_idx, value=main_header)
+                ws.merge_cells(start_row=individual_header_row, start_column=col_idx, end_row=individual_header_row + 1, end_column=col_idx)
+                main_cell.font = header_font
+                main_cell.fill = single_header_fill
+                main_cell.alignment = centered_alignment
+                main_cell.border = thin_border
                 col_idx += 1
         
-        total_cell = ws.cell(row=1, column=col_idx, value='Total Hours')
-        ws.merge_cells(start_row=1, start_column=col_idx, end_row=2, end_column=col_idx)
+        # Total Tips header
+        total_tips_header = ws.cell(row=individual_header_row, column=col_idx, value='Total Tips')
+        ws.merge_cells(start_row=individual_header_row, start_column=col_idx, end_row=individual_header_row + 1, end_column=col_idx)
+        total_tips_header.font = header_font
+        total_tips_header.fill = single_header_fill
+        total_tips_header.alignment = centered_alignment
+        total_tips_header.border = thin_border
+        
+        # Calculate individual employee tips
+        individual_data_start_row = individual_header_row + 2
+        
+        employee_tips = allocation.employee_tips
+        employee_tip_totals = employee_tips.sum(axis=1)
+        # Write tips for each employee
+        if conditional_formatting:
+            # Same named style on every cell; tip bands and salary highlights come from add_band_rules
+            name_style, tip_style, total_style = (styles.cell_style(ws.parent, name)
+                                                  for name in ('Payroll Name', 'Payroll Tip', 'Payroll Total Tip'))
+            for r_idx, employee_name in enumerate(roster.employees):
+                current_row = individual_data_start_row + r_idx
+                ws.cell(row=current_row, column=1, value=employee_name).style = name_style
+                for c_idx, individual_tip in enumerate(employee_tips[r_idx], 2):
+                    ws.cell(row=current_row, column=c_idx, value=individual_tip).style = tip_style
+                ws.cell(row=current_row, column=total_tips_col, value=employee_tip_totals[r_idx]).style = total_style
+        else:
+            for r_idx, employee_name in enumerate(roster.employees):
+                current_row = individual_data_start_row + r_idx
+            
+                # Add employee name
+                emp_name_cell = ws.cell(row=current_row, column=1, value=employee_name)
+                emp_name_cell.border = thin_border
+                emp_name_cell.alignment = styles.left_alignment
+            
+                # Highlight salary employees
+                is_salary = employee_name in SALARY_EMPLOYEES
+                if is_salary:
+                    emp_name_cell.fill = styles.salary_fill
+                    emp_name_cell.font = bold_font
+            
+                employee_total_tips = employee_tip_totals[r_idx]
+            
+                # Add tips for each role
+                for c_idx, individual_tip in enumerate(employee_tips[r_idx], 2):
+                    tip_cell = ws.cell(row=current_row, column=c_idx, value=individual_tip)
+                    tip_cell.number_format = '$0.00'
+                    tip_cell.border = thin_border
+                    tip_cell.alignment = centered_alignment
+                
+                    # Highlight salary employees and color coding for different tip amounts
+                    tip_fill = styles.tip_fill(individual_tip, is_salary)
+                    if tip_fill is not None:
+                        tip_cell.fill = tip_fill
+            
+                # Add total tips for employee
+                total_tip_cell = ws.cell(row=current_row, column=total_tips_col, value=employee_total_tips)
+                total_tip_cell.number_format = '$0.00'
+                total_tip_cell.border = thin_border
+                total_tip_cell.alignment = centered_alignment
+                total_tip_cell.font = bold_font
+            
+                # Color code total based on amount, with special highlighting for salary employees
+                total_tip_cell.fill = styles.total_tip_fill(employee_total_tips, is_salary)
         
-        # Apply styles to headers
-        for r in ws.iter_rows(min_row=1, max_row=2, max_col=col_idx):
-            for cell in r:
-                cell.border = thin_border
-                cell.alignment = centered_alignment
-                if cell.row == 1: cell.font = header_font
-                if cell.row == 2 and cell.value: cell.font = bold_font
-                if cell.column == 1 or not header_structure.get(ws.cell(1, cell.column if cell.row==2 else cell.column).value):
-                     cell.fill = single_header_fill
-                elif cell.row == 1: cell.fill = main_header_fill
-                else: cell.fill = sub_header_fill
-
-        # --- 5. Write Data to Excel ---
-        final_column_order = [f"{main}_{sub}" if sub else main for main, subs in header_structure.items() for sub in (subs or [''])]
-        final_summary = final_summary.reindex(columns=final_column_order, fill_value=0)
-        final_summary['Total Hours'] = final_summary.sum(axis=1)
-
-        for r_idx, (index, row_data) in enumerate(final_summary.iterrows(), 3):
-            ws.cell(row=r_idx, column=1, value=index)
-            for c_idx, col_name in enumerate(final_summary.columns, 2):
-                cell = ws.cell(row=r_idx, column=c_idx, value=row_data[col_name])
-                cell.number_format = '0.00'
-                cell.border = thin_border
-                
-                # Highlight salary employees with different background color
-                if index in SALARY_EMPLOYEES:
-                    cell.fill = PatternFill(start_color="E6F3FF", fill_type="solid")  # Light blue for salary employees
-
-        # --- 6. Add Role Totals Row (RIGHT AFTER EMPLOYEE DATA) ---
-        totals_row = len(final_summary) + 3  # Row immediately after employee data
         
-        # Add "ROLE TOTALS" label
-        totals_label_cell = ws.cell(row=totals_row, column=1, value='ROLE TOTALS')
-        totals_label_cell.font = Font(bold=True, color="FFFFFF")
-        totals_label_cell.fill = PatternFill(start_color="4472C4", fill_type="solid")
-        totals_label_cell.alignment = centered_alignment
-        totals_label_cell.border = thin_border
+        # Add individual tips totals row
+        individual_totals_row = individual_data_start_row + len(roster.employees)
         
-        # Calculate and add totals for each column
-        for c_idx, col_name in enumerate(final_summary.columns, 2):
-            if col_name != 'Total Hours':  # Skip the total hours column for now
-                total_value = final_summary[col_name].sum()
-                total_cell = ws.cell(row=totals_row, column=c_idx, value=total_value)
-                total_cell.font = Font(bold=True)
-                total_cell.number_format = '0.00'
-                total_cell.border = thin_border
-                total_cell.fill = PatternFill(start_color="E7E6E6", fill_type="solid")
+        # Add label
+        totals_label = ws.cell(row=individual_totals_row, column=1, value='INDIVIDUAL TOTALS')
+        totals_label.font = styles.section_label_font('INDIVIDUAL TOTALS')
+        totals_label.fill = styles.section_label_fill('INDIVIDUAL TOTALS')
+        totals_label.alignment = centered_alignment
+        totals_label.border = thin_border
         
-        # Add grand total of all hours
-        grand_total = final_summary.drop('Total Hours', axis=1).sum().sum()
-        grand_total_cell = ws.cell(row=totals_row, column=len(final_summary.columns) + 1, value=grand_total)
-        grand_total_cell.font = Font(bold=True)
-        grand_total_cell.number_format = '0.00'
-        grand_total_cell.border = thin_border
-        grand_total_cell.fill = PatternFill(start_color="E7E6E6", fill_type="solid")
-
-        # --- 7. Add space row after Role Totals ---
-        space_row = totals_row + 1  # This row will be left empty for spacing
+        # Add column totals for verification (should match the role total tips)
+        verification_total = total_role_tips.sum()
+        for c_idx, column_total in enumerate(total_role_tips, 2):
+            total_cell = ws.cell(row=individual_totals_row, column=c_idx, value=column_total)
+            total_cell.font = styles.section_value_font('INDIVIDUAL TOTALS')
+            total_cell.number_format = '$0.00'
+            total_cell.border = thin_border
+            total_cell.fill = styles.section_value_fill('INDIVIDUAL TOTALS')
+            total_cell.alignment = centered_alignment
         
-        # --- 7.5 Grab pre-calculated tips from file 
-        if tips_csv_path:
-            df = pd.read_csv(tips_csv_path, skiprows=6, header=None)
+        # Add verification grand total
+        verification_grand_total = ws.cell(row=individual_totals_row, column=total_tips_col, value=verification_total)
+        verification_grand_total.font = styles.section_value_font('INDIVIDUAL TOTALS')
+        verification_grand_total.number_format = '$0.00'
+        verification_grand_total.border = thin_border
+        verification_grand_total.fill = styles.section_value_fill('INDIVIDUAL TOTALS')
+        verification_grand_total.alignment = centered_alignment
 
-            df = df[[8, 15]]
-            df.columns = ['Server', 'Tip']
-            df.dropna(subset=['Server'], inplace=True)
-            df = df[df['Server'] != 'Server']
+    # --- Final Formatting ---
+    if conditional_formatting:
+        add_band_rules(ws, roster, allocation, SALARY_EMPLOYEES, styles)
+    for col in ws.columns:
+        ws.column_dimensions[get_column_letter(col[0].column)].width = 15
+    ws.column_dimensions['A'].width = 25
 
-            df['Tip'] = pd.to_numeric(df['Tip'], errors='coerce')
-            df.dropna(subset=['Tip'], inplace=True)
 
-            servers_tips = {}
+# --- Batch Mode (many periods / locations at once) ---
+HOURS_FILE_PATTERN = re.compile(r'^hours-and-wages-summary_(?P<start>[^_]+)_(?P<end>[^_]+)_(?P<location>.+)\.csv$')
 
-            for index, row in df.iterrows():
-                employee_name = row['Server']
-                tip_value = row['Tip']
+# One report to build: tips may be None, start/end/location are '' when unknown
+BatchPeriod = namedtuple('BatchPeriod', ['name', 'hours', 'tips', 'output', 'start', 'end', 'location'])
 
-                # Fix: Split by just the comma and strip whitespace from parts
-                name_parts = [part.strip() for part in employee_name.split(',')]
-                
-                # Check if the split was successful
-                if len(name_parts) == 2:
-                    employee_name = f"{name_parts[1]} {name_parts[0]}"
-                
-                if tip_value > 0:
-                    servers_tips[employee_name] = {'tip': tip_value}
+BATCH_SUMMARY_COLUMNS = [
+    ('Period', None), ('Location', None), ('Employees', '0'), ('Total Hours', '0.00'),
+    ('Lunch Tips', '$0.00'), ('Dinner Tips General', '$0.00'), ('Dinner Tips Servers', '$0.00'),
+    ('Total Tips', '$0.00')
+]
 
-            print(servers_tips)
 
-        # --- 8. Calculate Tips (if tips file provided) ---
-        if tips_csv_path:
+def _named_locations(name, locations):
+    """
+    The batch locations a file name mentions as whole words. A location that is
+    part of a longer one named at the same spot (uptown in uptown-east) doesn't count.
+    """
+    found = []
+    for location in sorted(locations, key=len, reverse=True):
+        for match in re.finditer(rf'(?<![A-Za-z0-9]){re.escape(location)}(?![A-Za-z0-9])', name):
+            if not any(start <= match.start() and match.end() <= end for start, end, _ in found):
+                found.append((match.start(), match.end(), location))
+    return {location for _, _, location in found}
+
+
+def _find_tips_file(directory, start, end, location, locations=(), period_locations=()):
+    """
+    Picks the tips export for a period: a CSV with "tip" in its name that
+    mentions the period's start or end date (e.g. tips_2025-07-28_2025-08-10.csv)
+    or the end date as month-day (e.g. tips-8-10.csv). Full dates are preferred.
+
+    locations are all the locations in the batch and period_locations those
+    with hours for this same period. A file naming another location is never
+    used, and one naming this location wins. A file naming no location is only
+    used when the period has a single location; otherwise it is ambiguous, so
+    the period gets no tips and a warning, rather than paying the same pool
+    out once per location.
+    """
+    candidates = [name for name in sorted(os.listdir(directory))
+                  if name.lower().endswith('.csv') and 'tip' in name.lower()]
+    matches = [name for name in candidates if start in name or end in name]
+    month_day = re.match(r'^\d{4}-(\d{1,2})-(\d{1,2})$', end)
+    if month_day:
+        # Still tried when every full-date file is for another location
+        short_end = f"{int(month_day.group(1))}-{int(month_day.group(2))}"
+        matches += [name for name in candidates
+                    if name not in matches and re.search(rf'(^|[^0-9]){short_end}([^0-9]|$)', name)]
+
+    locations = set(locations) | {location}
+    period_locations = set(period_locations) | {location}
+    named = {name: _named_locations(name, locations) for name in matches}
+    own = [name for name in matches if named[name] == {location}]
+    if own:
+        return os.path.join(directory, own[0])
+
+    unnamed = [name for name in matches if not named[name]]
+    if not unnamed:
+        if matches:
+            print(f"Warning: every tips file for {start} to {end} ({', '.join(matches)}) names another location; "
+                  f"{location} gets no tips.")
+        return None
+    if len(period_locations) > 1:
+        print(f"Warning: no tips file for {start} to {end} names {location}, and {', '.join(unnamed)} "
+              f"{'names' if len(unnamed) == 1 else 'name'} no location while the period has hours for "
+              f"{', '.join(sorted(period_locations))}; {location} gets no tips. "
+              f"Pair each location with its tips file in a manifest CSV (hours,tips,output columns).")
+        return None
+    return os.path.join(directory, unnamed[0])
+
+
+def find_batch_periods(directory, output_dir=None):
+    """One BatchPeriod per hours-and-wages-summary_<start>_<end>_<location>.csv in directory."""
+    output_dir = output_dir or directory
+    hours_files = [(filename, match.group('start', 'end', 'location')) for filename in sorted(os.listdir(directory))
+                   for match in [HOURS_FILE_PATTERN.match(filename)] if match]
+    locations = {location for _, (_, _, location) in hours_files}
+
+    periods = []
+    for filename, (start, end, location) in hours_files:
+        period_locations = [other for _, (other_start, other_end, other) in hours_files
+                            if (other_start, other_end) == (start, end)]
+        periods.append(BatchPeriod(
+            name=f"{start}_{end}_{location}",
+            hours=os.path.join(directory, filename),
+            tips=_find_tips_file(directory, start, end, location, locations, period_locations),
+            output=os.path.join(output_dir, f"payroll_{start}_{end}_{location}.xlsx"),
+            start=start, end=end, location=location
+        ))
+    return periods
+
+
+def read_batch_manifest(manifest_path, output_dir=None):
+    """
+    Reads a manifest CSV with an hours column and optional tips, output and name
+    columns. Relative paths are resolved against the manifest's directory.
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    output_dir = output_dir or base_dir
+
+    def resolve(path, directory=base_dir):
+        path = (path or '').strip()
+        return os.path.join(directory, path) if path else None
+
+    periods = []
+    with open(manifest_path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            hours = resolve(row.get('hours'))
+            if hours is None:
+                continue
+            match = HOURS_FILE_PATTERN.match(os.path.basename(hours))
+            start, end, location = match.group('start', 'end', 'location') if match else ('', '', '')
+            name = (row.get('name') or '').strip() or os.path.splitext(os.path.basename(hours))[0]
+            periods.append(BatchPeriod(
+                name=name,
+                hours=hours,
+                tips=resolve(row.get('tips')),
+                output=resolve(row.get('output'), output_dir) or os.path.join(output_dir, f"payroll_{name}.xlsx"),
+                start=start, end=end, location=location
+            ))
+    return periods
+
+
+def period_summary_row(period, result):
+    """One row of the consolidated summary sheet, in BATCH_SUMMARY_COLUMNS order."""
+    allocation = result.allocation
+    tip_totals = list(allocation.role_tips.sum(axis=1)) if allocation is not None else [0, 0, 0]
+    return [
+        f"{period.start} to {period.end}" if period.start else period.name,
+        period.location,
+        len(result.roster.employees),
+        result.total_hours,
+        *tip_totals,
+        sum(tip_totals)
+    ]
+
+
+def _build_period(period, chunksize=None):
+    """Runs in a worker process. Computes one period for the combined workbook."""
+    return compute_payroll(period.hours, period.tips, chunksize=chunksize)
+
+
+def _write_period(period, write_only, conditional_formatting=False, chunksize=None):
+    """Runs in a worker process. Writes one period's workbook and returns its summary row."""
+    result = compute_payroll(period.hours, period.tips, chunksize=chunksize)
+    render_payroll_workbook(result, period.output, write_only, conditional_formatting=conditional_formatting)
+    print(f"Successfully created payroll report: {period.output}")
+    return period_summary_row(period, result)
+
+
+def _sheet_titles(periods):
+    """Unique Excel sheet titles (max 31 characters, no []:*?/\\) for each period."""
+    single_location = len({period.location for period in periods}) <= 1
+    titles = []
+    for period in periods:
+        if period.start:
+            title = f"{period.start}_{period.end}" if single_location else f"{period.location}_{period.start}"
+        else:
+            title = period.name
+        title = re.sub(r'[\[\]:*?/\\]', '-', title)[:31]
+        unique_title, copy = title, 2
+        while unique_title in titles or unique_title == 'Summary':
+            suffix = f" ({copy})"
+            unique_title, copy = title[:31 - len(suffix)] + suffix, copy + 1
+        titles.append(unique_title)
+    return titles
+
+
+def run_batch(periods, combined_path=None, summary_path=None, max_workers=None, write_only=False,
+              conditional_formatting=False, chunksize=None):
+    """
+    Builds every period across a process pool. By default each period gets its
+    own workbook at period.output and a consolidated summary workbook is saved
+    to summary_path. With combined_path, one workbook is written instead, with
+    the summary sheet first and a sheet per period. Returns the names of the
+    periods that failed; the others are still written.
+    """
+    worker = _build_period if combined_path else _write_period
+    extra_args = (chunksize,) if combined_path else (write_only, conditional_formatting, chunksize)
+    results, failed = [], []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(worker, period, *extra_args) for period in periods]
+        for period, future in zip(periods, futures):
             try:
-                # Read tips data
-                tips_df = pd.read_csv(tips_csv_path)
-                tips_df.columns = tips_df.columns.str.strip()
-                
-                # Find the row with "Total Allocated General Pool" to get lunch tips
-                lunch_tips_total = 0
-                dinner_tips_total = 0
-                server_contribution_total = 0
-                server_cash_cc_tips = 0
-                
-                # Look for the "Total Allocated General Pool" row
-                for index, row in tips_df.iterrows():
-                    if pd.notna(row.iloc[1]) and 'Total Allocated General Pool' in str(row.iloc[1]):
-                        if pd.notna(row.iloc[2]):
-                            lunch_tips_total = float(row.iloc[2])
-                        if pd.notna(row.iloc[3]):
-                            dinner_tips_total = float(row.iloc[3])
-                        break
-                
-                # Look for the "Server Contribution to General Pool" row
-                for index, row in tips_df.iterrows():
-                    if pd.notna(row.iloc[1]) and 'Server Contribution to General Pool' in str(row.iloc[1]):
-                        if pd.notna(row.iloc[3]):
-                            server_contribution_total = float(row.iloc[3])
-                        break
-                
-                # Look for the "Less Server Cash & CC Tips" row
-                for index, row in tips_df.iterrows():
-                    if pd.notna(row.iloc[1]) and 'Less Server Cash & CC Tips' in str(row.iloc[1]):
-                        if pd.notna(row.iloc[3]):
-                            server_cash_cc_tips = float(row.iloc[3])
-                        break
-                
-                print(f"Found tips - Lunch: ${lunch_tips_total:.2f}, Dinner: ${dinner_tips_total:.2f}, Server Contribution: ${server_contribution_total:.2f}, Server Cash & CC: ${server_cash_cc_tips:.2f}")
-                
-                # --- LUNCH TIPS SECTION ---
-                lunch_tips_row = space_row + 1
-                
-                # Add "LUNCH TIPS" label
-                lunch_tips_label_cell = ws.cell(row=lunch_tips_row, column=1, value='LUNCH TIPS')
-                lunch_tips_label_cell.font = Font(bold=True, color="FFFFFF")
-                lunch_tips_label_cell.fill = PatternFill(start_color="70AD47", fill_type="solid")
-                lunch_tips_label_cell.alignment = centered_alignment
-                lunch_tips_label_cell.border = thin_border
-                
-                # Calculate tips for each lunch role
-                lunch_tip_amounts = {}
-                for c_idx, col_name in enumerate(final_summary.columns, 2):
-                    role_tip_amount = 0
-                    
-                    if col_name != 'Total Hours':
-                        if final_summary[col_name].sum() > 0:
-                            if '_Lunch' in col_name:
-                                role_name = col_name.replace('_Lunch', '')
-                                if role_name in ALLOCATION_TABLE['Lunch']:
-                                    allocation_rate = ALLOCATION_TABLE['Lunch'][role_name]
-                                    role_tip_amount = lunch_tips_total * allocation_rate
-                            elif col_name == 'Kitchen':
-                                if 'Kitchen' in ALLOCATION_TABLE['Lunch']:
-                                    allocation_rate = ALLOCATION_TABLE['Lunch']['Kitchen']
-                                    role_tip_amount = lunch_tips_total * allocation_rate
-                            elif col_name in ALLOCATION_TABLE['Lunch']:
-                                allocation_rate = ALLOCATION_TABLE['Lunch'][col_name]
-                                role_tip_amount = lunch_tips_total * allocation_rate
-                        
-                        lunch_tip_amounts[c_idx] = role_tip_amount
-                        
-                        # Add tip amount to Excel
-                        tip_cell = ws.cell(row=lunch_tips_row, column=c_idx, value=role_tip_amount)
-                        tip_cell.font = Font(bold=True)
-                        tip_cell.number_format = '$0.00'
-                        tip_cell.border = thin_border
-                        tip_cell.fill = PatternFill(start_color="D5E8D4", fill_type="solid")
-                
-                # Add total lunch tips
-                lunch_tip_total = sum(lunch_tip_amounts.values())
-                total_tip_cell = ws.cell(row=lunch_tips_row, column=len(final_summary.columns) + 1, value=lunch_tip_total)
-                total_tip_cell.font = Font(bold=True)
-                total_tip_cell.number_format = '$0.00'
-                total_tip_cell.border = thin_border
-                total_tip_cell.fill = PatternFill(start_color="D5E8D4", fill_type="solid")
-                
-                # --- DINNER TIPS GENERAL SECTION ---
-                dinner_tips_row = lunch_tips_row + 1
-                
-                # Add "DINNER TIPS GENERAL" label
-                dinner_tips_label_cell = ws.cell(row=dinner_tips_row, column=1, value='DINNER TIPS GENERAL')
-                dinner_tips_label_cell.font = Font(bold=True, color="FFFFFF")
-                dinner_tips_label_cell.fill = PatternFill(start_color="FF6B35", fill_type="solid")
-                dinner_tips_label_cell.alignment = centered_alignment
-                dinner_tips_label_cell.border = thin_border
-                
-                # Calculate dinner tips for each role
-                dinner_tip_amounts = {}
-                for c_idx, col_name in enumerate(final_summary.columns, 2):
-                    role_tip_amount = 0
-                    
-                    if col_name != 'Total Hours':
-                        if final_summary[col_name].sum() > 0:
-                            if '_Dinner' in col_name:
-                                role_name = col_name.replace('_Dinner', '')
-                                if role_name in ALLOCATION_TABLE['Dinner_General']:
-                                    allocation_rate = ALLOCATION_TABLE['Dinner_General'][role_name]
-                                    role_tip_amount = dinner_tips_total * allocation_rate
-                            elif col_name == 'Kitchen':
-                                if 'Kitchen' in ALLOCATION_TABLE['Dinner_General']:
-                                    allocation_rate = ALLOCATION_TABLE['Dinner_General']['Kitchen']
-                                    role_tip_amount = dinner_tips_total * allocation_rate
-                            elif col_name in ALLOCATION_TABLE['Dinner_General']:
-                                allocation_rate = ALLOCATION_TABLE['Dinner_General'][col_name]
-                                role_tip_amount = dinner_tips_total * allocation_rate
-                        
-                        dinner_tip_amounts[c_idx] = role_tip_amount
-                        
-                        # Add tip amount to Excel
-                        tip_cell = ws.cell(row=dinner_tips_row, column=c_idx, value=role_tip_amount)
-                        tip_cell.font = Font(bold=True)
-                        tip_cell.number_format = '$0.00'
-                        tip_cell.border = thin_border
-                        tip_cell.fill = PatternFill(start_color="FFE5DB", fill_type="solid")
-                
-                # Add total dinner tips
-                dinner_tip_total = sum(dinner_tip_amounts.values())
-                total_dinner_tip_cell = ws.cell(row=dinner_tips_row, column=len(final_summary.columns) + 1, value=dinner_tip_total)
-                total_dinner_tip_cell.font = Font(bold=True)
-                total_dinner_tip_cell.number_format = '$0.00'
-                total_dinner_tip_cell.border = thin_border
-                total_dinner_tip_cell.fill = PatternFill(start_color="FFE5DB", fill_type="solid")
-                
-                # --- DINNER TIPS SERVERS SECTION ---
-                server_tips_row = dinner_tips_row + 1
-                
-                # Add "DINNER TIPS SERVERS" label
-                server_tips_label_cell = ws.cell(row=server_tips_row, column=1, value='DINNER TIPS SERVERS')
-                server_tips_label_cell.font = Font(bold=True, color="FFFFFF")
-                server_tips_label_cell.fill = PatternFill(start_color="8E44AD", fill_type="solid")
-                server_tips_label_cell.alignment = centered_alignment
-                server_tips_label_cell.border = thin_border
-                
-                # Calculate server tips for each role
-                server_tip_amounts = {}
-                servers_to_pool_rate = ALLOCATION_TABLE['Servers_to_Pool_Rate']
-                server_keep_amount = server_cash_cc_tips * (1 - servers_to_pool_rate)
-                
-                for c_idx, col_name in enumerate(final_summary.columns, 2):
-                    role_tip_amount = 0
-                    
-                    if col_name != 'Total Hours':
-                        if col_name == 'Server':
-                            role_tip_amount = server_keep_amount
-                        elif '_Dinner' in col_name:
-                            role_name = col_name.replace('_Dinner', '')
-                            if role_name in ALLOCATION_TABLE['Dinner_Servers']:
-                                allocation_rate = ALLOCATION_TABLE['Dinner_Servers'][role_name]
-                                role_tip_amount = server_contribution_total * allocation_rate
-                        elif col_name == 'Kitchen':
-                            if 'Kitchen' in ALLOCATION_TABLE['Dinner_Servers']:
-                                allocation_rate = ALLOCATION_TABLE['Dinner_Servers']['Kitchen']
-                                role_tip_amount = server_contribution_total * allocation_rate
-                        elif col_name in ALLOCATION_TABLE['Dinner_Servers']:
-                            allocation_rate = ALLOCATION_TABLE['Dinner_Servers'][col_name]
-                            role_tip_amount = server_contribution_total * allocation_rate
-                        
-                        server_tip_amounts[c_idx] = role_tip_amount
-                        
-                        # Add tip amount to Excel
-                        tip_cell = ws.cell(row=server_tips_row, column=c_idx, value=role_tip_amount)
-                        tip_cell.font = Font(bold=True)
-                        tip_cell.number_format = '$0.00'
-                        tip_cell.border = thin_border
-                        tip_cell.fill = PatternFill(start_color="E8DAEF", fill_type="solid")
-                
-                # Add total server tips
-                server_tip_total = sum(server_tip_amounts.values())
-                total_server_tip_cell = ws.cell(row=server_tips_row, column=len(final_summary.columns) + 1, value=server_tip_total)
-                total_server_tip_cell.font = Font(bold=True)
-                total_server_tip_cell.number_format = '$0.00'
-                total_server_tip_cell.border = thin_border
-                total_server_tip_cell.fill = PatternFill(start_color="E8DAEF", fill_type="solid")
-                
-                # --- GRAND TOTAL ROW (ALL TIPS COMBINED) ---
-                grand_total_row = server_tips_row + 2  # Add a space row before grand total
-                
-                # Add "TOTAL" label
-                grand_total_label = ws.cell(row=grand_total_row, column=1, value='TOTAL')
-                grand_total_label.font = Font(bold=True, color="FFFFFF", size=12)
-                grand_total_label.fill = PatternFill(start_color="2E2E2E", fill_type="solid")
-                grand_total_label.alignment = centered_alignment
-                grand_total_label.border = thin_border
-                
-                # Calculate grand totals for each column (sum of all three tip sections)
-                total_role_tips = {}  # Store total tips per role for individual calculations
-                for c_idx, col_name in enumerate(final_summary.columns, 2):
-                    if col_name != 'Total Hours':
-                        # Sum up tips from all three sections
-                        lunch_amount = lunch_tip_amounts.get(c_idx, 0)
-                        dinner_amount = dinner_tip_amounts.get(c_idx, 0)
-                        server_amount = server_tip_amounts.get(c_idx, 0)
-                        column_grand_total = lunch_amount + dinner_amount + server_amount
-                        
-                        # Store for individual calculations
-                        total_role_tips[col_name] = column_grand_total
-                        
-                        # Add grand total to Excel
-                        grand_total_cell = ws.cell(row=grand_total_row, column=c_idx, value=column_grand_total)
-                        grand_total_cell.font = Font(bold=True, size=11)
-                        grand_total_cell.number_format = '$0.00'
-                        grand_total_cell.border = thin_border
-                        grand_total_cell.fill = PatternFill(start_color="F2F2F2", fill_type="solid")
-                
-                # Add final grand total (sum of all tips)
-                final_grand_total = lunch_tip_total + dinner_tip_total + server_tip_total
-                final_total_cell = ws.cell(row=grand_total_row, column=len(final_summary.columns) + 1, value=final_grand_total)
-                final_total_cell.font = Font(bold=True, size=11)
-                final_total_cell.number_format = '$0.00'
-                final_total_cell.border = thin_border
-                final_total_cell.fill = PatternFill(start_color="F2F2F2", fill_type="solid")
-                
-                # --- INDIVIDUAL EMPLOYEE TIP CALCULATIONS ---
-                individual_tips_start_row = grand_total_row + 3  # Add spacing before individual tips
-                
-                # Add "INDIVIDUAL EMPLOYEE TIPS" header
-                individual_header = ws.cell(row=individual_tips_start_row, column=1, value='INDIVIDUAL EMPLOYEE TIPS')
-                individual_header.font = Font(bold=True, color="FFFFFF", size=14)
-                individual_header.fill = PatternFill(start_color="1F4E79", fill_type="solid")
-                individual_header.alignment = centered_alignment
-                individual_header.border = thin_border
-                
-                # Merge the header across all columns
-                ws.merge_cells(start_row=individual_tips_start_row, start_column=1, end_row=individual_tips_start_row, end_column=len(final_summary.columns) + 1)
-                
-                # Add column headers for individual tips (same as original table)
-                individual_header_row = individual_tips_start_row + 1
-                
-                # Team Member header
-                tm_header = ws.cell(row=individual_header_row, column=1, value='Team Member')
-                ws.merge_cells(start_row=individual_header_row, start_column=1, end_row=individual_header_row + 1, end_column=1)
-                tm_header.font = header_font
-                tm_header.fill = single_header_fill
-                tm_header.alignment = centered_alignment
-                tm_header.border = thin_border
-                
-                # Role headers
-                col_idx = 2
-                for main_header, sub_headers in header_structure.items():
-                    if sub_headers:
-                        main_cell = ws.cell(row=individual_header_row, column=col_idx, value=main_header)
-                        ws.merge_cells(start_row=individual_header_row, start_column=col_idx, end_row=individual_header_row, end_column=col_idx + 1)
-                        main_cell.font = header_font
-                        main_cell.fill = main_header_fill
-                        main_cell.alignment = centered_alignment
-                        main_cell.border = thin_border
-                        
-                        lunch_cell = ws.cell(row=individual_header_row + 1, column=col_idx, value=sub_headers[0])
-                        lunch_cell.font = bold_font
-                        lunch_cell.fill = sub_header_fill
-                        lunch_cell.alignment = centered_alignment
-                        lunch_cell.border = thin_border
-                        
-                        dinner_cell = ws.cell(row=individual_header_row + 1, column=col_idx + 1, value=sub_headers[1])
-                        dinner_cell.font = bold_font
-                        dinner_cell.fill = sub_header_fill
-                        dinner_cell.alignment = centered_alignment
-                        dinner_cell.border = thin_border
-                        col_idx += 2
-                    else:
-                        main_cell = ws.cell(row=individual_header_row, column=col_idx, value=main_header)
-                        ws.merge_cells(start_row=individual_header_row, start_column=col_idx, end_row=individual_header_row + 1, end_column=col_idx)
-                        main_cell.font = header_font
-                        main_cell.fill = single_header_fill
-                        main_cell.alignment = centered_alignment
-                        main_cell.border = thin_border
-                        col_idx += 1
-                
-                # Total Tips header
-                total_tips_header = ws.cell(row=individual_header_row, column=col_idx, value='Total Tips')
-                ws.merge_cells(start_row=individual_header_row, start_column=col_idx, end_row=individual_header_row + 1, end_column=col_idx)
-                total_tips_header.font = header_font
-                total_tips_header.fill = single_header_fill
-                total_tips_header.alignment = centered_alignment
-                total_tips_header.border = thin_border
-                
-                # Calculate individual employee tips
-                individual_data_start_row = individual_header_row + 2
-                
-                # Get role totals from the ROLE TOTALS row we calculated earlier
-                role_totals = {}
-                for c_idx, col_name in enumerate(final_summary.columns, 2):
-                    if col_name != 'Total Hours':
-                        role_totals[col_name] = final_summary[col_name].sum()
-                
-                # Calculate tips for each employee
-                for r_idx, (employee_name, employee_data) in enumerate(final_summary.iterrows()):
-                    current_row = individual_data_start_row + r_idx
-                    
-                    # Add employee name
-                    emp_name_cell = ws.cell(row=current_row, column=1, value=employee_name)
-                    emp_name_cell.border = thin_border
-                    emp_name_cell.alignment = Alignment(horizontal='left', vertical='center')
-                    
-                    # Highlight salary employees
-                    if employee_name in SALARY_EMPLOYEES:
-                        emp_name_cell.fill = PatternFill(start_color="E6F3FF", fill_type="solid")
-                        emp_name_cell.font = Font(bold=True)
-                    
-                    employee_total_tips = 0
-                    
-                    # Calculate tips for each role
-                    for c_idx, col_name in enumerate(final_summary.columns, 2):
-                        if col_name != 'Total Hours':
-                            employee_hours = employee_data[col_name]
-                            role_total_hours = role_totals[col_name]
-                            role_total_tips = total_role_tips.get(col_name, 0)
-                            
-                            # Calculate individual tip: (Total Role Tips) * (Employee Hours / Total Role Hours)
-                            if role_total_hours > 0 and employee_hours > 0:
-                                individual_tip = role_total_tips * (employee_hours / role_total_hours)
-                            else:
-                                individual_tip = 0
-                                
-                            
-                            # --- FIX: Update the individual_tip for servers ---
-                            if col_name == 'Server' and employee_name in servers_tips:
-                                individual_tip = servers_tips[employee_name]['tip']
-                                print(f"Corrected server tip for {employee_name} is {individual_tip}")
-                            # --------------------------------------------------
-                            
-                            employee_total_tips += individual_tip
-                                
-                            
-                            # Add to Excel
-                            tip_cell = ws.cell(row=current_row, column=c_idx, value=individual_tip)
-                            tip_cell.number_format = '$0.00'
-                            tip_cell.border = thin_border
-                            tip_cell.alignment = centered_alignment
-                            
-                            # Highlight salary employees and color coding for different tip amounts
-                            if employee_name in SALARY_EMPLOYEES:
-                                tip_cell.fill = PatternFill(start_color="E6F3FF", fill_type="solid")  # Light blue for salary employees
-                            elif individual_tip > 0:
-                                if individual_tip >= 50:
-                                    tip_cell.fill = PatternFill(start_color="C6E0B4", fill_type="solid")  # Green for high tips
-                                elif individual_tip >= 20:
-                                    tip_cell.fill = PatternFill(start_color="FFE699", fill_type="solid")  # Yellow for medium tips
-                                else:
-                                    tip_cell.fill = PatternFill(start_color="F2F2F2", fill_type="solid")  # Light gray for low tips
-                    
-                    # Add total tips for employee
-                    total_tip_cell = ws.cell(row=current_row, column=len(final_summary.columns) + 1, value=employee_total_tips)
-                    total_tip_cell.number_format = '$0.00'
-                    total_tip_cell.border = thin_border
-                    total_tip_cell.alignment = centered_alignment
-                    total_tip_cell.font = Font(bold=True)
-                    
-                    # Color code total based on amount, with special highlighting for salary employees
-                    if employee_name in SALARY_EMPLOYEES:
-                        total_tip_cell.fill = PatternFill(start_color="B3D9FF", fill_type="solid")  # Darker blue for salary employees
-                    elif employee_total_tips >= 100:
-                        total_tip_cell.fill = PatternFill(start_color="92D050", fill_type="solid")  # Bright green
-                    elif employee_total_tips >= 50:
-                        total_tip_cell.fill = PatternFill(start_color="C6E0B4", fill_type="solid")  # Light green
-                    elif employee_total_tips >= 20:
-                        total_tip_cell.fill = PatternFill(start_color="FFE699", fill_type="solid")  # Yellow
-                    else:
-                        total_tip_cell.fill = PatternFill(start_color="F2F2F2", fill_type="solid")  # Light gray
-                
-                # Add individual tips totals row
-                individual_totals_row = individual_data_start_row + len(final_summary)
-                
-                # Add label
-                totals_label = ws.cell(row=individual_totals_row, column=1, value='INDIVIDUAL TOTALS')
-                totals_label.font = Font(bold=True, color="FFFFFF")
-                totals_label.fill = PatternFill(start_color="1F4E79", fill_type="solid")
-                totals_label.alignment = centered_alignment
-                totals_label.border = thin_border
-                
-                # Calculate column totals for verification
-                verification_total = 0
-                for c_idx, col_name in enumerate(final_summary.columns, 2):
-                    if col_name != 'Total Hours':
-                        column_total = total_role_tips.get(col_name, 0)  # Should match the role total tips
-                        verification_total += column_total
-                        
-                        total_cell = ws.cell(row=individual_totals_row, column=c_idx, value=column_total)
-                        total_cell.font = Font(bold=True)
-                        total_cell.number_format = '$0.00'
-                        total_cell.border = thin_border
-                        total_cell.fill = PatternFill(start_color="D9E2F3", fill_type="solid")
-                        total_cell.alignment = centered_alignment
-                
-                # Add verification grand total
-                verification_grand_total = ws.cell(row=individual_totals_row, column=len(final_summary.columns) + 1, value=verification_total)
-                verification_grand_total.font = Font(bold=True)
-                verification_grand_total.number_format = '$0.00'
-                verification_grand_total.border = thin_border
-                verification_grand_total.fill = PatternFill(start_color="D9E2F3", fill_type="solid")
-                verification_grand_total.alignment = centered_alignment
-                
-                print(f"Lunch tips calculated: ${lunch_tip_total:.2f}")
-                print(f"Dinner tips general calculated: ${dinner_tip_total:.2f}")
-                print(f"Dinner tips servers calculated: ${server_tip_total:.2f}")
-                print(f"GRAND TOTAL of all tips: ${final_grand_total:.2f}")
-                
-            except FileNotFoundError:
-                print(f"Warning: Tips file '{tips_csv_path}' not found. Skipping tip calculations.")
+                results.append((period, future.result()))
             except Exception as e:
-                print(f"Error processing tips file: {e}")
+                print(f"Error building report for {period.name}: {e}")
+                failed.append(period.name)
+
+    wb = payroll_workbook(write_only)
+    if combined_path:
+        rows = [period_summary_row(period, result) for period, result in results]
+        stream_summary_sheet(wb.create_sheet("Summary"), BATCH_SUMMARY_COLUMNS, rows)
+        titles = _sheet_titles([period for period, _ in results])
+        for title, (period, result) in zip(titles, results):
+            add_payroll_sheet(wb, title, result.roster, result.allocation, conditional_formatting)
+        wb.save(combined_path)
+        print(f"Successfully created combined payroll report: {combined_path}")
+    else:
+        rows = [row for _, row in results]
+        stream_summary_sheet(wb.create_sheet("Summary"), BATCH_SUMMARY_COLUMNS, rows)
+        wb.save(summary_path)
+        print(f"Successfully created batch summary: {summary_path}")
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build payroll reports for many periods or locations at once.")
+    parser.add_argument('source', help="directory of hours-and-wages-summary_<start>_<end>_<location>.csv files "
+                                       "(tips CSVs alongside), or a manifest CSV with hours,tips,output columns")
+    parser.add_argument('-o', '--output-dir', help="where workbooks are written (default: next to the inputs)")
+    parser.add_argument('--combined', metavar='XLSX', help="write one workbook with a sheet per period instead")
+    parser.add_argument('--summary', metavar='XLSX', help="consolidated summary workbook (default: batch-summary.xlsx)")
+    parser.add_argument('-j', '--workers', type=int, help="reports built in parallel (default: CPU count)")
+    parser.add_argument('--write-only', action='store_true', help="stream rows to disk to keep memory flat")
+    parser.add_argument('--conditional-formatting', action='store_true',
+                        help="colour tip bands with sheet-level rules instead of per-cell fills (smaller, faster)")
+    parser.add_argument('--chunk-rows', type=int, metavar='N',
+                        help="read hours files N punches at a time so memory depends on employees, not punches")
+    args = parser.parse_args(argv)
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    if os.path.isdir(args.source):
+        periods = find_batch_periods(args.source, args.output_dir)
+    else:
+        periods = read_batch_manifest(args.source, args.output_dir)
+    if not periods:
+        print(f"No hours files found in {args.source}")
+        return 1
+    for period in periods:
+        print(f"{period.name}: hours={period.hours} tips={period.tips or '(none)'}")
+
+    output_dir = args.output_dir or os.path.dirname(periods[0].output)
+    summary_path = args.summary or os.path.join(output_dir, 'batch-summary.xlsx')
+    failed = run_batch(periods, args.combined, summary_path, args.workers, args.write_only,
+                       args.conditional_formatting, args.chunk_rows)
+    if failed:
+        print(f"{len(failed)} of {len(periods)} periods failed: {', '.join(failed)}")
+    return 1 if failed else 0
 
-        # --- 9. Final Formatting and Save ---
-        for col in ws.columns:
-            ws.column_dimensions[get_column_letter(col[0].column)].width = 15
-        ws.column_dimensions['A'].width = 25
-        wb.save(xlsx_file_path)
-        print(f"Successfully created payroll report: {xlsx_file_path}")
-        
-        # Print summary of salary employees added
-        for emp_name, config in SALARY_EMPLOYEES.items():
-            total_hours = config['lunch_hours'] + config['dinner_hours']
-            print(f"Added salary employee: {emp_name} - {total_hours} hours in {config['role']}")
-            
-    except FileNotFoundError as e:
-        print(f"Error: File not found - {e}")
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
 
 # --- Example Usage ---
 #if __name__ == "__main__":
@@ -676,4 +738,8 @@ def create_final_payroll_report(csv_file_path, xlsx_file_path, tips_csv_path=Non
     #payroll_report_xlsx = "tipFile_july-aug.xlsx"
     #create_final_payroll_report(hours_csv, payroll_report_xlsx, tips_csv)
     
-    #using tips correctly & fix augustin name
\ No newline at end of file
+    #using tips correctly & fix augustin name
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# tips_parser.py
+import csv
+import io
+from collections import namedtuple
+from contextlib import contextmanager
+
+# --- Tips File Layout ---
+SERVER_ROWS_START = 6  # Per-server rows come after a 6 line preamble
+SERVER_COLUMN = 8
+TIP_COLUMN = 15
+LABEL_COLUMN = 1  # Summary rows: label, lunch amount, dinner amount
+LUNCH_COLUMN = 2
+DINNER_COLUMN = 3
+
+GENERAL_POOL_LABEL = 'Total Allocated General Pool'
+SERVER_CONTRIBUTION_LABEL = 'Server Contribution to General Pool'
+SERVER_CASH_CC_LABEL = 'Less Server Cash & CC Tips'
+
+# servers_tips: {"First Last": {'tip': amount}} for every server with a positive tip
+# totals: {label: (lunch value, dinner value)} raw strings for every labeled summary row
+TipsSummary = namedtuple('TipsSummary', [
+    'servers_tips', 'totals', 'lunch_tips_total', 'dinner_tips_total',
+    'server_contribution_total', 'server_cash_cc_tips'
+])
+
+
+def _field(row, idx):
+    """Returns the stripped field, or None when it is missing or blank."""
+    if idx < len(row):
+        value = row[idx].strip()
+        if value:
+            return value
+    return None
+
+
+def _to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def server_name(pos_name):
+    """Turns a POS "Last, First" name into the roster's "First Last" form."""
+    name_parts = [part.strip() for part in pos_name.split(',')]
+    if len(name_parts) == 2:
+        return f"{name_parts[1]} {name_parts[0]}"
+    return pos_name
+
+
+def _find_total(totals, label, column):
+    """Amount in the first summary row whose label contains `label`, or 0."""
+    for row_label, values in totals.items():
+        if label in row_label:
+            value = values[column - LUNCH_COLUMN]
+            return float(value) if value is not None else 0
+    return 0
+
+
+@contextmanager
+def _open_text(tips_csv, encoding):
+    """Yields a text stream for a path, a text file or a binary buffer, closing only what it opened."""
+    if not hasattr(tips_csv, 'read'):
+        with open(tips_csv, newline='', encoding=encoding) as f:
+            yield f
+    elif isinstance(tips_csv.read(0), bytes):
+        text = io.TextIOWrapper(tips_csv, encoding=encoding, newline='')
+        try:
+            yield text
+        finally:
+            text.detach()
+    else:
+        yield tips_csv
+
+
+def parse_tips_file(tips_csv, encoding='utf-8-sig'):
+    """
+    Reads a POS tips export once, line by line, and returns a TipsSummary with
+    the per-server tips (Server / Tip columns 8 and 15) and every labeled
+    summary row. tips_csv can be a path, an open text file or a binary buffer
+    such as an upload stream.
+    """
+    servers_tips = {}
+    totals = {}
+
+    with _open_text(tips_csv, encoding) as f:
+        for line_idx, row in enumerate(csv.reader(f)):
+            # The first line is the file header, never a summary row
+            label = _field(row, LABEL_COLUMN) if line_idx > 0 else None
+            if label is not None and label not in totals:
+                totals[label] = (_field(row, LUNCH_COLUMN), _field(row, DINNER_COLUMN))
+
+            if line_idx < SERVER_ROWS_START:
+                continue
+            pos_name = _field(row, SERVER_COLUMN)
+            if pos_name is None or pos_name == 'Server':
+                continue
+            tip_value = _to_number(_field(row, TIP_COLUMN))
+            if tip_value is not None and tip_value > 0:
+                servers_tips[server_name(pos_name)] = {'tip': tip_value}
+
+    return TipsSummary(
+        servers_tips=servers_tips,
+        totals=totals,
+        lunch_tips_total=_find_total(totals, GENERAL_POOL_LABEL, LUNCH_COLUMN),
+        dinner_tips_total=_find_total(totals, GENERAL_POOL_LABEL, DINNER_COLUMN),
+        server_contribution_total=_find_total(totals, SERVER_CONTRIBUTION_LABEL, DINNER_COLUMN),
+        server_cash_cc_tips=_find_total(totals, SERVER_CASH_CC_LABEL, DINNER_COLUMN),
+    )
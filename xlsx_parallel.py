@@ -0,0 +1,113 @@
+# xlsx_parallel.py
+import multiprocessing
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from xml.etree import ElementTree
+
+from openpyxl import Workbook
+
+from styles import STYLES
+from xlsx_stream import SHEET_TITLES, stream_layout_sheet, prime_layout_styles
+
+# --- Workbook Parts ---
+SHEET_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+STYLES_PART = 'xl/styles.xml'
+SHEET_PART = 'xl/worksheets/sheet{}.xml'  # openpyxl numbers sheets from 1 in workbook order
+DXFS_TAG = f'{{{SHEET_NS}}}dxfs'
+DXF_ID = re.compile(rb'dxfId="(\d+)"')
+DXFS_ELEMENT = re.compile(rb'<dxfs\b[^>]*/>|<dxfs\b.*?</dxfs>', re.S)
+
+ElementTree.register_namespace('', SHEET_NS)
+
+
+def layout_titles(allocation):
+    """The sheets of the multi-sheet layout for a report with or without a tip allocation."""
+    return SHEET_TITLES if allocation is not None else SHEET_TITLES[:1]
+
+
+def build_sheet_part(title, roster, header_structure, allocation=None, salary_employees=(),
+                     conditional_formatting=False):
+    """
+    Runs in a worker process. Writes one sheet of the multi-sheet layout as a
+    one-sheet write-only workbook and returns its bytes and the number of
+    cells written. The layout's styles are registered first, in the same order
+    in every part, so all parts number their cell styles the same way.
+    """
+    wb = Workbook(write_only=True)
+    prime_layout_styles(wb, roster, header_structure, salary_employees, STYLES, conditional_formatting)
+    cells = stream_layout_sheet(wb.create_sheet(title), title, roster, header_structure, allocation,
+                                salary_employees, STYLES, conditional_formatting)
+    output = BytesIO()
+    wb.save(output)
+    return output.getvalue(), cells
+
+
+def build_sheet_parts(titles, roster, header_structure, allocation=None, salary_employees=(),
+                      conditional_formatting=False, max_workers=None):
+    """
+    Builds the sheets in parallel, one worker process per sheet (at most one
+    per CPU), and returns their (bytes, cells) in title order. With a single
+    sheet or a single CPU the sheets are built one after another in-process,
+    as they are when this already runs in a worker process (a JobQueue or
+    run_batch worker): that pool is sized to the CPUs, so a pool per worker
+    would only oversubscribe them.
+    """
+    args = (roster, header_structure, allocation, salary_employees, conditional_formatting)
+    max_workers = min(max_workers or len(titles), len(titles), os.cpu_count() or 1)
+    if max_workers == 1 or multiprocessing.parent_process() is not None:
+        return [build_sheet_part(title, *args) for title in titles]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(build_sheet_part, title, *args) for title in titles]
+        return [future.result() for future in futures]
+
+
+def assemble_workbook(titles, parts, target):
+    """
+    Puts the one-sheet workbooks from build_sheet_part together into one
+    workbook with a sheet per title and saves it to a path or binary buffer.
+    The workbook structure comes from an empty workbook with the same titles;
+    the sheets and the shared styles come from the parts. Conditional
+    formatting styles (dxfs) are numbered per part, so they are concatenated
+    and each sheet's references shifted to match.
+    """
+    skeleton = BytesIO()
+    wb = Workbook(write_only=True)
+    for title in titles:
+        wb.create_sheet(title)
+    wb.save(skeleton)
+
+    sheets, dxfs, styles_root, cell_styles = [], [], None, None
+    for part in parts:
+        with zipfile.ZipFile(BytesIO(part)) as archive:
+            sheet_xml = archive.read(SHEET_PART.format(1))
+            styles_xml = archive.read(STYLES_PART)
+        if cell_styles is None:
+            styles_root, cell_styles = ElementTree.fromstring(styles_xml), DXFS_ELEMENT.sub(b'', styles_xml)
+        elif DXFS_ELEMENT.sub(b'', styles_xml) != cell_styles:
+            raise RuntimeError('Sheet parts were written with different cell styles; prime_layout_styles missed one')
+
+        offset = len(dxfs)
+        if offset:
+            sheet_xml = DXF_ID.sub(lambda match: b'dxfId="%d"' % (int(match.group(1)) + offset), sheet_xml)
+        part_dxfs = ElementTree.fromstring(styles_xml).find(DXFS_TAG)
+        dxfs += list(part_dxfs) if part_dxfs is not None else []
+        sheets.append(sheet_xml)
+
+    styles_dxfs = styles_root.find(DXFS_TAG)
+    if styles_dxfs is None and dxfs:
+        # openpyxl leaves out an empty dxfs table; it goes right after cellStyles
+        position = list(styles_root).index(styles_root.find(f'{{{SHEET_NS}}}cellStyles')) + 1
+        styles_dxfs = ElementTree.Element(DXFS_TAG)
+        styles_root.insert(position, styles_dxfs)
+    if styles_dxfs is not None:
+        styles_dxfs[:] = dxfs
+        styles_dxfs.set('count', str(len(dxfs)))
+
+    replaced = {STYLES_PART: ElementTree.tostring(styles_root, xml_declaration=True, encoding='UTF-8')}
+    replaced.update((SHEET_PART.format(s_idx), sheet_xml) for s_idx, sheet_xml in enumerate(sheets, 1))
+    with zipfile.ZipFile(skeleton) as source, zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED) as output:
+        for item in source.infolist():
+            output.writestr(item, replaced.get(item.filename) or source.read(item))
@@ -0,0 +1,401 @@
+# xlsx_stream.py
+import numpy as np
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.rule import Rule
+from openpyxl.utils import get_column_letter
+
+from allocation import TipAllocation
+from roster import Roster
+from styles import STYLES, TIP_BANDS, TOTAL_TIP_BANDS, LOW_TIP_COLOR, SALARY_COLOR, SALARY_TOTAL_COLOR
+
+# Labels of the tip pool rows, in report order
+TIP_SECTIONS = ['LUNCH TIPS', 'DINNER TIPS GENERAL', 'DINNER TIPS SERVERS']
+
+
+def _cell(ws, value, font=None, fill=None, border=None, alignment=None, number_format=None):
+    cell = WriteOnlyCell(ws, value=value)
+    if font is not None: cell.font = font
+    if fill is not None: cell.fill = fill
+    if border is not None: cell.border = border
+    if alignment is not None: cell.alignment = alignment
+    if number_format is not None: cell.number_format = number_format
+    return cell
+
+
+def _styled(ws, value, style_name):
+    cell = WriteOnlyCell(ws, value=value)
+    cell.style = style_name
+    return cell
+
+
+def _label(ws, label, styles):
+    return _cell(ws, label, font=styles.section_label_font(label), fill=styles.section_label_fill(label),
+                 border=styles.thin_border, alignment=styles.centered_alignment)
+
+
+def _section_values(ws, label, values, number_format, styles, alignment=None):
+    font, fill = styles.section_value_font(label), styles.section_value_fill(label)
+    return [
+        _cell(ws, value, font=font, fill=fill, border=styles.thin_border, alignment=alignment, number_format=number_format)
+        for value in values
+    ]
+
+
+def _header_layout(header_structure, first_label, last_label):
+    """
+    Returns the two header rows as lists of values (None under merged cells)
+    and the merged ranges as (first_col, last_col, spans_both_rows) tuples.
+    """
+    top, bottom, merges = [first_label], [None], [(1, 1, True)]
+    for main_header, sub_headers in header_structure.items():
+        col_idx = len(top) + 1
+        if sub_headers:
+            top += [main_header, None]
+            bottom += list(sub_headers[:2])
+            merges.append((col_idx, col_idx + 1, False))
+        else:
+            top.append(main_header)
+            bottom.append(None)
+            merges.append((col_idx, col_idx, True))
+    merges.append((len(top) + 1, len(top) + 1, True))
+    top.append(last_label)
+    bottom.append(None)
+    return top, bottom, merges
+
+
+def _merge_headers(ws, merges, row):
+    for first_col, last_col, both_rows in merges:
+        end_row = row + 1 if both_rows else row
+        ws.merged_cells.add(f"{get_column_letter(first_col)}{row}:{get_column_letter(last_col)}{end_row}")
+
+
+def _hours_header_rows(ws, header_structure, styles):
+    top, bottom, merges = _header_layout(header_structure, 'Team Member', 'Total Hours')
+    _merge_headers(ws, merges, 1)
+
+    rows = []
+    for row_values, is_top in ((top, True), (bottom, False)):
+        row = []
+        for c_idx, value in enumerate(row_values):
+            # Same rule as the in-memory writer: columns without sub headers use the single fill
+            if c_idx == 0 or not header_structure.get(top[c_idx]):
+                fill = styles.single_header_fill
+            else:
+                fill = styles.main_header_fill if is_top else styles.sub_header_fill
+            font = styles.header_font if is_top else (styles.bold_font if value else None)
+            row.append(_cell(ws, value, font=font, fill=fill, border=styles.thin_border, alignment=styles.centered_alignment))
+        rows.append(row)
+    return rows
+
+
+def _tips_header_rows(ws, header_structure, row, styles, first_label='Team Member'):
+    top, bottom, merges = _header_layout(header_structure, first_label, 'Total Tips')
+    _merge_headers(ws, merges, row)
+
+    top_row = []
+    for value in top:
+        if value is None:
+            top_row.append(None)
+            continue
+        fill = styles.main_header_fill if header_structure.get(value) else styles.single_header_fill
+        top_row.append(_cell(ws, value, font=styles.header_font, fill=fill, border=styles.thin_border,
+                             alignment=styles.centered_alignment))
+    bottom_row = [
+        _cell(ws, value, font=styles.bold_font, fill=styles.sub_header_fill, border=styles.thin_border,
+              alignment=styles.centered_alignment) if value else None
+        for value in bottom
+    ]
+    return [top_row, bottom_row]
+
+
+def _banded_tip_rows(ws, employees, employee_tips, salary_employees, styles):
+    """Individual tip rows with each cell's fill picked from its tip band or the salary highlight."""
+    for employee_name, tips in zip(employees, employee_tips):
+        is_salary = employee_name in salary_employees
+        name_cell = _cell(ws, employee_name, border=styles.thin_border, alignment=styles.left_alignment)
+        if is_salary:
+            name_cell.fill = styles.salary_fill
+            name_cell.font = styles.bold_font
+
+        row = [name_cell]
+        for individual_tip in tips:
+            row.append(_cell(ws, individual_tip, fill=styles.tip_fill(individual_tip, is_salary), border=styles.thin_border,
+                             alignment=styles.centered_alignment, number_format='$0.00'))
+
+        employee_total_tips = tips.sum()
+        row.append(_cell(ws, employee_total_tips, font=styles.bold_font, fill=styles.total_tip_fill(employee_total_tips, is_salary),
+                         border=styles.thin_border, alignment=styles.centered_alignment, number_format='$0.00'))
+        yield row
+
+
+def _plain_tip_rows(ws, employees, employee_tips, styles):
+    """Individual tip rows with one named style per cell; the bands come from add_band_rules."""
+    name_style, tip_style, total_style = (styles.cell_style(ws.parent, name)
+                                          for name in ('Payroll Name', 'Payroll Tip', 'Payroll Total Tip'))
+    for employee_name, tips in zip(employees, employee_tips):
+        yield [_styled(ws, employee_name, name_style)] + [_styled(ws, value, tip_style) for value in tips] + [
+            _styled(ws, tips.sum(), total_style)
+        ]
+
+
+def _hours_rows(ws, roster, salary_employees, styles, conditional_formatting=False):
+    """One row of hours per employee."""
+    if conditional_formatting:
+        # Salary rows are highlighted by add_band_rules
+        hours_style = styles.cell_style(ws.parent, 'Payroll Hours')
+        for employee_name, row_hours in zip(roster.employees, roster.report_hours()):
+            yield [employee_name] + [_styled(ws, value, hours_style) for value in row_hours]
+    else:
+        for employee_name, row_hours in zip(roster.employees, roster.report_hours()):
+            fill = styles.salary_fill if employee_name in salary_employees else None
+            yield [employee_name] + [
+                _cell(ws, value, fill=fill, border=styles.thin_border, number_format='0.00') for value in row_hours
+            ]
+
+
+def _role_totals_row(ws, roster, styles):
+    role_totals = roster.role_totals()
+    return [_label(ws, 'ROLE TOTALS', styles)] + _section_values(
+        ws, 'ROLE TOTALS', list(role_totals) + [role_totals.sum()], '0.00', styles
+    )
+
+
+def _pool_rows(ws, allocation, styles):
+    """The three tip pool rows, a blank row and the TOTAL row."""
+    for label, role_tip_amounts in zip(TIP_SECTIONS, allocation.role_tips):
+        yield [_label(ws, label, styles)] + _section_values(
+            ws, label, list(role_tip_amounts) + [role_tip_amounts.sum()], '$0.00', styles
+        )
+    yield []
+
+    total_role_tips = allocation.role_tips.sum(axis=0)
+    yield [_label(ws, 'TOTAL', styles)] + _section_values(
+        ws, 'TOTAL', list(total_role_tips) + [allocation.role_tips.sum(axis=1).sum()], '$0.00', styles
+    )
+
+
+def _tip_rows(ws, roster, allocation, salary_employees, styles, conditional_formatting=False):
+    """One row of tips per employee, then INDIVIDUAL TOTALS."""
+    employees = list(roster.employees)
+    if conditional_formatting:
+        yield from _plain_tip_rows(ws, employees, allocation.employee_tips, styles)
+    else:
+        yield from _banded_tip_rows(ws, employees, allocation.employee_tips, salary_employees, styles)
+
+    total_role_tips = allocation.role_tips.sum(axis=0)
+    yield [_label(ws, 'INDIVIDUAL TOTALS', styles)] + _section_values(
+        ws, 'INDIVIDUAL TOTALS', list(total_role_tips) + [total_role_tips.sum()], '$0.00', styles,
+        alignment=styles.centered_alignment
+    )
+
+
+def _report_rows(ws, roster, header_structure, allocation, salary_employees, styles, conditional_formatting=False):
+    """Yields every row of the payroll sheet, top to bottom."""
+    total_col = len(roster.report_columns) + 1
+
+    # --- Hours Table ---
+    yield from _hours_header_rows(ws, header_structure, styles)
+    yield from _hours_rows(ws, roster, salary_employees, styles, conditional_formatting)
+
+    # --- Role Totals ---
+    yield _role_totals_row(ws, roster, styles)
+    yield []
+
+    if allocation is None:
+        return
+
+    # --- Tip Pools ---
+    yield from _pool_rows(ws, allocation, styles)
+    yield []
+    yield []
+
+    # --- Individual Employee Tips ---
+    individual_tips_start_row = len(roster.employees) + 12
+    ws.merged_cells.add(f"A{individual_tips_start_row}:{get_column_letter(total_col)}{individual_tips_start_row}")
+    yield [_label(ws, 'INDIVIDUAL EMPLOYEE TIPS', styles)]
+    yield from _tips_header_rows(ws, header_structure, individual_tips_start_row + 1, styles)
+    yield from _tip_rows(ws, roster, allocation, salary_employees, styles, conditional_formatting)
+
+
+def _excel_string(value):
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _band_rule(styles, color, operator=None, formula='TRUE', bold=False):
+    """A rule comparing each cell with operator, or testing an expression when operator is None."""
+    return Rule(type='cellIs' if operator else 'expression', operator=operator, formula=[formula],
+                dxf=styles.highlight(color, bold), stopIfTrue=True)
+
+
+def add_band_rules(ws, roster, allocation=None, salary_employees=(), styles=STYLES, hours_row=3, tips_row=None):
+    """
+    Adds the salary highlights and tip colour bands of the payroll sheet as a
+    handful of conditional formatting rules over whole ranges, for sheets
+    written with conditional_formatting=True. Rules are checked in the order
+    added and the first match wins, matching StyleRegistry.tip_fill and
+    total_tip_fill. Works on regular and write-only worksheets.
+    hours_row and tips_row are the first employee rows of the hours and
+    individual tips tables; they default to the payroll sheet layout and
+    hours_row=None leaves the hours table out.
+    """
+    employees = len(roster.employees)
+    if not employees:
+        return
+    last_tip_col = get_column_letter(len(roster.report_columns))
+    total_col = get_column_letter(len(roster.report_columns) + 1)
+    salary_names = [name for name in roster.employees if name in salary_employees]
+    rules = ws.conditional_formatting
+
+    def is_salary(row):
+        return 'OR(' + ','.join(f"$A{row}={_excel_string(name)}" for name in salary_names) + ')'
+
+    # --- Hours Table ---
+    if salary_names and hours_row is not None:
+        rules.add(f"B{hours_row}:{total_col}{hours_row + employees - 1}",
+                  _band_rule(styles, SALARY_COLOR, formula=is_salary(hours_row)))
+    if allocation is None:
+        return
+
+    # --- Individual Employee Tips (same rows as the writers lay out) ---
+    first = employees + 15 if tips_row is None else tips_row
+    last = first + employees - 1
+    tips_range, totals_range = f"B{first}:{last_tip_col}{last}", f"{total_col}{first}:{total_col}{last}"
+    if salary_names:
+        rules.add(f"A{first}:A{last}", _band_rule(styles, SALARY_COLOR, formula=is_salary(first), bold=True))
+        rules.add(tips_range, _band_rule(styles, SALARY_COLOR, formula=is_salary(first)))
+        rules.add(totals_range, _band_rule(styles, SALARY_TOTAL_COLOR, formula=is_salary(first)))
+    for minimum, color in TIP_BANDS:
+        # Zero and negative tips stay plain
+        operator, bound = ('greaterThanOrEqual', minimum) if minimum > 0 else ('greaterThan', 0)
+        rules.add(tips_range, _band_rule(styles, color, operator, str(bound)))
+    for minimum, color in TOTAL_TIP_BANDS:
+        rules.add(totals_range, _band_rule(styles, color, 'greaterThanOrEqual', str(minimum)))
+    rules.add(totals_range, _band_rule(styles, LOW_TIP_COLOR))
+
+
+def _column_widths(ws, columns):
+    # Column widths must be set before the first row is written
+    for c_idx in range(1, columns + 1):
+        ws.column_dimensions[get_column_letter(c_idx)].width = 15
+    ws.column_dimensions['A'].width = 25
+
+
+def stream_payroll_sheet(ws, roster, header_structure, allocation=None, salary_employees=(), styles=STYLES,
+                         conditional_formatting=False):
+    """
+    Writes the same layout as tip.write_payroll_sheet onto a write-only worksheet.
+    Rows are produced one at a time and flushed by openpyxl as they are appended,
+    so memory use does not grow with the number of employees. Returns the
+    number of cells written. With conditional_formatting the tip bands and
+    salary highlights are left to add_band_rules instead of per-cell fills.
+    """
+    _column_widths(ws, len(roster.report_columns) + 1)
+
+    cells = 0
+    for row in _report_rows(ws, roster, header_structure, allocation, salary_employees, styles, conditional_formatting):
+        ws.append(row)
+        cells += len(row)
+    if conditional_formatting:
+        add_band_rules(ws, roster, allocation, salary_employees, styles)
+    return cells
+
+
+# --- Multi-Sheet Layout ---
+# Sheets in workbook order; the two tip sheets are only written when tips were allocated
+SHEET_TITLES = ('Hours', 'Pool Allocation', 'Individual Tips')
+
+
+def _layout_rows(ws, title, roster, header_structure, allocation, salary_employees, styles, conditional_formatting):
+    if title == 'Hours':
+        yield from _hours_header_rows(ws, header_structure, styles)
+        yield from _hours_rows(ws, roster, salary_employees, styles, conditional_formatting)
+        yield _role_totals_row(ws, roster, styles)
+    elif title == 'Pool Allocation':
+        yield from _tips_header_rows(ws, header_structure, 1, styles, first_label='Tip Pool')
+        yield from _pool_rows(ws, allocation, styles)
+    elif title == 'Individual Tips':
+        yield from _tips_header_rows(ws, header_structure, 1, styles)
+        yield from _tip_rows(ws, roster, allocation, salary_employees, styles, conditional_formatting)
+    else:
+        raise ValueError(f"Unknown sheet '{title}', expected one of: {', '.join(SHEET_TITLES)}")
+
+
+def stream_layout_sheet(ws, title, roster, header_structure, allocation=None, salary_employees=(), styles=STYLES,
+                        conditional_formatting=False):
+    """
+    Writes one sheet of the multi-sheet layout onto a write-only worksheet:
+    Hours (the hours table and ROLE TOTALS), Pool Allocation (the three tip
+    pools and TOTAL) or Individual Tips (tips per employee and INDIVIDUAL
+    TOTALS). Each table starts on row 1 under its two header rows. Returns
+    the number of cells written.
+    """
+    _column_widths(ws, len(roster.report_columns) + 1)
+
+    cells = 0
+    for row in _layout_rows(ws, title, roster, header_structure, allocation, salary_employees, styles,
+                            conditional_formatting):
+        ws.append(row)
+        cells += len(row)
+    if conditional_formatting and title == 'Hours':
+        add_band_rules(ws, roster, None, salary_employees, styles)
+    elif conditional_formatting and title == 'Individual Tips':
+        add_band_rules(ws, roster, allocation, salary_employees, styles, hours_row=None, tips_row=3)
+    return cells
+
+
+def prime_layout_styles(wb, roster, header_structure, salary_employees=(), styles=STYLES,
+                        conditional_formatting=False):
+    """
+    Registers every cell style the multi-sheet layout can use on a write-only
+    workbook, in a fixed order, by building the cells of all three sheets for a
+    small probe roster (a salary employee and one employee per tip band) on a
+    scratch sheet. Workbooks primed this way number their styles identically,
+    so sheets written in different processes can share one styles.xml.
+    """
+    amounts = sorted({minimum + 1 for minimum, _ in TIP_BANDS + TOTAL_TIP_BANDS} | {0})
+    names = list(salary_employees)[:1] + [f"Probe {amount}" for amount in amounts]
+    columns = list(roster.columns)
+    probe_roster = Roster(names, columns, np.ones((len(names), len(columns))))
+    employee_tips = np.zeros((len(names), len(columns)))
+    employee_tips[:, 0] = amounts[-1:] * (len(names) - len(amounts)) + amounts
+    probe_allocation = TipAllocation(columns, names, None, np.ones((3, len(columns))), employee_tips, {}, {})
+
+    scratch = wb.create_sheet('Style Probe')
+    for title in SHEET_TITLES:
+        for row in _layout_rows(scratch, title, probe_roster, header_structure, probe_allocation, salary_employees,
+                                styles, conditional_formatting):
+            for cell in row:
+                if hasattr(cell, 'style_id'):
+                    cell.style_id  # Adds the cell's style to the workbook's table
+    wb.remove(scratch)
+
+
+def stream_summary_sheet(ws, columns, rows, total_label='TOTAL', styles=STYLES):
+    """
+    Writes a plain table: a header row, one row per entry and a totals row that
+    sums every column with a number format. columns is a list of (header,
+    number_format) pairs. Works on regular and write-only worksheets alike.
+    """
+    for c_idx in range(1, len(columns) + 1):
+        ws.column_dimensions[get_column_letter(c_idx)].width = 15
+    ws.column_dimensions['A'].width = 25
+
+    ws.append([
+        _cell(ws, header, font=styles.header_font, fill=styles.main_header_fill,
+              border=styles.thin_border, alignment=styles.centered_alignment)
+        for header, _ in columns
+    ])
+    for values in rows:
+        ws.append([
+            _cell(ws, value, border=styles.thin_border, number_format=number_format)
+            for value, (_, number_format) in zip(values, columns)
+        ])
+
+    totals = [sum(values[c_idx] for values in rows) if number_format else None
+              for c_idx, (_, number_format) in enumerate(columns)]
+    font, fill = styles.section_value_font(total_label), styles.section_value_fill(total_label)
+    ws.append([_label(ws, total_label, styles)] + [
+        _cell(ws, value, font=font, fill=fill, border=styles.thin_border, number_format=number_format)
+        for value, (_, number_format) in zip(totals[1:], columns[1:])
+    ])
+